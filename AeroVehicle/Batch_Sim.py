@@ -0,0 +1,267 @@
+"""
+Batched (struct-of-arrays) vehicle simulation.
+Advances N vehicles per call. States, controls and forces are kept in contiguous float64
+arrays with one row per vehicle and one column per field, and every stage of the step
+is a vectorized NumPy operation over the whole fleet.
+"""
+
+import numpy as np
+from Global.simdata import UAVState, UAVForces, ActuatorOutputs
+from Global.attitude import (
+    batch_euler_to_quaternion,
+    batch_quaternion_to_euler,
+    batch_quaternion_to_dcm,
+    batch_quaternion_rates,
+    batch_propagate_quaternion,
+)
+from AeroVehicle.aero_model import AeroModel, compile_vehicle, regressor
+from AeroVehicle.integrators import make_integrator
+from AeroVehicle.actuators import Actuator_model
+
+# Column layouts of the batch arrays
+# (rigid-body vector with quaternion attitude, Euler view of the first 12 UAVState fields,
+# ActuatorOutputs and UAVForces array layouts)
+RIGID_BODY_FIELDS = UAVState.rigid_body_fields
+STATE_FIELDS = UAVState.field_names[:12]
+CONTROL_FIELDS = tuple(name.split(".")[1] for name in ActuatorOutputs.field_names)
+FORCE_FIELDS = UAVForces.field_names
+
+
+def batch_forces_moments(x: np.ndarray, controls: np.ndarray, model: AeroModel, R_ned_to_body=None,
+                         wind=None) -> np.ndarray:
+    """
+    Vectorized counterpart of VehicleForcesMoments.compute.
+
+    Args:
+        x (N, 13): rows laid out as RIGID_BODY_FIELDS.
+        controls (N, 8): physical actuator values laid out as CONTROL_FIELDS.
+        model (AeroModel): compiled vehicle model.
+        R_ned_to_body (N, 3, 3): optional rotation matrices for x, computed from the quaternion if omitted.
+        wind (3,) or (N, 3): optional steady NED wind in m/s.
+
+    Returns:
+        (N, 8) array laid out as FORCE_FIELDS.
+    """
+    u, v, w = x[:, 3], x[:, 4], x[:, 5]
+    p, q, r = x[:, 10], x[:, 11], x[:, 12]
+    if R_ned_to_body is None:
+        R_ned_to_body = batch_quaternion_to_dcm(x[:, 6:10])
+    if wind is not None:
+        # air-relative body velocity
+        wind_body = np.einsum("nij,nj->ni", R_ned_to_body, np.broadcast_to(wind, (x.shape[0], 3)))
+        u, v, w = u - wind_body[:, 0], v - wind_body[:, 1], w - wind_body[:, 2]
+
+    alpha = np.arctan2(w, u)
+    V = np.sqrt(u * u + v * v + w * w)
+    moving = V > 0
+    safe_V = np.where(moving, V, 1.0)
+    beta = np.where(moving, np.arcsin(np.clip(v / safe_V, -1, 1)), 0.0)
+    inv_2V = np.where(moving, 0.5 / safe_V, 0.0)  # non-dimensional rate scaling, zero when at rest
+    q_dyn = 0.5 * model.rho * V * V
+
+    M1, M2, M3, M4 = controls[:, 0], controls[:, 1], controls[:, 2], controls[:, 3]
+    thrust_FW = controls[:, 4]
+    aileron, elevator, rudder = controls[:, 5], controls[:, 6], controls[:, 7]
+
+    # Aerodynamic forces and moments: rows [lift, drag, side, l, m, n]
+    reg = regressor(model, alpha, beta, p, q, r, inv_2V, aileron, elevator, rudder)
+    aero = q_dyn * (model.force_matrix @ reg)
+    lift, drag = aero[0], aero[1]
+
+    # Stability to body rotation of [-drag, 0, -lift], plus thrust and gravity (third column of R_ned_to_body)
+    ca, sa = np.cos(alpha), np.sin(alpha)
+    gravity = model.weight * R_ned_to_body[:, :, 2]
+    l_q, k_yaw = model.arm_length, model.k_yaw
+    out = np.empty((x.shape[0], len(FORCE_FIELDS)))
+    out[:, 0] = lift
+    out[:, 1] = drag
+    out[:, 2] = -ca * drag - sa * lift + thrust_FW + gravity[:, 0]
+    out[:, 3] = aero[2] + gravity[:, 1]
+    out[:, 4] = sa * drag - ca * lift - (M1 + M2 + M3 + M4) + gravity[:, 2]
+
+    # Aero moments plus quad thrust moments
+    out[:, 5] = aero[3] + l_q * ((M1 + M4) - (M2 + M3))
+    out[:, 6] = aero[4] + l_q * ((M1 + M2) - (M3 + M4))
+    out[:, 7] = aero[5] + k_yaw * ((M1 + M3) - (M2 + M4))
+    return out
+
+
+def batch_accelerations(x: np.ndarray, forces: np.ndarray, model: AeroModel):
+    """
+    Vectorized counterpart of SixDOFDynamics.compute.
+
+    Returns:
+        (acc_body, omega_dot): two (N, 3) arrays.
+    """
+    u, v, w = x[:, 3], x[:, 4], x[:, 5]
+    p, q, r = x[:, 10], x[:, 11], x[:, 12]
+    Fx, Fy, Fz, l, m, n = forces[:, 2], forces[:, 3], forces[:, 4], forces[:, 5], forces[:, 6], forces[:, 7]
+    mdl = model
+
+    acc_body = np.empty((x.shape[0], 3))
+    acc_body[:, 0] = r * v - q * w + Fx / mdl.m
+    acc_body[:, 1] = p * w - r * u + Fy / mdl.m
+    acc_body[:, 2] = q * u - p * v + Fz / mdl.m
+
+    omega_dot = np.empty((x.shape[0], 3))
+    omega_dot[:, 0] = mdl.gamma1 * p * q - mdl.gamma2 * q * r + mdl.gamma3 * l + mdl.gamma4 * n
+    omega_dot[:, 1] = mdl.gamma5 * p * r - mdl.gamma6 * (p**2 - r**2) + m / mdl.Jy
+    omega_dot[:, 2] = mdl.gamma7 * p * q - mdl.gamma1 * q * r + mdl.gamma4 * l + mdl.gamma8 * n
+    return acc_body, omega_dot
+
+
+def batch_state_derivative(x: np.ndarray, controls: np.ndarray, model: AeroModel, wind=None) -> np.ndarray:
+    """
+    Pure time derivative of the (N, 13) rigid-body state for fixed physical controls (N, 8)
+    and an optional steady NED wind ((3,) or (N, 3)).
+    Position rates are inertial (NED), the quaternion follows the body rates.
+    The rotation matrix is built once and shared by the gravity and position terms.
+    """
+    R_ned_to_body = batch_quaternion_to_dcm(x[:, 6:10])
+    forces = batch_forces_moments(x, controls, model, R_ned_to_body, wind)
+    acc_body, omega_dot = batch_accelerations(x, forces, model)
+
+    x_dot = np.empty(x.shape)
+    x_dot[:, 0:3] = np.einsum("nji,nj->ni", R_ned_to_body, x[:, 3:6])
+    x_dot[:, 3:6] = acc_body
+    x_dot[:, 6:10] = batch_quaternion_rates(x[:, 6:10], x[:, 10:13])
+    x_dot[:, 10:13] = omega_dot
+    return x_dot
+
+
+def normalize_quaternions(x: np.ndarray):
+    """Renormalizes the attitude quaternions of an (N, 13) rigid-body array in place."""
+    x[:, 6:10] /= np.linalg.norm(x[:, 6:10], axis=1, keepdims=True)
+
+
+class BatchUAVSimulation:
+    """
+    Fleet version of UAVSimulation: one call to simulate_one_step advances all N vehicles.
+    """
+
+    def __init__(self, vehicle_prop, dt, n_vehicles: int, integrator: str = "semi_implicit",
+                 actuator_dynamics: bool = True, wind=None, **integrator_options):
+        self.vehicle_prop = vehicle_prop
+        self.wind = wind  # steady NED wind, (3,) or (N, 3) m/s; None for still air
+        self.model: AeroModel = compile_vehicle(vehicle_prop)
+        self.dt = dt
+        self.integrator = None if integrator == "semi_implicit" else make_integrator(integrator, **integrator_options)
+        self.n_vehicles = n_vehicles
+        self.min_thrust, self.max_thrust = 0, 110
+        D2R = np.pi / 180
+        self.min_deflection, self.max_deflection = -30 * D2R, 30 * D2R
+
+        # PWM (1000-2000) to physical scaling, saturation and actuator dynamics for the whole fleet
+        limits = (self.min_thrust, self.max_thrust, self.min_deflection, self.max_deflection)
+        if actuator_dynamics:
+            self.actuators = Actuator_model.with_dynamics(*limits, dt, n_vehicles=n_vehicles)
+        else:
+            self.actuators = Actuator_model(*limits, n_vehicles=n_vehicles)
+
+        # Rigid-body state (authoritative), its rotation matrices and a lazily derived Euler view
+        self.x = np.zeros((n_vehicles, len(RIGID_BODY_FIELDS)))
+        self.x[:, 6] = 1.0  # identity attitude
+        self.dcm = None  # (N, 3, 3) R_ned_to_body for the current x, built once per step
+        self._states = np.zeros((n_vehicles, len(STATE_FIELDS)))
+        self._states_stale = True
+        self.controls = np.zeros((n_vehicles, len(CONTROL_FIELDS)))
+        self.forces_moments = np.zeros((n_vehicles, len(FORCE_FIELDS)))
+
+    @classmethod
+    def from_states(cls, vehicle_prop, dt, states: list[UAVState], **kwargs):
+        batch = cls(vehicle_prop, dt, len(states), **kwargs)
+        for i, state in enumerate(states):
+            batch.set_state(i, state)
+        return batch
+
+    @property
+    def states(self) -> np.ndarray:
+        """
+        (N, 12) fleet state laid out as STATE_FIELDS, with Euler angles derived from the
+        quaternions on first access after a step. Read-only: use set_states to write.
+        """
+        if self._states_stale:
+            s, x = self._states, self.x
+            s[:, 0:6] = x[:, 0:6]
+            s[:, 6:9] = batch_quaternion_to_euler(x[:, 6:10])
+            s[:, 9:12] = x[:, 10:13]
+            self._states_stale = False
+        return self._states
+
+    def set_states(self, states: np.ndarray):
+        """Overwrites the fleet from an (N, 12) array laid out as STATE_FIELDS."""
+        states = np.asarray(states, dtype=float)
+        self.x[:, 0:6] = states[:, 0:6]
+        self.x[:, 6:10] = batch_euler_to_quaternion(states[:, 6], states[:, 7], states[:, 8])
+        self.x[:, 10:13] = states[:, 9:12]
+        self._invalidate()
+
+    def _invalidate(self):
+        self.dcm = None
+        self._states_stale = True
+
+    # ---------- scalar <-> batch conversion ----------
+    def set_state(self, i: int, state: UAVState):
+        self.x[i] = state.rigid_body()
+        self._invalidate()
+
+    def get_state(self, i: int, out: UAVState | None = None) -> UAVState:
+        """Copies vehicle i into `out` (or a new UAVState)."""
+        out = UAVState() if out is None else out
+        out.set_rigid_body(self.x[i])
+        return out
+
+    def get_forces(self, i: int, out: UAVForces | None = None) -> UAVForces:
+        out = UAVForces() if out is None else out
+        out.assign(self.forces_moments[i])
+        return out
+
+    @staticmethod
+    def pack_controls(control_inputs: list[ActuatorOutputs]) -> np.ndarray:
+        """Stacks per-vehicle ActuatorOutputs (PWM) into an (N, 8) array."""
+        return np.array([c.as_array() for c in control_inputs], dtype=float)
+
+    # ---------- simulation ----------
+    def run_actuators(self, control_input: np.ndarray) -> np.ndarray:
+        """Clamps PWM commands to 1000-2000, scales them to thrust / deflection and applies the actuator response."""
+        self.controls = self.actuators.run(control_input)
+        return self.controls
+
+    def simulate_one_step(self, control_input: np.ndarray):
+        """
+        Args:
+            control_input (N, 8): PWM commands laid out as CONTROL_FIELDS.
+
+        Returns:
+            (x, forces_moments): the updated (N, 13) rigid-body and (N, 8) force arrays.
+            Euler angles are available through .states.
+        """
+        dt = self.dt
+        x = self.x
+        controls = self.run_actuators(control_input)
+        R_ned_to_body = self.dcm if self.dcm is not None else batch_quaternion_to_dcm(x[:, 6:10])
+
+        self.forces_moments = batch_forces_moments(x, controls, self.model, R_ned_to_body, self.wind)
+        self._invalidate()
+
+        if self.integrator is not None:
+            x[:] = self.integrator.step(lambda s: batch_state_derivative(s, controls, self.model, self.wind), x, dt)
+            normalize_quaternions(x)
+            return self.x, self.forces_moments
+
+        # Default: semi-implicit Euler
+        acc_body, omega_dot = batch_accelerations(x, self.forces_moments, self.model)
+
+        # Integrate velocities and angular rates
+        x[:, 3:6] += acc_body * dt
+        x[:, 10:13] += omega_dot * dt
+
+        # Rotate the attitude by the new rates
+        x[:, 6:10] = batch_propagate_quaternion(x[:, 6:10], x[:, 10:13], dt)
+
+        # Inertial velocity (R^T @ V_body) and position update; R is kept for the next step's forces
+        self.dcm = R_ned_to_body = batch_quaternion_to_dcm(x[:, 6:10])
+        V_ned = np.einsum("nji,nj->ni", R_ned_to_body, x[:, 3:6])
+        x[:, 0:3] += V_ned * dt
+
+        return self.x, self.forces_moments
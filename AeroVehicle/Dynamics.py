@@ -1,31 +1,36 @@
-import numpy as np
-from Global.utils import wrap, rotation_matrix
+import math
+from Global.fastmath import clamp
 from Global.simdata import UAVState, UAVForces, ActuatorOutputs
+from AeroVehicle.aero_model import AeroModel, compile_vehicle, regressor
 
 
 class VehicleForcesMoments:
-    def __init__(self, vehicle_prop):
-        self.vp = vehicle_prop
+    def __init__(self, vehicle_prop, wind=(0.0, 0.0, 0.0)):
+        self.model: AeroModel = compile_vehicle(vehicle_prop)
+        self.wind = tuple(wind)  # steady wind, NED m/s (the air moves with it)
         self.output: UAVForces = UAVForces()
 
     def compute(self, current_state: UAVState, controls: ActuatorOutputs):
         u, v, w = current_state.x_vel, current_state.y_vel, current_state.z_vel
-        phi, theta, psi = current_state.phi, current_state.theta, current_state.psi
         p, q, r = current_state.phi_rate, current_state.theta_rate, current_state.psi_rate
-
-        # Aircraft properties
-        m = self.vp["m"]
-        S = self.vp["S"]
-        b = self.vp["b"]
-        c = self.vp["c"]
-        rho = self.vp["rho"]
-        l_q = self.vp.get("quad_arm_length", 0.5)  # distance from CG to each rotor
-        k_yaw = self.vp.get("quad_yaw_coeff", 0.01)  # yaw torque constant
-
-        alpha = wrap(np.arctan2(w, u), -np.pi, np.pi)
-        V = np.linalg.norm([u, v, w])
-        beta = wrap(np.arcsin(np.clip(v / V, -1, 1)), -np.pi / 2, np.pi / 2)
-        q_dyn = 0.5 * rho * V**2 if V > 0 else 0.0
+        model = self.model
+        R = current_state.dcm()
+
+        # Air-relative body velocity: subtract the wind rotated into the body frame
+        wn, we, wd = self.wind
+        if wn or we or wd:
+            u -= R[0] * wn + R[1] * we + R[2] * wd
+            v -= R[3] * wn + R[4] * we + R[5] * wd
+            w -= R[6] * wn + R[7] * we + R[8] * wd
+
+        alpha = math.atan2(w, u)
+        V = math.sqrt(u * u + v * v + w * w)
+        if V > 0:
+            beta = math.asin(clamp(v / V, -1.0, 1.0))
+            inv_2V = 0.5 / V
+        else:
+            beta = inv_2V = 0.0
+        q_dyn = 0.5 * model.rho * V * V
 
         # Control inputs
         aileron = controls.fw.aileron
@@ -38,43 +43,28 @@ class VehicleForcesMoments:
         M3 = controls.quad.motor3  # RB (CCW)
         M4 = controls.quad.motor4  # LB (CW)
 
-        # Rotation matrices
-        R_ned_to_body = rotation_matrix(phi, theta, psi)
-        R_stb_to_body = rotation_matrix(0, -alpha, 0)
-
-        # Gravity in body frame
-        gravity_body = R_ned_to_body @ np.array([0, 0, m * 9.81])
-
-        # Aerodynamic forces
-        CL = self.vp["CL0"] + self.vp["CL_alpha"] * alpha + self.vp["CLq"] * q * c / (2 * V) + self.vp["CL_delta_e"] * elevator
-        CD = self.vp["CD0"] + self.vp["CD_alpha"] * abs(alpha) + self.vp["CDq"] * abs(q) * c / (2 * V) + self.vp["CD_delta_e"] * abs(elevator)
-        CY = self.vp["CY0"] + self.vp["CY_beta"] * beta + self.vp["CYp"] * p + self.vp["CYr"] * r + self.vp["CY_delta_a"] * aileron + self.vp["CY_delta_r"] * rudder
-
-        lift = q_dyn * S * CL
-        drag = q_dyn * S * CD
-        F_aero_body = R_stb_to_body @ np.array([-drag, 0, -lift])
-        F_aero_body[1] += q_dyn * S * CY
-
-        # Thrust forces
-        F_thrust_body = np.array([
-            thrust_FW,
-            0.0,
-            -(M1 + M2 + M3 + M4)
-        ])
+        # Gravity in body frame (third column of R_ned_to_body times m*g).
+        # The state caches R, so this reuses the matrix the previous step built for the position update.
+        gravity_x = model.weight * R[2]
+        gravity_y = model.weight * R[5]
+        gravity_z = model.weight * R[8]
 
-        # Total forces
-        Fx, Fy, Fz = F_aero_body + F_thrust_body + gravity_body
+        # Aerodynamic forces and moments: [lift, drag, side, l, m, n]
+        reg = regressor(model, alpha, beta, p, q, r, inv_2V, aileron, elevator, rudder)
+        lift, drag, side, l_aero, m_aero, n_aero = (q_dyn * (model.force_matrix @ reg)).tolist()
 
-        # Aero moments
-        Cl = self.vp["Cl0"] + self.vp["Cl_beta"] * beta + self.vp["Clp"] * p * b / (2 * V) + self.vp["Clr"] * r * b / (2 * V) + self.vp["Cl_delta_a"] * aileron + self.vp["Cl_delta_r"] * rudder
-        Cm = self.vp["Cm0"] + self.vp["Cm_alpha"] * alpha + self.vp["Cmq"] * q * c / (2 * V) + self.vp["Cm_delta_e"] * elevator
-        Cn = self.vp["Cn0"] + self.vp["Cn_beta"] * beta + (self.vp["Cnp"] * p + self.vp["Cnr"] * r) * b / (2 * V) + self.vp["Cn_delta_a"] * aileron + self.vp["Cn_delta_r"] * rudder
+        # Stability to body rotation of [-drag, 0, -lift]
+        ca, sa = math.cos(alpha), math.sin(alpha)
+        F_aero_x = -ca * drag - sa * lift
+        F_aero_z = sa * drag - ca * lift
 
-        l_aero = q_dyn * S * b * Cl
-        m_aero = q_dyn * S * c * Cm
-        n_aero = q_dyn * S * b * Cn
+        # Total forces: aero + thrust + gravity
+        Fx = F_aero_x + thrust_FW + gravity_x
+        Fy = side + gravity_y
+        Fz = F_aero_z - (M1 + M2 + M3 + M4) + gravity_z
 
         # Moments from quad thrusts
+        l_q, k_yaw = model.arm_length, model.k_yaw
         l_quad = l_q * ((M1 + M4) - (M2 + M3))  # Roll: left - right
         m_quad = l_q * ((M1 + M2) - (M3 + M4))  # Pitch: front - back
         n_quad = k_yaw * ((M1 + M3) - (M2 + M4))  # Yaw: CCW - CW
@@ -84,5 +74,5 @@ class VehicleForcesMoments:
         m_total = m_aero + m_quad
         n_total = n_aero + n_quad
 
-        self.output = UAVForces(lift, drag, Fx, Fy, Fz, l_total, m_total, n_total)
+        self.output.assign((lift, drag, Fx, Fy, Fz, l_total, m_total, n_total))
         return self.output
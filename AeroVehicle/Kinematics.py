@@ -1,38 +1,28 @@
-import numpy as np
 from Global.simdata import UAVForces, UAVState
-from dataclasses import astuple
+from AeroVehicle.aero_model import AeroModel, compile_vehicle
 
 class SixDOFDynamics:
     def __init__(self, vehicle_prop):
-        self.vp = vehicle_prop
+        self.model: AeroModel = compile_vehicle(vehicle_prop)
 
     def compute(self, current_state: UAVState, forces_moments: UAVForces):
         u, v, w = current_state.x_vel, current_state.y_vel, current_state.z_vel
         p, q, r = current_state.phi_rate, current_state.theta_rate, current_state.psi_rate
 
-        (_, _, Fx, Fy, Fz, l, m, n) = astuple(forces_moments)
+        Fx, Fy, Fz = forces_moments.fx, forces_moments.fy, forces_moments.fz
+        l, m, n = forces_moments.l, forces_moments.m, forces_moments.n
 
-        m_uav = self.vp["m"]
-        Jx, Jy, Jz, Jxz = self.vp["Jx"], self.vp["Jy"], self.vp["Jz"], self.vp["Jxz"]
+        mdl = self.model
+        m_uav = mdl.m
 
         # Translational accelerations
         u_dot = r*v - q*w + Fx / m_uav
         v_dot = p*w - r*u + Fy / m_uav
         w_dot = q*u - p*v + Fz / m_uav
 
-        # Angular accelerations
-        gamma = Jx * Jz - Jxz**2
-        gamma1 = (Jxz * (Jx - Jy + Jz)) / gamma
-        gamma2 = (Jz * (Jz - Jy) + Jxz**2) / gamma
-        gamma3 = Jz / gamma
-        gamma4 = Jxz / gamma
-        gamma5 = (Jz - Jx) / Jy
-        gamma6 = Jxz / Jy
-        gamma7 = ((Jx - Jy) * Jx + Jxz**2) / gamma
-        gamma8 = Jx / gamma
+        # Angular accelerations (inertia gammas are precomputed by compile_vehicle)
+        p_dot = mdl.gamma1 * p * q - mdl.gamma2 * q * r + mdl.gamma3 * l + mdl.gamma4 * n
+        q_dot = mdl.gamma5 * p * r - mdl.gamma6 * (p**2 - r**2) + m / mdl.Jy
+        r_dot = mdl.gamma7 * p * q - mdl.gamma1 * q * r + mdl.gamma4 * l + mdl.gamma8 * n
 
-        p_dot = gamma1 * p * q - gamma2 * q * r + gamma3 * l + gamma4 * n
-        q_dot = gamma5 * p * r - gamma6 * (p**2 - r**2) + m / Jy
-        r_dot = gamma7 * p * q - gamma1 * q * r + gamma4 * l + gamma8 * n
-
-        return np.array([u_dot, v_dot, w_dot]), np.array([p_dot, q_dot, r_dot])
+        return (u_dot, v_dot, w_dot), (p_dot, q_dot, r_dot)
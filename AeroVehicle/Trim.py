@@ -0,0 +1,353 @@
+"""
+Trim solver and trim-table cache.
+
+A trim condition is an airspeed Va, a flight-path angle gamma (climb positive) and a turn rate
+psi_dot (coordinated, zero sideslip). For each condition the solver finds the angle of attack,
+roll and pitch angles and the pusher thrust / surface deflections for which the body-frame
+accelerations and angular accelerations vanish and the aircraft climbs at Va * sin(gamma).
+Body rates follow from the turn rate: (p, q, r) = psi_dot * (-sin theta, sin phi cos theta, cos phi cos theta).
+
+All conditions of a grid are solved together by a vectorized Levenberg-Marquardt iteration
+whose finite-difference Jacobians come from one batch_state_derivative call per iteration.
+The resulting TrimTable is stored as .npz under TRIM_CACHE_DIR, keyed by a hash of the
+vehicle properties and the grid, so later runs load it instead of solving:
+
+    table = get_trim_table(Aerosonde_vehicle)
+    state = trim_state(Aerosonde_vehicle, airspeed=22.0, position=(0, 0, -500))
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import numpy as np
+
+from AeroVehicle.aero_model import AeroModel, compile_vehicle
+from AeroVehicle.Batch_Sim import RIGID_BODY_FIELDS, CONTROL_FIELDS, batch_state_derivative
+from Global.attitude import batch_euler_to_quaternion
+from Global.simdata import UAVState, ActuatorOutputs
+
+TRIM_VERSION = 1  # bump when the trim equations change, invalidates cached tables
+TRIM_CACHE_DIR = Path(__file__).with_name("trim_cache")
+
+# Default grid: airspeed (m/s), flight-path angle (rad), turn rate (rad/s)
+DEFAULT_AIRSPEEDS = tuple(np.arange(16.0, 34.0, 2.0))
+DEFAULT_GAMMAS = tuple(np.radians([-6.0, -3.0, 0.0, 3.0, 6.0]))
+DEFAULT_TURN_RATES = tuple(np.radians([-15.0, -10.0, -5.0, 0.0, 5.0, 10.0, 15.0]))
+
+# Actuator limits of UAVSimulation (physical units) used to flag infeasible trims
+THRUST_LIMITS = (0.0, 110.0)
+DEFLECTION_LIMITS = (-np.radians(30.0), np.radians(30.0))
+
+UNKNOWNS = ("alpha", "phi", "theta", "thrust", "aileron", "elevator", "rudder")
+_CONTROL_COLUMNS = [CONTROL_FIELDS.index(n) for n in ("throttle", "aileron", "elevator", "rudder")]
+_X = {name: i for i, name in enumerate(RIGID_BODY_FIELDS)}
+
+
+# ---------- residuals ----------
+def trim_rigid_body(z: np.ndarray, conditions: np.ndarray) -> np.ndarray:
+    """
+    (N, 13) rigid-body states at the origin, heading north, for unknowns z (N, 7) laid out as
+    UNKNOWNS and conditions (N, 3) = (airspeed, gamma, turn_rate).
+    """
+    alpha, phi, theta = z[:, 0], z[:, 1], z[:, 2]
+    Va, psi_dot = conditions[:, 0], conditions[:, 2]
+    x = np.zeros((len(z), len(RIGID_BODY_FIELDS)))
+    x[:, _X["x_vel"]] = Va * np.cos(alpha)
+    x[:, _X["z_vel"]] = Va * np.sin(alpha)
+    x[:, 6:10] = batch_euler_to_quaternion(phi, theta, np.zeros_like(phi))
+    x[:, _X["phi_rate"]] = -psi_dot * np.sin(theta)
+    x[:, _X["theta_rate"]] = psi_dot * np.sin(phi) * np.cos(theta)
+    x[:, _X["psi_rate"]] = psi_dot * np.cos(phi) * np.cos(theta)
+    return x
+
+
+def trim_controls(z: np.ndarray) -> np.ndarray:
+    """(N, 8) physical controls (lift motors off) for unknowns z (N, 7)."""
+    controls = np.zeros((len(z), len(CONTROL_FIELDS)))
+    controls[:, _CONTROL_COLUMNS] = z[:, 3:7]
+    return controls
+
+
+def trim_residuals(z: np.ndarray, conditions: np.ndarray, model: AeroModel) -> np.ndarray:
+    """
+    (N, 7): body accelerations (u, v, w), angular accelerations (p, q, r) and the
+    climb-rate error. Thrust is scaled by the weight so the columns are comparable.
+    """
+    z = z.copy()
+    z[:, 3] *= model.weight
+    x_dot = batch_state_derivative(trim_rigid_body(z, conditions), trim_controls(z), model)
+    climb_error = -x_dot[:, 2] - conditions[:, 0] * np.sin(conditions[:, 1])
+    return np.column_stack((x_dot[:, 3:6], x_dot[:, 10:13], climb_error))
+
+
+def solve_trim(model, conditions, z0=None, tol: float = 1e-10, max_iter: int = 100):
+    """
+    Solves all conditions at once.
+
+    Args:
+        model: vehicle-property dict or AeroModel.
+        conditions (N, 3): (airspeed, gamma, turn_rate) rows.
+        z0 (N, 7): initial guesses laid out as UNKNOWNS (thrust in newtons), default level cruise.
+        tol (float): convergence threshold on the residual norm.
+
+    Returns:
+        (z, residual_norm): (N, 7) solutions (thrust in newtons) and (N,) final residual norms.
+    """
+    model = compile_vehicle(model)
+    conditions = np.atleast_2d(np.asarray(conditions, dtype=float))
+    n, k = len(conditions), len(UNKNOWNS)
+    if z0 is None:
+        z = np.zeros((n, k))
+        z[:, 0] = np.radians(4.0)
+        z[:, 2] = np.radians(4.0) + conditions[:, 1]
+        z[:, 3] = 0.1
+    else:
+        z = np.array(z0, dtype=float)
+        z[:, 3] /= model.weight
+
+    h = 1e-7
+    eye = np.eye(k)
+    lam = np.full(n, 1e-3)
+    res = trim_residuals(z, conditions, model)
+    cost = np.einsum("ni,ni->n", res, res)
+    for _ in range(max_iter):
+        active = cost > tol * tol
+        if not active.any():
+            break
+
+        # Forward-difference Jacobians of every active condition in one batched evaluation
+        za, ca = z[active], conditions[active]
+        m = len(za)
+        perturbed = (za[:, None, :] + h * eye[None]).reshape(m * k, k)
+        res_p = trim_residuals(perturbed, np.repeat(ca, k, axis=0), model).reshape(m, k, k)
+        J = (res_p - res[active][:, None, :]).transpose(0, 2, 1) / h  # (m, residual, unknown)
+
+        # Levenberg-Marquardt step, accepted per condition when it lowers the cost
+        JtJ = np.einsum("nri,nrj->nij", J, J)
+        Jtr = np.einsum("nri,nr->ni", J, res[active])
+        diag = np.einsum("nii->ni", JtJ)
+        A = JtJ + lam[active][:, None, None] * (diag[:, :, None] * eye + 1e-12 * eye)
+        step = -np.linalg.solve(A, Jtr[..., None])[..., 0]
+        z_new = za + step
+        res_new = trim_residuals(z_new, ca, model)
+        cost_new = np.einsum("ni,ni->n", res_new, res_new)
+
+        better = cost_new < cost[active]
+        idx = np.flatnonzero(active)
+        accept = idx[better]
+        z[accept], res[accept], cost[accept] = z_new[better], res_new[better], cost_new[better]
+        lam[accept] = np.maximum(lam[accept] / 3.0, 1e-12)
+        lam[idx[~better]] *= 4.0
+
+    z[:, 3] *= model.weight
+    return z, np.sqrt(cost)
+
+
+# ---------- trim points ----------
+@dataclass
+class TrimPoint:
+    airspeed: float
+    gamma: float
+    turn_rate: float
+    alpha: float
+    phi: float
+    theta: float
+    thrust: float  # pusher thrust (N)
+    aileron: float  # rad
+    elevator: float  # rad
+    rudder: float  # rad
+    residual: float
+
+    @property
+    def feasible(self) -> bool:
+        """Solved, with thrust and deflections inside the actuator limits."""
+        lo_d, hi_d = DEFLECTION_LIMITS
+        return (
+            self.residual < 1e-6
+            and THRUST_LIMITS[0] <= self.thrust <= THRUST_LIMITS[1]
+            and all(lo_d <= d <= hi_d for d in (self.aileron, self.elevator, self.rudder))
+        )
+
+    def state(self, position=(0.0, 0.0, 0.0), heading: float = 0.0) -> UAVState:
+        """UAVState flying this trim from `position` (NED) with the given heading."""
+        z = np.array([[self.alpha, self.phi, self.theta, self.thrust, self.aileron, self.elevator, self.rudder]])
+        x = trim_rigid_body(z, np.array([[self.airspeed, self.gamma, self.turn_rate]]))[0]
+        state = UAVState()
+        state.set_rigid_body(x)
+        state.psi = heading
+        state.x, state.y, state.z = position
+        return state
+
+    def physical_controls(self) -> ActuatorOutputs:
+        controls = ActuatorOutputs()
+        controls.fw.assign((self.thrust, self.aileron, self.elevator, self.rudder))
+        return controls
+
+    def pwm(self, pwm_min: float = 1000.0, pwm_max: float = 2000.0) -> ActuatorOutputs:
+        """Trim controls as PWM for the actuator limits above (lift motors at pwm_min)."""
+        def to_pwm(value, lo, hi):
+            return pwm_min + (value - lo) / (hi - lo) * (pwm_max - pwm_min)
+
+        pwm = ActuatorOutputs()
+        pwm.quad.assign((pwm_min,) * 4)
+        pwm.fw.assign((
+            to_pwm(self.thrust, *THRUST_LIMITS),
+            to_pwm(self.aileron, *DEFLECTION_LIMITS),
+            to_pwm(self.elevator, *DEFLECTION_LIMITS),
+            to_pwm(self.rudder, *DEFLECTION_LIMITS),
+        ))
+        return pwm
+
+
+class TrimTable:
+    """Trim solutions over an (airspeed, gamma, turn_rate) grid."""
+
+    def __init__(self, airspeeds, gammas, turn_rates, solutions: np.ndarray, residuals: np.ndarray, key: str = ""):
+        self.airspeeds = np.asarray(airspeeds, dtype=float)
+        self.gammas = np.asarray(gammas, dtype=float)
+        self.turn_rates = np.asarray(turn_rates, dtype=float)
+        self.solutions = solutions  # (n_airspeed, n_gamma, n_turn, 7) laid out as UNKNOWNS
+        self.residuals = residuals  # (n_airspeed, n_gamma, n_turn)
+        self.key = key
+
+    @property
+    def shape(self):
+        return self.residuals.shape
+
+    @staticmethod
+    def grid(airspeeds, gammas, turn_rates) -> np.ndarray:
+        """(n, 3) conditions in table order."""
+        mesh = np.meshgrid(airspeeds, gammas, turn_rates, indexing="ij")
+        return np.stack([m.ravel() for m in mesh], axis=1)
+
+    @classmethod
+    def compute(cls, vehicle_prop, airspeeds=DEFAULT_AIRSPEEDS, gammas=DEFAULT_GAMMAS,
+                turn_rates=DEFAULT_TURN_RATES, key: str = ""):
+        conditions = cls.grid(airspeeds, gammas, turn_rates)
+        z, residual = solve_trim(vehicle_prop, conditions)
+        shape = (len(airspeeds), len(gammas), len(turn_rates))
+        return cls(airspeeds, gammas, turn_rates, z.reshape(shape + (len(UNKNOWNS),)), residual.reshape(shape), key)
+
+    def interpolate(self, airspeed: float, gamma: float = 0.0, turn_rate: float = 0.0) -> np.ndarray:
+        """Multilinear interpolation of the unknowns (clamped to the grid)."""
+        z = self.solutions
+        for axis_values, value in ((self.airspeeds, airspeed), (self.gammas, gamma), (self.turn_rates, turn_rate)):
+            if len(axis_values) == 1:
+                z = z[0]
+                continue
+            i = int(np.clip(np.searchsorted(axis_values, value) - 1, 0, len(axis_values) - 2))
+            t = float(np.clip((value - axis_values[i]) / (axis_values[i + 1] - axis_values[i]), 0.0, 1.0))
+            z = (1.0 - t) * z[i] + t * z[i + 1]
+        return z
+
+    def trim(self, vehicle_prop, airspeed: float, gamma: float = 0.0, turn_rate: float = 0.0,
+             solve: bool = False) -> TrimPoint:
+        """
+        Trim at an arbitrary condition: grid points are returned as stored, other conditions
+        are solved starting from the interpolated table entry (a few iterations).
+        solve=True always solves, e.g. for a slightly different (dispersed) vehicle than the table's.
+        """
+        on_grid = [np.flatnonzero(np.isclose(axis, v, rtol=0.0, atol=1e-9))
+                   for axis, v in ((self.airspeeds, airspeed), (self.gammas, gamma), (self.turn_rates, turn_rate))]
+        if not solve and all(len(i) for i in on_grid):
+            i, j, k = (int(idx[0]) for idx in on_grid)
+            z, residual = self.solutions[i, j, k], float(self.residuals[i, j, k])
+        else:
+            z, residual = solve_trim(vehicle_prop, [[airspeed, gamma, turn_rate]], self.interpolate(airspeed, gamma, turn_rate)[None])
+            z, residual = z[0], float(residual[0])
+        return TrimPoint(airspeed, gamma, turn_rate, *(float(v) for v in z), residual)
+
+    # ---------- persistence ----------
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temp file and rename, so a reader (e.g. another pool worker) never sees a partial file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, airspeeds=self.airspeeds, gammas=self.gammas, turn_rates=self.turn_rates,
+                         solutions=self.solutions, residuals=self.residuals, key=np.array(self.key))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["airspeeds"], data["gammas"], data["turn_rates"],
+                       data["solutions"], data["residuals"], str(data["key"]))
+
+
+def vehicle_hash(vehicle_prop) -> str:
+    """Stable hash of a vehicle-property dict (or compiled AeroModel)."""
+    if isinstance(vehicle_prop, AeroModel):
+        payload = {f.name: np.asarray(getattr(vehicle_prop, f.name)).tolist() for f in fields(vehicle_prop)}
+    else:
+        payload = dict(vehicle_prop)
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=float).encode()).hexdigest()
+
+
+def table_key(vehicle_prop, airspeeds, gammas, turn_rates) -> str:
+    grid = json.dumps([TRIM_VERSION, [float(v) for v in airspeeds], [float(v) for v in gammas],
+                       [float(v) for v in turn_rates]])
+    return hashlib.sha256((vehicle_hash(vehicle_prop) + grid).encode()).hexdigest()[:16]
+
+
+_tables: dict[str, TrimTable] = {}
+
+
+def get_trim_table(vehicle_prop, airspeeds=DEFAULT_AIRSPEEDS, gammas=DEFAULT_GAMMAS,
+                   turn_rates=DEFAULT_TURN_RATES, cache_dir=TRIM_CACHE_DIR) -> TrimTable:
+    """
+    Trim table for a vehicle, from memory, then the on-disk cache, else solved and cached.
+    Pass cache_dir=None to skip the disk cache.
+    """
+    key = table_key(vehicle_prop, airspeeds, gammas, turn_rates)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+
+    path = None if cache_dir is None else Path(cache_dir) / f"trim_{key}.npz"
+    if path is not None and path.exists():
+        try:
+            table = TrimTable.load(path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+            print(f"[ERROR] Ignoring unreadable trim cache {path}: {e}")
+            table = None
+    if table is None or table.key != key:
+        table = TrimTable.compute(vehicle_prop, airspeeds, gammas, turn_rates, key)
+        if path is not None:
+            table.save(path)
+
+    _tables[key] = table
+    return table
+
+
+def trim_point(vehicle_prop, airspeed: float, gamma: float = 0.0, turn_rate: float = 0.0,
+               reference=None) -> TrimPoint:
+    """
+    TrimPoint at the given condition, from the cached trim table.
+    reference: vehicle whose cached table seeds a fresh solve instead (perturbed copies of a
+    vehicle, e.g. Monte Carlo dispersions, then do not each build and cache a full table).
+    """
+    if reference is None:
+        point = get_trim_table(vehicle_prop).trim(vehicle_prop, airspeed, gamma, turn_rate)
+    else:
+        point = get_trim_table(reference).trim(vehicle_prop, airspeed, gamma, turn_rate, solve=True)
+    if not point.feasible:
+        print(f"[ERROR] Trim at {airspeed:.1f} m/s, gamma {np.degrees(gamma):.1f} deg, "
+              f"turn {np.degrees(turn_rate):.1f} deg/s is not feasible (residual {point.residual:.1e})")
+    return point
+
+
+def trim_state(vehicle_prop, airspeed: float, gamma: float = 0.0, turn_rate: float = 0.0,
+               position=(0.0, 0.0, 0.0), heading: float = 0.0, reference=None) -> UAVState:
+    """UAVState in trim at the given condition, see trim_point."""
+    return trim_point(vehicle_prop, airspeed, gamma, turn_rate, reference).state(position, heading)
@@ -1,22 +1,38 @@
 import numpy as np
-from Global.utils import linear_scale, wrap, rotation_matrix
+from Global.fastmath import propagate_quaternion, quaternion_to_dcm, dcm_apply_transpose
 from AeroVehicle.Kinematics import SixDOFDynamics
 from AeroVehicle.Dynamics import VehicleForcesMoments
 from Global.simdata import UAVState, UAVForces, ActuatorOutputs
 from AeroVehicle.actuators import Actuator_model
+from AeroVehicle.aero_model import AeroModel, compile_vehicle
+from AeroVehicle.integrators import make_integrator
+from AeroVehicle.Batch_Sim import batch_state_derivative, normalize_quaternions
 
 
 class UAVSimulation:
-    def __init__(self, vehicle_prop, dt):
+    def __init__(self, vehicle_prop, dt, integrator: str = "semi_implicit", actuator_dynamics: bool = True,
+                 wind=(0.0, 0.0, 0.0), **integrator_options):
+        """
+        Args:
+            vehicle_prop: vehicle-property dict or compiled AeroModel.
+            dt (float): simulation step in seconds.
+            integrator (str): "semi_implicit" (default, legacy Euler step) or one of
+                "euler", "rk2", "rk4", "rk45" from AeroVehicle.integrators.
+            actuator_dynamics (bool): motor / servo lag and servo rate limits; False for ideal actuators.
+            wind (tuple): steady wind, NED m/s.
+        """
         self.vehicle_prop = vehicle_prop
         self.dt = dt
+        self.integrator = None if integrator == "semi_implicit" else make_integrator(integrator, **integrator_options)
         self.min_thrust, self.max_thrust = 0, 110
         D2R = np.pi / 180
         self.min_deflection, self.max_deflection = -30 * D2R, 30 * D2R
 
-        self.dynamics = VehicleForcesMoments(vehicle_prop)
-        self.kinematics = SixDOFDynamics(vehicle_prop)
-        self.actuators = Actuator_model(self.min_thrust, self.max_thrust, self.min_deflection, self.max_deflection)
+        self.model: AeroModel = compile_vehicle(vehicle_prop)
+        self.dynamics = VehicleForcesMoments(self.model, wind)
+        self.kinematics = SixDOFDynamics(self.model)
+        limits = (self.min_thrust, self.max_thrust, self.min_deflection, self.max_deflection)
+        self.actuators = Actuator_model.with_dynamics(*limits, dt) if actuator_dynamics else Actuator_model(*limits)
 
         self.controls : ActuatorOutputs = ActuatorOutputs()
         self.forces_moments : UAVForces = UAVForces()
@@ -28,11 +44,13 @@ class UAVSimulation:
         self.controls = self.actuators.run(control_input)
         # Unpack states
         u, v, w = current_state.x_vel, current_state.y_vel, current_state.z_vel
-        phi, theta, psi = current_state.phi, current_state.theta, current_state.psi
         p, q, r = current_state.phi_rate, current_state.theta_rate, current_state.psi_rate
 
         # Compute forces and dynamics
         self.forces_moments = self.dynamics.compute(current_state, self.controls)
+        if self.integrator is not None:
+            return self._integrate(current_state), self.forces_moments
+
         acc_body, omega_dot = self.kinematics.compute(current_state, self.forces_moments)
 
         # Integrate velocities
@@ -45,30 +63,34 @@ class UAVSimulation:
         q += omega_dot[1] * self.dt
         r += omega_dot[2] * self.dt
 
-        # Update orientation
-        phi = wrap(phi + p * self.dt, -np.pi, np.pi)
-        theta = wrap(theta + q * self.dt, -np.pi, np.pi)
-        psi = wrap(psi + r * self.dt, -np.pi, np.pi)
+        # Update orientation: rotate the quaternion by the new rates (Euler angles follow lazily)
+        q0, q1, q2, q3 = propagate_quaternion(*current_state.quaternion, p, q, r, self.dt)
+
+        # Compute inertial velocity (R_ned_to_body^T @ V_body) and update position.
+        # R is built once here and cached on the output state for the next step's forces.
+        R = quaternion_to_dcm(q0, q1, q2, q3)
+        x_dot, y_dot, z_dot = dcm_apply_transpose(R, (u, v, w))
 
-        # Compute inertial velocity and update position
-        V_body = np.array([u, v, w])
-        R_ned_to_body = rotation_matrix(phi, theta, psi)
-        V_ned = R_ned_to_body.T @ V_body
-        self.output.x = current_state.x + V_ned[0] * self.dt
-        self.output.y = current_state.y + V_ned[1] * self.dt
-        self.output.z = current_state.z + V_ned[2] * self.dt
+        # Update full state in place
+        self.output.set_rigid_body((
+            current_state.x + x_dot * self.dt,
+            current_state.y + y_dot * self.dt,
+            current_state.z + z_dot * self.dt,
+            u, v, w,
+            q0, q1, q2, q3,
+            p, q, r,
+        ), dcm=R)
 
-        # Update full state
-        self.output.x_vel = u
-        self.output.y_vel = v
-        self.output.z_vel = w
+        return self.output,  self.forces_moments
 
-        self.output.phi = phi
-        self.output.theta = theta
-        self.output.psi = psi
+    def _integrate(self, current_state: UAVState) -> UAVState:
+        """Advances the state with the selected higher-order integrator."""
+        x = current_state.rigid_body()[None, :]
+        controls = self.controls.as_array()[None, :]
 
-        self.output.phi_rate = p
-        self.output.theta_rate = q
-        self.output.psi_rate = r
+        wind = self.dynamics.wind if any(self.dynamics.wind) else None
+        x = self.integrator.step(lambda s: batch_state_derivative(s, controls, self.model, wind), x, self.dt)
+        normalize_quaternions(x)
 
-        return self.output,  self.forces_moments
+        self.output.set_rigid_body(x[0])
+        return self.output
@@ -1,23 +1,124 @@
-from Global.utils import linear_scale
+"""
+Actuator model.
+All eight channels (motor1-4, pusher throttle, aileron, elevator, rudder, the ActuatorOutputs
+layout) are kept in one array and updated together: PWM -> physical scaling with saturation,
+then an optional first-order lag (time constant per channel) and slew-rate limit per channel.
+The same update runs for one vehicle (ActuatorOutputs in/out) or a fleet ((N, 8) arrays).
+"""
+
+import numpy as np
+import Global.configs as configs
+from Global.fastmath import batch_clamp
 from Global.simdata import ActuatorOutputs
 
+N_CHANNELS = ActuatorOutputs.size
+
+# Typical small-UAV actuator response, used when dynamics are enabled
+MOTOR_TIME_CONSTANT = 0.03  # s, ESC + propeller spin-up
+SERVO_TIME_CONSTANT = 0.02  # s
+SERVO_RATE_LIMIT = np.radians(600.0)  # rad/s, 0.1 s per 60 deg
+
+
+def _per_channel(value, motors, surfaces):
+    # scalar for motors / surfaces, or a full per-channel sequence
+    if value is None:
+        return np.array([motors] * 5 + [surfaces] * 3, dtype=float)
+    value = np.broadcast_to(np.asarray(value, dtype=float), (N_CHANNELS,))
+    return value.copy()
+
+
 class Actuator_model:
-    def __init__(self, min_thrust, max_thrust, min_deflection, max_deflection):
+    def __init__(self, min_thrust, max_thrust, min_deflection, max_deflection,
+                 dt: float | None = None, time_constants=None, rate_limits=None, n_vehicles: int | None = None):
+        """
+        Args:
+            min_thrust, max_thrust (float): thrust of motors and pusher at PWM_min / PWM_max.
+            min_deflection, max_deflection (float): surface deflection (rad) at PWM_min / PWM_max.
+            dt (float): update period, required when time constants or rate limits are given.
+            time_constants: first-order lag per channel in seconds (0 = instantaneous).
+            rate_limits: slew-rate limit per channel in physical units per second (inf = none).
+            n_vehicles (int): run on (n_vehicles, 8) arrays instead of ActuatorOutputs.
+        """
         self.min_thrust = min_thrust
         self.max_thrust = max_thrust
         self.min_deflection = min_deflection
         self.max_deflection = max_deflection
+        self.dt = dt
+        self.n_vehicles = n_vehicles
+
+        # PWM -> physical scaling per channel
+        self.pwm_min = configs.PWM_min
+        self.pwm_range = configs.PWM_max - configs.PWM_min
+        self.channel_min = _per_channel(None, min_thrust, min_deflection)
+        self.channel_span = _per_channel(None, max_thrust, max_deflection) - self.channel_min
+
+        # Dynamics: lag factor per step and largest change per step
+        self.time_constants = _per_channel(time_constants, 0.0, 0.0)
+        self.rate_limits = _per_channel(rate_limits, np.inf, np.inf)
+        self.dynamic = bool(np.any(self.time_constants > 0) or np.any(np.isfinite(self.rate_limits)))
+        if self.dynamic:
+            if dt is None or dt <= 0:
+                raise ValueError("dt must be > 0 when actuator dynamics are enabled")
+            with np.errstate(divide="ignore"):
+                self.lag = -np.expm1(-dt / self.time_constants)  # 1 - exp(-dt/tau), 1 for tau = 0
+            self.max_step = self.rate_limits * dt
+
+        # Actuator positions: the output message is a view of the same array for a single vehicle
         self.output: ActuatorOutputs = ActuatorOutputs()
+        self.position = self.output.as_array() if n_vehicles is None else np.zeros((n_vehicles, N_CHANNELS))
+        self._command = np.zeros(self.position.shape)
+        self._initialized = False
+
+    @classmethod
+    def with_dynamics(cls, min_thrust, max_thrust, min_deflection, max_deflection, dt, n_vehicles=None):
+        """Actuators with the module's default motor and servo response."""
+        return cls(
+            min_thrust, max_thrust, min_deflection, max_deflection, dt,
+            time_constants=[MOTOR_TIME_CONSTANT] * 5 + [SERVO_TIME_CONSTANT] * 3,
+            rate_limits=[np.inf] * 5 + [SERVO_RATE_LIMIT] * 3,
+            n_vehicles=n_vehicles,
+        )
+
+    def reset(self):
+        """Actuators jump to the next command instead of lagging from their last position."""
+        self._initialized = False
+
+    def initialize(self, control_input):
+        """Starts the actuators at the positions of a PWM command (e.g. the trim controls), no lag from rest."""
+        pwm = control_input.as_array() if isinstance(control_input, ActuatorOutputs) else control_input
+        self.position[...] = self.command(pwm)
+        self._initialized = True
+
+    def command(self, pwm) -> np.ndarray:
+        """PWM clamped to PWM_min-PWM_max and scaled to thrust / deflection (no dynamics)."""
+        cmd = self._command
+        np.subtract(pwm, self.pwm_min, out=cmd)
+        cmd /= self.pwm_range
+        batch_clamp(cmd, 0.0, 1.0, out=cmd)
+        cmd *= self.channel_span
+        cmd += self.channel_min
+        return cmd
+
+    def run(self, control_input):
+        """
+        Args:
+            control_input: ActuatorOutputs of PWM commands, or an (N, 8) array for a fleet.
+
+        Returns:
+            Physical actuator positions: self.output (single vehicle) or an (N, 8) array.
+        """
+        pwm = control_input.as_array() if isinstance(control_input, ActuatorOutputs) else control_input
+        cmd = self.command(pwm)
+
+        position = self.position
+        if not self.dynamic or not self._initialized:
+            # the first command after a reset is taken as the starting position
+            position[...] = cmd
+            self._initialized = True
+        else:
+            cmd -= position
+            cmd *= self.lag
+            batch_clamp(cmd, -self.max_step, self.max_step, out=cmd)
+            position += cmd
 
-    def run(self, control_input:ActuatorOutputs)-> ActuatorOutputs:
-        # Scale motor thrusts
-        self.output.quad.motor1 = linear_scale(control_input.quad.motor1, 1000, 2000, self.min_thrust, self.max_thrust)
-        self.output.quad.motor2 = linear_scale(control_input.quad.motor2, 1000, 2000, self.min_thrust, self.max_thrust)
-        self.output.quad.motor3 = linear_scale(control_input.quad.motor3, 1000, 2000, self.min_thrust, self.max_thrust)
-        self.output.quad.motor4 = linear_scale(control_input.quad.motor4, 1000, 2000, self.min_thrust, self.max_thrust)
-        self.output.fw.throttle = linear_scale(control_input.fw.throttle, 1000, 2000, self.min_thrust, self.max_thrust)
-        # Scale control surface deflections
-        self.output.fw.aileron = linear_scale(control_input.fw.aileron, 1000, 2000, self.min_deflection, self.max_deflection)
-        self.output.fw.elevator = linear_scale(control_input.fw.elevator, 1000, 2000, self.min_deflection, self.max_deflection)
-        self.output.fw.rudder = linear_scale(control_input.fw.rudder, 1000, 2000, self.min_deflection, self.max_deflection)
-        return self.output
+        return self.output if self.n_vehicles is None else position
@@ -0,0 +1,124 @@
+"""
+Compiled aerodynamic / inertial model.
+compile_vehicle() turns a vehicle-property dict (e.g. Aerosonde_vehicle) into a frozen AeroModel
+holding coefficient matrices and precomputed constants, so the per-step physics does a
+couple of dot products instead of dozens of string-keyed dict lookups.
+
+Aerodynamic coefficients [CL, CD, CY, Cl, Cm, Cn] = coeffs @ regressor, with the regressor
+laid out as REGRESSORS. The same model feeds the scalar and the batched simulation.
+"""
+
+from dataclasses import dataclass
+import numpy as np
+
+REGRESSORS = (
+    "1", "alpha", "|alpha|", "beta",
+    "p_hat", "q_hat", "|q_hat|", "r_hat",
+    "p", "r",  # raw body rates (side-force derivatives are not normalized)
+    "delta_a", "delta_e", "|delta_e|", "delta_r",
+)
+COEFFICIENTS = ("CL", "CD", "CY", "Cl", "Cm", "Cn")
+
+# (coefficient row, regressor column, vehicle-property key)
+_COEFF_MAP = (
+    ("CL", "1", "CL0"), ("CL", "alpha", "CL_alpha"), ("CL", "q_hat", "CLq"), ("CL", "delta_e", "CL_delta_e"),
+    ("CD", "1", "CD0"), ("CD", "|alpha|", "CD_alpha"), ("CD", "|q_hat|", "CDq"), ("CD", "|delta_e|", "CD_delta_e"),
+    ("CY", "1", "CY0"), ("CY", "beta", "CY_beta"), ("CY", "p", "CYp"), ("CY", "r", "CYr"),
+    ("CY", "delta_a", "CY_delta_a"), ("CY", "delta_r", "CY_delta_r"),
+    ("Cl", "1", "Cl0"), ("Cl", "beta", "Cl_beta"), ("Cl", "p_hat", "Clp"), ("Cl", "r_hat", "Clr"),
+    ("Cl", "delta_a", "Cl_delta_a"), ("Cl", "delta_r", "Cl_delta_r"),
+    ("Cm", "1", "Cm0"), ("Cm", "alpha", "Cm_alpha"), ("Cm", "q_hat", "Cmq"), ("Cm", "delta_e", "Cm_delta_e"),
+    ("Cn", "1", "Cn0"), ("Cn", "beta", "Cn_beta"), ("Cn", "p_hat", "Cnp"), ("Cn", "r_hat", "Cnr"),
+    ("Cn", "delta_a", "Cn_delta_a"), ("Cn", "delta_r", "Cn_delta_r"),
+)
+
+
+@dataclass(frozen=True)
+class AeroModel:
+    # Geometry and atmosphere
+    m: float
+    S: float
+    b: float
+    c: float
+    rho: float
+    weight: float  # m * g
+
+    # Quad rotor geometry
+    arm_length: float
+    k_yaw: float
+
+    # Coefficient matrix (6 x len(REGRESSORS)) and the same matrix pre-scaled by
+    # [S, S, S, S*b, S*c, S*b] so q_dyn * (force_matrix @ reg) = [lift, drag, Y, l, m, n]
+    coeffs: np.ndarray
+    force_matrix: np.ndarray
+
+    # Inertia terms
+    Jy: float
+    gamma1: float
+    gamma2: float
+    gamma3: float
+    gamma4: float
+    gamma5: float
+    gamma6: float
+    gamma7: float
+    gamma8: float
+
+
+def compile_vehicle(vehicle_prop) -> AeroModel:
+    """
+    Builds an AeroModel from a vehicle-property dict. An AeroModel is returned unchanged.
+    """
+    if isinstance(vehicle_prop, AeroModel):
+        return vehicle_prop
+    vp = vehicle_prop
+
+    coeffs = np.zeros((len(COEFFICIENTS), len(REGRESSORS)))
+    for row, col, key in _COEFF_MAP:
+        coeffs[COEFFICIENTS.index(row), REGRESSORS.index(col)] = vp[key]
+
+    S, b, c = vp["S"], vp["b"], vp["c"]
+    force_matrix = np.array([S, S, S, S * b, S * c, S * b])[:, None] * coeffs
+    coeffs.flags.writeable = False
+    force_matrix.flags.writeable = False
+
+    Jx, Jy, Jz, Jxz = vp["Jx"], vp["Jy"], vp["Jz"], vp["Jxz"]
+    gamma = Jx * Jz - Jxz**2
+
+    return AeroModel(
+        m=vp["m"],
+        S=S,
+        b=b,
+        c=c,
+        rho=vp["rho"],
+        weight=vp["m"] * 9.81,
+        arm_length=vp.get("quad_arm_length", 0.5),
+        k_yaw=vp.get("quad_yaw_coeff", 0.01),
+        coeffs=coeffs,
+        force_matrix=force_matrix,
+        Jy=Jy,
+        gamma1=(Jxz * (Jx - Jy + Jz)) / gamma,
+        gamma2=(Jz * (Jz - Jy) + Jxz**2) / gamma,
+        gamma3=Jz / gamma,
+        gamma4=Jxz / gamma,
+        gamma5=(Jz - Jx) / Jy,
+        gamma6=Jxz / Jy,
+        gamma7=((Jx - Jy) * Jx + Jxz**2) / gamma,
+        gamma8=Jx / gamma,
+    )
+
+
+def regressor(model: AeroModel, alpha, beta, p, q, r, inv_2V, aileron, elevator, rudder):
+    """
+    Regressor vector laid out as REGRESSORS. Works on scalars (shape (14,)) and on
+    arrays of N vehicles (shape (14, N)). inv_2V is 1 / (2 * airspeed), zero at rest.
+    """
+    p_hat = p * model.b * inv_2V
+    q_hat = q * model.c * inv_2V
+    r_hat = r * model.b * inv_2V
+    one = np.ones_like(alpha) if isinstance(alpha, np.ndarray) else 1.0
+    return np.array([
+        one, alpha, abs(alpha), beta,
+        p_hat, q_hat, abs(q_hat), r_hat,
+        p, r,
+        aileron, elevator, abs(elevator), rudder,
+    ])
@@ -0,0 +1,145 @@
+"""
+Integrators for the 6-DOF state.
+Each integrator advances a state array x by dt given a pure derivative function f(x) -> x_dot.
+Works on a single state (13,) or a batch (N, 13), since f is vectorized over leading axes.
+
+Available methods (see make_integrator):
+    "euler" - explicit Euler, 1 evaluation per step
+    "rk2"   - Heun / explicit trapezoid, 2 evaluations per step
+    "rk4"   - classic Runge-Kutta, 4 evaluations per step
+    "rk45"  - adaptive Dormand-Prince 5(4) with error control, sub-steps inside dt
+"""
+
+import numpy as np
+
+
+class Integrator:
+    name = ""
+    order = 0
+
+    def __init__(self):
+        self.n_evals = 0  # derivative evaluations since creation, used for cost comparison
+
+    def step(self, f, x: np.ndarray, dt: float) -> np.ndarray:
+        raise NotImplementedError
+
+
+class EulerIntegrator(Integrator):
+    name = "euler"
+    order = 1
+
+    def step(self, f, x, dt):
+        self.n_evals += 1
+        return x + dt * f(x)
+
+
+class RK2Integrator(Integrator):
+    name = "rk2"
+    order = 2
+
+    def step(self, f, x, dt):
+        k1 = f(x)
+        k2 = f(x + dt * k1)
+        self.n_evals += 2
+        return x + 0.5 * dt * (k1 + k2)
+
+
+class RK4Integrator(Integrator):
+    name = "rk4"
+    order = 4
+
+    def step(self, f, x, dt):
+        k1 = f(x)
+        k2 = f(x + 0.5 * dt * k1)
+        k3 = f(x + 0.5 * dt * k2)
+        k4 = f(x + dt * k3)
+        self.n_evals += 4
+        return x + dt / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+class DormandPrinceIntegrator(Integrator):
+    """
+    Adaptive RK45 (Dormand-Prince). Each call to step covers exactly dt, split into as many
+    internal sub-steps as the error tolerance requires. The accepted sub-step size is kept
+    between calls so steady flight settles on a few large sub-steps.
+    """
+
+    name = "rk45"
+    order = 5
+
+    # Butcher tableau
+    A = (
+        (),
+        (1 / 5,),
+        (3 / 40, 9 / 40),
+        (44 / 45, -56 / 15, 32 / 9),
+        (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+        (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+        (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+    )
+    B5 = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+    B4 = np.array([5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+    E = B5 - B4
+
+    def __init__(self, rtol: float = 1e-6, atol: float = 1e-8, max_substeps: int = 1000):
+        super().__init__()
+        self.rtol = rtol
+        self.atol = atol
+        self.max_substeps = max_substeps
+        self.h = None  # last accepted sub-step size
+        self.n_rejected = 0
+
+    def _attempt(self, f, x, h, k1):
+        k = [k1]
+        for i in range(1, 7):
+            xi = x + h * sum(a * kj for a, kj in zip(self.A[i], k))
+            k.append(f(xi))
+        self.n_evals += 6
+        x_new = x + h * sum(b * kj for b, kj in zip(self.B5, k) if b != 0)
+        err = h * sum(e * kj for e, kj in zip(self.E, k) if e != 0)
+        scale = self.atol + self.rtol * np.maximum(np.abs(x), np.abs(x_new))
+        err_norm = float(np.sqrt(np.mean((err / scale) ** 2)))
+        return x_new, err_norm, k[6]
+
+    def step(self, f, x, dt):
+        t = 0.0
+        h = dt if self.h is None else min(self.h, dt)
+        k1 = f(x)
+        self.n_evals += 1
+
+        for _ in range(self.max_substeps):
+            remaining = dt - t
+            if remaining <= 1e-12 * dt:
+                self.h = min(h, dt)
+                return x
+
+            h_try = min(h, remaining)
+            x_new, err_norm, k_last = self._attempt(f, x, h_try, k1)
+            factor = 5.0 if err_norm == 0 else min(5.0, max(0.2, 0.9 * err_norm ** -0.2))
+
+            if err_norm <= 1.0:
+                t += h_try
+                x, k1 = x_new, k_last  # first-same-as-last
+                # a sub-step clipped to the end of dt says nothing against the larger h
+                h = max(h, h_try * factor) if h_try < h else h_try * factor
+            else:
+                self.n_rejected += 1
+                h = h_try * factor
+
+        raise RuntimeError(f"rk45 exceeded {self.max_substeps} sub-steps in one dt={dt}")
+
+
+INTEGRATORS = {
+    "euler": EulerIntegrator,
+    "rk2": RK2Integrator,
+    "rk4": RK4Integrator,
+    "rk45": DormandPrinceIntegrator,
+}
+
+
+def make_integrator(name: str, **kwargs) -> Integrator:
+    """Creates an integrator by name, e.g. make_integrator("rk45", rtol=1e-5)."""
+    cls = INTEGRATORS.get(name.lower())
+    if cls is None:
+        raise ValueError(f"Unknown integrator '{name}', choose from {list(INTEGRATORS)}")
+    return cls(**kwargs)
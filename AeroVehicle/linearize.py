@@ -0,0 +1,202 @@
+"""
+Linearized state-space models of the 6-DOF vehicle.
+
+linearize() evaluates the Jacobians A = df/dx and B = df/du of the Euler-angle state derivative
+(states laid out as STATE_FIELDS, physical controls as CONTROL_FIELDS) by central differences.
+Every perturbed column of every operating point goes into one batch_state_derivative call,
+so a full (12 x 12, 12 x 8) linearization costs a single vectorized evaluation of 2 x (12 + 8) = 40 rows.
+
+The resulting LinearModel (deviation form: dx_dot = A dx + B du) can be split into the classic
+longitudinal / lateral subsystems, inspected through its eigenvalues, and discretized for fast
+linear propagation, e.g. of many state-feedback gain sets at once:
+
+    model = linearize_trim(Aerosonde_vehicle, get_trim_table(Aerosonde_vehicle).trim(Aerosonde_vehicle, 22.0))
+    lon = model.longitudinal().discretize(0.01)
+    responses = lon.closed_loop(gains, dx0, steps=500)  # gains (G, m, n) -> (G, 501, n)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.linalg import expm
+
+from AeroVehicle.aero_model import compile_vehicle
+from AeroVehicle.Batch_Sim import STATE_FIELDS, CONTROL_FIELDS, batch_state_derivative
+from Global.attitude import batch_euler_to_quaternion
+
+LONGITUDINAL_STATES = ("x_vel", "z_vel", "theta_rate", "theta", "z")
+LONGITUDINAL_CONTROLS = ("elevator", "throttle")
+LATERAL_STATES = ("y_vel", "phi_rate", "psi_rate", "phi", "psi")
+LATERAL_CONTROLS = ("aileron", "rudder")
+
+
+def euler_state_derivative(states: np.ndarray, controls: np.ndarray, model) -> np.ndarray:
+    """
+    Time derivative of (N, 12) Euler-angle states (STATE_FIELDS) for (N, 8) physical controls.
+    Forces and rigid-body motion come from batch_state_derivative; the attitude rows are the
+    ZYX Euler rates of the body rates.
+    """
+    model = compile_vehicle(model)
+    phi, theta = states[:, 6], states[:, 7]
+    x = np.empty((len(states), 13))
+    x[:, 0:6] = states[:, 0:6]
+    x[:, 6:10] = batch_euler_to_quaternion(phi, theta, states[:, 8])
+    x[:, 10:13] = states[:, 9:12]
+    x_dot = batch_state_derivative(x, controls, model)
+
+    p, q, r = states[:, 9], states[:, 10], states[:, 11]
+    sphi, cphi = np.sin(phi), np.cos(phi)
+    qr = q * sphi + r * cphi
+    f = np.empty(states.shape)
+    f[:, 0:6] = x_dot[:, 0:6]
+    f[:, 6] = p + qr * np.tan(theta)
+    f[:, 7] = q * cphi - r * sphi
+    f[:, 8] = qr / np.cos(theta)
+    f[:, 9:12] = x_dot[:, 10:13]
+    return f
+
+
+def linearize(vehicle_prop, x0, u0, rel_step: float = 1e-6):
+    """
+    Central-difference Jacobians at one or several operating points.
+
+    Args:
+        vehicle_prop: vehicle-property dict or AeroModel.
+        x0 (12,) or (P, 12): operating states laid out as STATE_FIELDS.
+        u0 (8,) or (P, 8): operating physical controls laid out as CONTROL_FIELDS.
+        rel_step (float): perturbation relative to max(1, |value|).
+
+    Returns:
+        LinearModel, or a list of P LinearModels for batched operating points.
+    """
+    model = compile_vehicle(vehicle_prop)
+    single = np.ndim(x0) == 1
+    x0 = np.atleast_2d(np.asarray(x0, dtype=float))
+    u0 = np.atleast_2d(np.asarray(u0, dtype=float))
+    n_points, n, m = len(x0), x0.shape[1], u0.shape[1]
+    k = n + m
+
+    # Rows per operating point: +h for every column, then -h for every column
+    z0 = np.hstack((x0, u0))  # (P, k)
+    h = rel_step * np.maximum(1.0, np.abs(z0))  # (P, k)
+    offsets = np.concatenate((np.eye(k), -np.eye(k)))  # (2k, k)
+    z = (z0[:, None, :] + offsets[None] * h[:, None, :]).reshape(n_points * 2 * k, k)
+
+    f = euler_state_derivative(z[:, :n], z[:, n:], model).reshape(n_points, 2, k, n)
+    J = (f[:, 0] - f[:, 1]) / (2.0 * h[:, :, None])  # (P, k, n): d f / d z_j in row j
+    J = J.transpose(0, 2, 1)  # (P, n, k)
+
+    models = [LinearModel(J[i, :, :n].copy(), J[i, :, n:].copy(), x0[i].copy(), u0[i].copy()) for i in range(n_points)]
+    return models[0] if single else models
+
+
+def linearize_trim(vehicle_prop, trim_point):
+    """LinearModel around a Trim.TrimPoint (position at the origin, heading north)."""
+    state = trim_point.state()
+    x0 = np.array([getattr(state, name) for name in STATE_FIELDS])
+    return linearize(vehicle_prop, x0, trim_point.physical_controls().as_array())
+
+
+@dataclass
+class LinearModel:
+    """Continuous-time deviation model dx_dot = A dx + B du around (x0, u0)."""
+
+    A: np.ndarray
+    B: np.ndarray
+    x0: np.ndarray
+    u0: np.ndarray
+    state_names: tuple = STATE_FIELDS
+    control_names: tuple = CONTROL_FIELDS
+
+    def subsystem(self, states, controls) -> "LinearModel":
+        """Model restricted to the named states and controls (e.g. a decoupled axis)."""
+        si = [self.state_names.index(s) for s in states]
+        ci = [self.control_names.index(c) for c in controls]
+        return LinearModel(self.A[np.ix_(si, si)], self.B[np.ix_(si, ci)], self.x0[si], self.u0[ci],
+                           tuple(states), tuple(controls))
+
+    def longitudinal(self) -> "LinearModel":
+        return self.subsystem(LONGITUDINAL_STATES, LONGITUDINAL_CONTROLS)
+
+    def lateral(self) -> "LinearModel":
+        return self.subsystem(LATERAL_STATES, LATERAL_CONTROLS)
+
+    def eigenvalues(self) -> np.ndarray:
+        return np.linalg.eigvals(self.A)
+
+    def modes(self) -> list[tuple[complex, float, float]]:
+        """(eigenvalue, natural frequency rad/s, damping ratio) per eigenvalue, sorted by frequency."""
+        result = []
+        for ev in self.eigenvalues():
+            wn = abs(ev)
+            result.append((ev, wn, -ev.real / wn if wn > 0 else 1.0))
+        return sorted(result, key=lambda mode: mode[1])
+
+    def discretize(self, dt: float) -> "DiscreteLinearModel":
+        """Zero-order-hold discretization (exact for piecewise-constant controls)."""
+        n, m = self.B.shape
+        M = np.zeros((n + m, n + m))
+        M[:n, :n] = self.A * dt
+        M[:n, n:] = self.B * dt
+        Md = expm(M)
+        return DiscreteLinearModel(Md[:n, :n], Md[:n, n:], dt, self)
+
+
+@dataclass
+class DiscreteLinearModel:
+    """dx[k+1] = Ad dx[k] + Bd du[k], with dx / du deviations from the operating point."""
+
+    Ad: np.ndarray
+    Bd: np.ndarray
+    dt: float
+    continuous: LinearModel
+
+    def propagate(self, dx0: np.ndarray, du: np.ndarray) -> np.ndarray:
+        """
+        Open-loop response, batched over leading axes.
+
+        Args:
+            dx0 (..., n): initial deviations.
+            du (..., T, m): control deviations per step.
+
+        Returns:
+            (..., T + 1, n) state deviations including dx0.
+        """
+        du = np.asarray(du, dtype=float)
+        steps = du.shape[-2]
+        dx = np.broadcast_to(np.asarray(dx0, dtype=float), du.shape[:-2] + (self.Ad.shape[0],))
+        out = np.empty(dx.shape[:-1] + (steps + 1, dx.shape[-1]))
+        out[..., 0, :] = dx
+        forced = du @ self.Bd.T  # (..., T, n), all input terms in one product
+        AdT = self.Ad.T
+        for k in range(steps):
+            out[..., k + 1, :] = out[..., k, :] @ AdT + forced[..., k, :]
+        return out
+
+    def closed_loop(self, gains: np.ndarray, dx0: np.ndarray, steps: int) -> np.ndarray:
+        """
+        Response under state feedback du = -K dx for many gain sets at once.
+
+        Args:
+            gains (G, m, n): feedback gains.
+            dx0 (n,) or (G, n): initial deviations.
+            steps (int): number of steps.
+
+        Returns:
+            (G, steps + 1, n) state deviations.
+        """
+        gains = np.asarray(gains, dtype=float)
+        closed = self.Ad[None] - self.Bd[None] @ gains  # (G, n, n)
+        dx = np.broadcast_to(np.asarray(dx0, dtype=float), (len(gains), self.Ad.shape[0]))
+        out = np.empty((len(gains), steps + 1, dx.shape[-1]))
+        out[:, 0] = dx
+        for k in range(steps):
+            out[:, k + 1] = np.einsum("gij,gj->gi", closed, out[:, k])
+        return out
+
+    def spectral_radius(self, gains: np.ndarray | None = None) -> np.ndarray:
+        """Largest |eigenvalue| of Ad (or of Ad - Bd K per gain set); < 1 means stable."""
+        if gains is None:
+            return np.max(np.abs(np.linalg.eigvals(self.Ad)))
+        closed = self.Ad[None] - self.Bd[None] @ np.asarray(gains, dtype=float)
+        return np.max(np.abs(np.linalg.eigvals(closed)), axis=-1)
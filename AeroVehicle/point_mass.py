@@ -0,0 +1,293 @@
+"""
+Reduced-order 3-DOF point-mass model, the fast fidelity tier.
+
+Instead of actuator commands it consumes the guidance setpoints (TargetSetpoints: QuadTarget and
+FWTarget) and replaces the inner control loops and 6-DOF dynamics with first-order responses:
+
+    FW   - airspeed and flight-path angle lag towards the airspeed / altitude setpoints,
+           bank is rate limited towards the roll setpoint, coordinated turn psi_dot = g tan(phi) / V
+    quad - NED velocity lags towards a proportional position / altitude command (speed and tilt
+           limited), heading turns towards the setpoint at a limited yaw rate
+
+State per vehicle: NED position and velocity plus roll, pitch (flight-path angle for FW) and heading,
+laid out as POINT_MASS_FIELDS. The step kernels are written once over a math namespace, so the same
+code runs on floats (PointMassSimulation, one vehicle) or on columns of an (N, 9) array
+(BatchPointMassSimulation, a fleet in one vectorized update). States convert to and from UAVState,
+so a vehicle can switch between this model and the full 6-DOF UAVSimulation at any step.
+Coarse studies can also use a much larger dt than the 6-DOF needs (0.1 s is fine).
+"""
+
+import math
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import numpy as np
+
+from AeroVehicle.aero_model import compile_vehicle
+from Global.fastmath import (
+    clamp, wrap_angle, euler_to_dcm, dcm_apply, dcm_apply_transpose, euler_to_quaternion,
+    batch_clamp, batch_wrap_angle, batch_euler_to_dcm, batch_dcm_apply, batch_euler_to_quaternion,
+)
+from Global.simdata import UAVState, UAVForces, TargetSetpoints
+
+POINT_MASS_FIELDS = ("x", "y", "z", "vn", "ve", "vd", "phi", "theta", "psi")
+TARGET_FIELDS = TargetSetpoints.field_names  # quad.x, quad.y, quad.altitude, quad.heading, fw.roll, fw.airspeed, fw.altitude
+G = 9.81
+
+# Math namespaces the kernels run on
+SCALAR_OPS = SimpleNamespace(
+    sin=math.sin, cos=math.cos, tan=math.tan, asin=math.asin, atan=math.atan, hypot=math.hypot,
+    sqrt=math.sqrt, maximum=max, minimum=min, clamp=clamp, wrap_angle=wrap_angle,
+)
+BATCH_OPS = SimpleNamespace(
+    sin=np.sin, cos=np.cos, tan=np.tan, asin=np.arcsin, atan=np.arctan, hypot=np.hypot,
+    sqrt=np.sqrt, maximum=np.maximum, minimum=np.minimum, clamp=batch_clamp, wrap_angle=batch_wrap_angle,
+)
+
+
+@dataclass
+class PointMassParams:
+    # fixed wing
+    tau_airspeed: float = 2.0  # s
+    max_acceleration: float = 3.0  # m/s^2 along the flight path
+    min_airspeed: float = 12.0  # m/s
+    k_altitude: float = 0.2  # climb rate (m/s) per metre of altitude error
+    tau_gamma: float = 1.0  # s
+    max_gamma: float = math.radians(15.0)
+    tau_roll: float = 0.3  # s
+    max_bank: float = math.radians(45.0)
+    max_roll_rate: float = math.radians(45.0)
+
+    # quad
+    k_position: float = 0.5  # velocity (m/s) per metre of position error
+    max_speed: float = 10.0  # m/s horizontal
+    max_vertical_speed: float = 3.0  # m/s
+    tau_velocity: float = 0.5  # s
+    max_tilt: float = math.radians(30.0)
+    k_heading: float = 1.0  # yaw rate (rad/s) per radian of heading error
+    max_yaw_rate: float = math.radians(60.0)
+
+
+# ---------- kernels (floats or arrays, selected by ops) ----------
+def fixed_wing_step(ops, s, roll_cmd, airspeed_cmd, z_cmd, dt, prm: PointMassParams):
+    """
+    One step of the coordinated-turn model.
+
+    Args:
+        s: the nine POINT_MASS_FIELDS values (floats or column arrays).
+        roll_cmd, airspeed_cmd, z_cmd: FWTarget roll, airspeed and altitude (NED z).
+
+    Returns:
+        The nine updated values.
+    """
+    x, y, z, vn, ve, vd, phi, gamma, chi = s
+
+    # airspeed
+    V = ops.maximum(ops.sqrt(vn * vn + ve * ve + vd * vd), prm.min_airspeed)
+    dV = ops.clamp((airspeed_cmd - V) / prm.tau_airspeed, -prm.max_acceleration, prm.max_acceleration)
+    V = ops.maximum(V + dV * dt, prm.min_airspeed)
+
+    # altitude -> climb rate -> flight-path angle (z is down)
+    sin_limit = math.sin(prm.max_gamma)
+    gamma_cmd = ops.asin(ops.clamp(prm.k_altitude * (z - z_cmd) / V, -sin_limit, sin_limit))
+    gamma = gamma + (gamma_cmd - gamma) * min(1.0, dt / prm.tau_gamma)
+
+    # bank (lag + rate limit) and coordinated turn
+    max_dphi = prm.max_roll_rate * dt
+    roll_cmd = ops.clamp(roll_cmd, -prm.max_bank, prm.max_bank)
+    phi = phi + ops.clamp((roll_cmd - phi) * min(1.0, dt / prm.tau_roll), -max_dphi, max_dphi)
+    chi = ops.wrap_angle(chi + G * ops.tan(phi) / V * dt)
+
+    horizontal = V * ops.cos(gamma)
+    vn, ve, vd = horizontal * ops.cos(chi), horizontal * ops.sin(chi), -V * ops.sin(gamma)
+    return x + vn * dt, y + ve * dt, z + vd * dt, vn, ve, vd, phi, gamma, chi
+
+
+def quad_step(ops, s, x_cmd, y_cmd, z_cmd, heading_cmd, dt, prm: PointMassParams):
+    """
+    One step of the multirotor model.
+
+    Args:
+        s: the nine POINT_MASS_FIELDS values (floats or column arrays).
+        x_cmd, y_cmd, z_cmd, heading_cmd: QuadTarget position, altitude (NED z) and heading.
+
+    Returns:
+        The nine updated values.
+    """
+    x, y, z, vn, ve, vd, phi, theta, psi = s
+
+    # position -> velocity command, horizontal speed limited as a vector
+    vn_cmd, ve_cmd = prm.k_position * (x_cmd - x), prm.k_position * (y_cmd - y)
+    k = ops.minimum(1.0, prm.max_speed / ops.maximum(ops.hypot(vn_cmd, ve_cmd), 1e-9))
+    vn_cmd, ve_cmd = vn_cmd * k, ve_cmd * k
+    vd_cmd = ops.clamp(prm.k_position * (z_cmd - z), -prm.max_vertical_speed, prm.max_vertical_speed)
+
+    # velocity lag, horizontal acceleration limited by the tilt
+    lag = 1.0 / max(prm.tau_velocity, dt)
+    an, ae, ad = (vn_cmd - vn) * lag, (ve_cmd - ve) * lag, (vd_cmd - vd) * lag
+    k = ops.minimum(1.0, G * math.tan(prm.max_tilt) / ops.maximum(ops.hypot(an, ae), 1e-9))
+    an, ae = an * k, ae * k
+    vn, ve, vd = vn + an * dt, ve + ae * dt, vd + ad * dt
+
+    # heading
+    yaw_rate = ops.clamp(prm.k_heading * ops.wrap_angle(heading_cmd - psi), -prm.max_yaw_rate, prm.max_yaw_rate)
+    psi = ops.wrap_angle(psi + yaw_rate * dt)
+
+    # tilt that produces the horizontal acceleration, in the heading frame
+    cpsi, spsi = ops.cos(psi), ops.sin(psi)
+    phi = ops.atan((-spsi * an + cpsi * ae) / G)
+    theta = -ops.atan((cpsi * an + spsi * ae) / G)
+    return x + vn * dt, y + ve * dt, z + vd * dt, vn, ve, vd, phi, theta, psi
+
+
+def body_rates(ops, phi, theta, dphi, dtheta, dpsi):
+    """Body rates p, q, r of the ZYX Euler-angle rates."""
+    sphi, cphi = ops.sin(phi), ops.cos(phi)
+    ctheta = ops.cos(theta)
+    return (
+        dphi - ops.sin(theta) * dpsi,
+        cphi * dtheta + sphi * ctheta * dpsi,
+        -sphi * dtheta + cphi * ctheta * dpsi,
+    )
+
+
+def _point_mass_state(state: UAVState) -> tuple:
+    # POINT_MASS_FIELDS of a UAVState (body velocity rotated to NED)
+    vn, ve, vd = dcm_apply_transpose(state.dcm(), (state.x_vel, state.y_vel, state.z_vel))
+    return state.x, state.y, state.z, vn, ve, vd, state.phi, state.theta, state.psi
+
+
+class PointMassSimulation:
+    """
+    Single-vehicle point-mass model with the UAVSimulation.simulate_one_step interface,
+    taking guidance setpoints instead of actuator commands. Runs on floats (no NumPy).
+    """
+
+    def __init__(self, vehicle_prop, dt, params: PointMassParams | None = None):
+        self.vehicle_prop = vehicle_prop
+        self.model = compile_vehicle(vehicle_prop)
+        self.dt = dt
+        self.params = params if params is not None else PointMassParams()
+        self.state: tuple = (0.0,) * len(POINT_MASS_FIELDS)
+        self.forces_moments: UAVForces = UAVForces()
+        self.output: UAVState = UAVState()
+        self._last = None  # state object last returned, to detect a state coming from another model
+
+    def simulate_one_step(self, current_state: UAVState, targets: TargetSetpoints, mode: str = "FW"):
+        """
+        Args:
+            current_state (UAVState): state to advance; taken over from any model (e.g. 6-DOF).
+            targets (TargetSetpoints): guidance setpoints.
+            mode (str): controller mode, "QD" flies the quad setpoints, anything else the FW ones.
+
+        Returns:
+            (UAVState, UAVForces) like UAVSimulation.simulate_one_step.
+        """
+        if current_state is not self._last:
+            self.state = _point_mass_state(current_state)  # first step, or handed over from another model
+        dt = self.dt
+        before = self.state
+        if mode == "QD":
+            quad = targets.quad
+            s = quad_step(SCALAR_OPS, before, quad.x, quad.y, quad.altitude, quad.heading, dt, self.params)
+        else:
+            fw = targets.fw
+            s = fixed_wing_step(SCALAR_OPS, before, fw.roll, fw.airspeed, fw.altitude, dt, self.params)
+        self.state = s
+
+        x, y, z, vn, ve, vd, phi, theta, psi = s
+        R = euler_to_dcm(phi, theta, psi)
+        rates = body_rates(
+            SCALAR_OPS, phi, theta,
+            wrap_angle(phi - before[6]) / dt, wrap_angle(theta - before[7]) / dt, wrap_angle(psi - before[8]) / dt,
+        )
+        self.output.set_rigid_body(
+            (x, y, z, *dcm_apply(R, (vn, ve, vd)), *euler_to_quaternion(phi, theta, psi), *rates), dcm=R
+        )
+
+        # net aero + thrust force implied by the motion: m R (a - g)
+        m = self.model.m
+        fx, fy, fz = dcm_apply(R, ((vn - before[3]) / dt * m, (ve - before[4]) / dt * m, ((vd - before[5]) / dt - G) * m))
+        self.forces_moments.assign((-fz, 0.0, fx, fy, fz, 0.0, 0.0, 0.0))
+
+        self._last = self.output
+        return self.output, self.forces_moments
+
+
+class BatchPointMassSimulation:
+    """
+    Point-mass fleet: simulate_one_step advances all N vehicles from an (N, 7) setpoint array
+    laid out as TARGET_FIELDS and a per-vehicle fixed-wing mask.
+    """
+
+    def __init__(self, vehicle_prop, dt, n_vehicles: int, params: PointMassParams | None = None):
+        self.model = compile_vehicle(vehicle_prop)
+        self.dt = dt
+        self.n_vehicles = n_vehicles
+        self.params = params if params is not None else PointMassParams()
+        self.x = np.zeros((n_vehicles, len(POINT_MASS_FIELDS)))
+        self.accel = np.zeros((n_vehicles, 3))  # NED acceleration of the last step
+        self.rates = np.zeros((n_vehicles, 3))  # body rates p, q, r implied by the last step
+        self.fixed_wing = np.ones(n_vehicles, dtype=bool)
+
+    # ---------- UAVState conversion ----------
+    def set_state(self, i: int, state: UAVState):
+        self.x[i] = _point_mass_state(state)
+        self.accel[i] = 0.0
+        self.rates[i] = (state.phi_rate, state.theta_rate, state.psi_rate)
+
+    def rigid_body(self) -> np.ndarray:
+        """(N, 13) rigid-body rows (RIGID_BODY_FIELDS) of the fleet."""
+        x = self.x
+        rb = np.empty((len(x), 13))
+        rb[:, 0:3] = x[:, 0:3]
+        rb[:, 3:6] = batch_dcm_apply(batch_euler_to_dcm(x[:, 6], x[:, 7], x[:, 8]), x[:, 3:6])
+        rb[:, 6:10] = batch_euler_to_quaternion(x[:, 6], x[:, 7], x[:, 8])
+        rb[:, 10:13] = self.rates
+        return rb
+
+    def get_state(self, i: int, out: UAVState | None = None) -> UAVState:
+        out = UAVState() if out is None else out
+        out.set_rigid_body(self.rigid_body()[i])
+        return out
+
+    # ---------- simulation ----------
+    def simulate_one_step(self, targets: np.ndarray, fixed_wing: np.ndarray | None = None) -> np.ndarray:
+        """
+        Args:
+            targets (N, 7): setpoints laid out as TARGET_FIELDS.
+            fixed_wing (N,) bool: True flies the FW setpoints, False the quad ones (default: keep the mask).
+
+        Returns:
+            The updated (N, 9) point-mass state.
+        """
+        if fixed_wing is not None:
+            self.fixed_wing[:] = fixed_wing
+        x, dt, prm = self.x, self.dt, self.params
+        before = x.copy()
+
+        fw = self.fixed_wing
+        if fw.all():
+            x[:] = np.column_stack(fixed_wing_step(BATCH_OPS, x.T, *targets[:, 4:7].T, dt, prm))
+        else:
+            quad = ~fw
+            if fw.any():
+                x[fw] = np.column_stack(fixed_wing_step(BATCH_OPS, x[fw].T, *targets[fw, 4:7].T, dt, prm))
+            x[quad] = np.column_stack(quad_step(BATCH_OPS, x[quad].T, *targets[quad, 0:4].T, dt, prm))
+
+        self.accel = (x[:, 3:6] - before[:, 3:6]) / dt
+        d = batch_wrap_angle(x[:, 6:9] - before[:, 6:9]) / dt
+        self.rates = np.column_stack(body_rates(BATCH_OPS, x[:, 6], x[:, 7], d[:, 0], d[:, 1], d[:, 2]))
+        return x
+
+    def forces(self) -> np.ndarray:
+        """
+        (N, 8) UAVForces rows implied by the motion: net aero + thrust force m R (a - g) in body
+        axes, lift taken as -fz. Drag and moments are not modelled.
+        """
+        R = batch_euler_to_dcm(self.x[:, 6], self.x[:, 7], self.x[:, 8])
+        F = self.model.m * batch_dcm_apply(R, self.accel - np.array([0.0, 0.0, G]))
+        out = np.zeros((len(self.x), len(UAVForces.field_names)))
+        out[:, 0] = -F[:, 2]
+        out[:, 2:5] = F
+        return out
@@ -14,15 +14,17 @@ class AutoNavigation:
         self._transition = False
 
         self.flags = ControllerFlags()
+        self.targets: TargetSetpoints = TargetSetpoints()
 
-    def run(self, gcs_data: GCSData, state: UAVState) -> tuple[TargetSetpoints, ControllerFlags]:
-        targets = TargetSetpoints()
+    def run(self, gcs_data: GCSData, state: UAVState, dt: float) -> tuple[TargetSetpoints, ControllerFlags]:
+        targets = self.targets
+        targets.clear()  # reused every tick instead of reallocated
         command = self.gcs_data.command.upper()
         armed = state.armed
         self.gcs_data = gcs_data
 
         # Get target waypoint from planner
-        mission_track = self.navigator.update(state, self.gcs_data)
+        mission_track = self.navigator.update(state, self.gcs_data, dt)
 
         # ----- Safety: if disarmed, hold everything -----
         # if not armed:
@@ -64,5 +66,5 @@ class AutoNavigation:
 
         # ----- Mission Flight (FW mode) -----
         self.flags.current_mode = "FW"
-        targets.fw = self.guidance.run(state, mission_track)
+        targets.fw = self.guidance.run(state, mission_track)  # copied in place
         return targets, self.flags
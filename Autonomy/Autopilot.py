@@ -3,7 +3,7 @@ import numpy as np
 from Autonomy.Path_planning import WaypointNavigator
 from Autonomy.Controller import ControllerManager
 from Autonomy.Mixer import Mixer
-from Global.simdata import GCSData, ActuatorOutputs, UAVState, Waypoint
+from Global.simdata import GCSData, ActuatorOutputs, UAVState, Waypoint, TargetSetpoints, ControllerFlags
 from Autonomy.FMM import Flight_Mode_manager
 
 class UAVAutopilot:
@@ -11,14 +11,16 @@ class UAVAutopilot:
     Main Autopilot class for computing actuator commands based on flight mode, navigation goals, and current state.
     """
 
-    def __init__(self, GCS_data:GCSData, dt:float):
+    def __init__(self, GCS_data:GCSData, dt:float, nav_dt:float | None = None):
         """
         Args:
 
             waypoints (list): List of 3D waypoints.
             dt (float): Autopilot loop timestep.
+            nav_dt (float): run_navigation period when it runs at a lower rate than run_control, default dt.
         """
         self.dt = dt
+        self.nav_dt = dt if nav_dt is None else nav_dt
 
         # Flight mode manager
         self.FMM = Flight_Mode_manager(GCS_data)
@@ -29,16 +31,38 @@ class UAVAutopilot:
         # mixer
         self.mixer = Mixer()
 
+        # latest navigation target, tracked by the control stage between navigation updates
+        self.nav_target: TargetSetpoints = TargetSetpoints()
+        self.controller_flags: ControllerFlags = ControllerFlags()
+        self.output: ActuatorOutputs = ActuatorOutputs()
+
+
+    def seed_trim(self, trim_pwm: ActuatorOutputs, state: UAVState):
+        """Starts the FW loops holding the trim PWM from the trimmed state (see Simulation.scenario.start_in_trim)."""
+        self.controller_mgr.fw_controller.seed_trim(trim_pwm.fw, state)
+        self.output.assign(trim_pwm.as_array())
 
     def run(self, current_state: UAVState, GCSdata: GCSData):
         """
         Main funciton which calculated the Actuator outputs for the autopilot
         """
+        self.run_navigation(current_state, GCSdata)
+        return self.run_control(current_state, GCSdata)
 
-        nav_target, controller_flags = self.FMM.run(GCSdata, current_state)
+    def run_navigation(self, current_state: UAVState, GCSdata: GCSData):
+        """
+        Flight mode manager, waypoint navigation and guidance. Can run at a lower rate than run_control.
+        """
+        self.nav_target, self.controller_flags = self.FMM.run(GCSdata, current_state, self.nav_dt)
+        return self.nav_target, self.controller_flags
 
-        mixer_input = self.controller_mgr.run(current_state, nav_target, controller_flags)
+    def run_control(self, current_state: UAVState, GCSdata: GCSData):
+        """
+        Controllers and mixer, tracking the latest navigation target. Runs at the rate given by dt.
+        """
+        mixer_input = self.controller_mgr.run(current_state, self.nav_target, self.controller_flags)
 
-        self.output = self.mixer.run(GCSdata.mode, mixer_input)
+        # mixing table follows the controller mode chosen by the FMM (FW, QD, TRANSITION, SHUTDOWN)
+        self.output = self.mixer.run(self.controller_flags.current_mode, mixer_input)
 
         return self.output
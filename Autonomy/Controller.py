@@ -4,12 +4,40 @@ from Autonomy.quad_controller import QuadController
 import numpy as np
 from Global.simdata import ControllerFlags, UAVState, TargetSetpoints, ControlOutputs
 
+GAIN_TERMS = ("kp", "ki", "kd")
+
+
 class ControllerManager:
     def __init__(self, dt):
         self.fw_controller = FixedWingController(dt)
         self.quad_controller = QuadController(dt)
         self.output : ControlOutputs = ControlOutputs()
 
+    def _banks(self) -> dict:
+        return {"fw": self.fw_controller.pids, "quad": self.quad_controller.pids}
+
+    def get_gains(self) -> dict:
+        """Every PID gain as a flat dict keyed "<fw|quad>.<loop>.<kp|ki|kd>"."""
+        gains = {}
+        for prefix, bank in self._banks().items():
+            for name in bank.names:
+                loop = bank[name]
+                for term in GAIN_TERMS:
+                    gains[f"{prefix}.{name}.{term}"] = float(getattr(loop, term))
+        return gains
+
+    def set_gains(self, gains: dict):
+        """Overrides PID gains from a flat dict keyed like get_gains (unknown keys are reported and skipped)."""
+        banks = self._banks()
+        for key, value in gains.items():
+            prefix, _, rest = key.partition(".")
+            name, _, term = rest.rpartition(".")
+            bank = banks.get(prefix)
+            if bank is None or name not in bank.names or term not in GAIN_TERMS:
+                print(f"[ERROR] Unknown PID gain '{key}'")
+                continue
+            bank[name].update_gains(**{term: value})
+
     def run(self, current_state: UAVState, target: TargetSetpoints, flags: ControllerFlags):
 
         # run controller
@@ -7,11 +7,11 @@ class Flight_Mode_manager:
         self.controller_flags: ControllerFlags = ControllerFlags()
         self.target_output: TargetSetpoints = TargetSetpoints()
 
-    def run(self, GCS_data: GCSData, UAV_state: UAVState):
+    def run(self, GCS_data: GCSData, UAV_state: UAVState, dt: float):
 
         match GCS_data.mode.upper():
             case "AUTO":
-                self.target_output, self.controller_flags = self.auto_nav.run(GCS_data, UAV_state)
+                self.target_output, self.controller_flags = self.auto_nav.run(GCS_data, UAV_state, dt)
             case "QD_POSHOLD":
                 self.controller_flags.current_mode = "QD"
                 self.target_output.quad.x = GCS_data.mission.track.target.x
@@ -1,105 +1,216 @@
+from dataclasses import dataclass, field
+
 import numpy as np
-from Global.utils import linear_scale
 import Global.configs as configs
+from Global.fastmath import batch_clamp
 from Global.simdata import ActuatorOutputs, ControlOutputs
 
 """
 Mixer class for converting control surface and motor commands to PWM signals.
 This class is designed to work with different flight modes, including quadPlane.
 Output will be in the range of 1000 to 2000 microseconds.
+
+Mixing is table driven: for each airframe and controller mode a MixerTable maps the
+normalized controller axes (ControlOutputs, fw stick range and quad [-1, 1]) to normalized
+actuator commands in [-1, 1] (ActuatorOutputs layout, -1 = PWM_min / motor off, 0 = centred
+surface, 1 = PWM_max) with one matrix multiply, for one vehicle or a batch of vehicles.
+Motor groups are desaturated with a priority: "attitude" keeps the roll/pitch/yaw split and
+gives up collective thrust, "thrust" keeps the collective and scales the attitude demand.
 """
 
+INPUT_FIELDS = ControlOutputs.field_names  # fw.throttle ... quad.yaw
+OUTPUT_FIELDS = ActuatorOutputs.field_names  # quad.motor1-4, fw.throttle ... fw.rudder
+
+# Normalized input per unit of each controller axis: fw axes are in stick units, quad axes in [-1, 1]
+_STICK_HALF_RANGE = (configs.stick_input_max - configs.stick_input_min) / 2
+INPUT_SCALE = np.array([1.0 / _STICK_HALF_RANGE] * 4 + [1.0] * 4)
+
+# Quad X motor geometry (see AeroVehicle/Dynamics.py): roll left - right, pitch front - back, yaw CCW - CW
+QUAD_X_GEOMETRY = {
+    "quad.motor1": {"quad.roll": 1.0, "quad.pitch": 1.0, "quad.yaw": 1.0},  # LF (CCW)
+    "quad.motor2": {"quad.roll": -1.0, "quad.pitch": 1.0, "quad.yaw": -1.0},  # RF (CW)
+    "quad.motor3": {"quad.roll": -1.0, "quad.pitch": -1.0, "quad.yaw": 1.0},  # RB (CCW)
+    "quad.motor4": {"quad.roll": 1.0, "quad.pitch": -1.0, "quad.yaw": -1.0},  # LB (CW)
+}
+QUAD_MOTORS = tuple(QUAD_X_GEOMETRY)
+FW_SURFACES = ("fw.aileron", "fw.elevator", "fw.rudder")
+
+
+@dataclass
+class MotorGroup:
+    outputs: tuple  # output names desaturated together
+    thrust: str  # input axis giving the collective
+    priority: str = "attitude"  # "attitude" or "thrust"
+
+
+@dataclass
+class MixerTable:
+    """
+    Affine map from normalized controller axes to normalized actuator commands:
+        command = matrix @ (INPUT_SCALE * inputs) + offset, then desaturated and clipped to [-1, 1]
+    """
+
+    matrix: np.ndarray  # (len(OUTPUT_FIELDS), len(INPUT_FIELDS))
+    offset: np.ndarray  # (len(OUTPUT_FIELDS),)
+    groups: tuple = ()  # MotorGroup entries
+    _group_index: list = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        self.matrix = np.asarray(self.matrix, dtype=float)
+        self.offset = np.asarray(self.offset, dtype=float)
+        if self.matrix.shape != (len(OUTPUT_FIELDS), len(INPUT_FIELDS)) or self.offset.shape != (len(OUTPUT_FIELDS),):
+            raise ValueError(f"Mixer matrix must be {len(OUTPUT_FIELDS)}x{len(INPUT_FIELDS)} with a matching offset")
+        for group in self.groups:
+            if group.priority not in ("attitude", "thrust"):
+                raise ValueError(f"Unknown mixer priority '{group.priority}'")
+        # rows (a slice when adjacent), thrust column, its gains and offsets, and priority per group
+        self._group_index = []
+        for g in self.groups:
+            idx = [OUTPUT_FIELDS.index(n) for n in g.outputs]
+            rows = slice(idx[0], idx[-1] + 1) if idx == list(range(idx[0], idx[-1] + 1)) else np.array(idx)
+            col = INPUT_FIELDS.index(g.thrust)
+            self._group_index.append((rows, col, self.matrix[rows, col].copy(), self.offset[rows].copy(), g.priority))
+
+    @classmethod
+    def from_rows(cls, rows: dict, offsets: dict | None = None, groups: tuple = ()):
+        """
+        Builds a table from named entries, e.g. {"fw.aileron": {"fw.aileron": 1.0}}.
+        Outputs not in `offsets` sit at 0 when they receive no input; missing entries are 0.
+        """
+        matrix = np.zeros((len(OUTPUT_FIELDS), len(INPUT_FIELDS)))
+        for out_name, row in rows.items():
+            for in_name, gain in row.items():
+                matrix[OUTPUT_FIELDS.index(out_name), INPUT_FIELDS.index(in_name)] = gain
+        offset = np.zeros(len(OUTPUT_FIELDS))
+        for out_name, value in (offsets or {}).items():
+            offset[OUTPUT_FIELDS.index(out_name)] = value
+        return cls(matrix * INPUT_SCALE, offset, groups)
+
+    def mix(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            inputs (np.ndarray): (N, len(INPUT_FIELDS)) controller axes.
+
+        Returns:
+            np.ndarray: (N, len(OUTPUT_FIELDS)) normalized commands in [-1, 1].
+        """
+        commands = inputs @ self.matrix.T
+        commands += self.offset
+        for rows, col, thrust_gain, thrust_offset, priority in self._group_index:
+            group = commands[:, rows]
+            if group.max() > 1.0 or group.min() < -1.0:
+                thrust = inputs[:, col, None] * thrust_gain
+                thrust += thrust_offset
+                commands[:, rows] = desaturate(thrust, group - thrust, priority)
+        batch_clamp(commands, -1.0, 1.0, out=commands)
+        return commands
+
+
+def desaturate(thrust: np.ndarray, attitude: np.ndarray, priority: str = "attitude",
+               lower: float = -1.0, upper: float = 1.0) -> np.ndarray:
+    """
+    Fits thrust + attitude motor commands (N, motors) into [lower, upper].
+
+    "attitude": the attitude split is scaled down only if its spread exceeds the range,
+                then the whole group shifts to fit (collective thrust is sacrificed).
+    "thrust":   the collective is clipped to the range, then the attitude split is scaled
+                by the largest factor in [0, 1] that keeps every motor inside it.
+    """
+    if priority == "attitude":
+        span = attitude.max(axis=1) - attitude.min(axis=1)
+        scale = np.minimum(1.0, (upper - lower) / np.maximum(span, 1e-12))
+        commands = thrust + attitude * scale[:, None]
+        commands -= np.maximum(commands.max(axis=1) - upper, 0.0)[:, None]
+        commands += np.maximum(lower - commands.min(axis=1), 0.0)[:, None]
+        return commands
+
+    thrust = batch_clamp(thrust, lower, upper)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        room = np.where(attitude > 0, (upper - thrust) / attitude, np.where(attitude < 0, (lower - thrust) / attitude, np.inf))
+    scale = batch_clamp(room.min(axis=1), 0.0, 1.0)
+    return thrust + attitude * scale[:, None]
+
+
+# ---------- airframe tables ----------
+def _motors_off():
+    return {name: -1.0 for name in QUAD_MOTORS}
+
+
+def _fw_rows():
+    return {name: {name: 1.0} for name in ("fw.throttle",) + FW_SURFACES}
+
+
+def _quad_rows():
+    return {name: {"quad.throttle": 1.0, **geometry} for name, geometry in QUAD_X_GEOMETRY.items()}
+
+
+def quadplane_tables(priority: str = "attitude") -> dict:
+    """Quad X lift motors plus a fixed-wing pusher and surfaces (the default vehicle)."""
+    quad_group = (MotorGroup(QUAD_MOTORS, "quad.throttle", priority),)
+    return {
+        "FW": MixerTable.from_rows(_fw_rows(), _motors_off()),
+        "QD": MixerTable.from_rows(_quad_rows(), {"fw.throttle": -1.0}, quad_group),
+        "TRANSITION": MixerTable.from_rows({**_quad_rows(), **_fw_rows()}, groups=quad_group),
+        "SHUTDOWN": MixerTable.from_rows({}, {**_motors_off(), "fw.throttle": -1.0}),
+    }
+
+
+def quad_tables(priority: str = "attitude") -> dict:
+    """Quad X only: every mode flies on the lift motors."""
+    quad = MixerTable.from_rows(_quad_rows(), {"fw.throttle": -1.0}, (MotorGroup(QUAD_MOTORS, "quad.throttle", priority),))
+    return {
+        "FW": quad,
+        "QD": quad,
+        "TRANSITION": quad,
+        "SHUTDOWN": MixerTable.from_rows({}, {**_motors_off(), "fw.throttle": -1.0}),
+    }
+
+
+AIRFRAMES = {
+    "quadplane": quadplane_tables,
+    "quad": quad_tables,
+}
+
 
 class Mixer:
-    def __init__(self):
+    def __init__(self, airframe: str = "quadplane", priority: str = "attitude", tables: dict | None = None):
+        """
+        Args:
+            airframe (str): key of AIRFRAMES, ignored when tables are given.
+            priority (str): motor desaturation priority, "attitude" or "thrust".
+            tables (dict): controller mode ("FW", "QD", "TRANSITION", "SHUTDOWN") -> MixerTable.
+        """
+        if tables is None:
+            if airframe not in AIRFRAMES:
+                raise ValueError(f"Unknown airframe '{airframe}', choose from {tuple(AIRFRAMES)}")
+            tables = AIRFRAMES[airframe](priority)
+        self.tables = {mode.upper(): table for mode, table in tables.items()}
+        self.pwm_mid = (configs.PWM_max + configs.PWM_min) / 2
+        self.pwm_half_range = (configs.PWM_max - configs.PWM_min) / 2
         self.output: ActuatorOutputs = ActuatorOutputs()
         self.input: ControlOutputs = ControlOutputs()
 
-    def run(self, mode: str, input: ControlOutputs)-> ActuatorOutputs:
-        self.input = input
-        match (mode.upper()):
-            case "AUTO":
-                self.output.fw.throttle = linear_scale(
-                    self.input.fw.throttle,
-                    in_min=configs.stick_input_min,
-                    in_max=configs.stick_input_max,
-                    out_min=configs.PWM_min,
-                    out_max=configs.PWM_max,
-                )
-
-                # Assign values to the 3 control surfaces (indices 0 to 2)
-                self.output.fw.aileron = linear_scale(
-                    self.input.fw.aileron,
-                    in_min=configs.stick_input_min,
-                    in_max=configs.stick_input_max,
-                    out_min=configs.PWM_min,
-                    out_max=configs.PWM_max,
-                )
-                self.output.fw.elevator = linear_scale(
-                    self.input.fw.elevator,
-                    in_min=configs.stick_input_min,
-                    in_max=configs.stick_input_max,
-                    out_min=configs.PWM_min,
-                    out_max=configs.PWM_max,
-                )
-                self.output.fw.rudder = linear_scale(
-                    self.input.fw.rudder,
-                    in_min=configs.stick_input_min,
-                    in_max=configs.stick_input_max,
-                    out_min=configs.PWM_min,
-                    out_max=configs.PWM_max,
-                )
-
-                self.output.quad.motor1 = 0
-                self.output.quad.motor2 = 0
-                self.output.quad.motor3 = 0
-                self.output.quad.motor4 = 0
-
-            case "SHUTDOWN":
-                self.output.quad.motor1 = 0
-                self.output.quad.motor2 = 0
-                self.output.quad.motor3 = 0
-                self.output.quad.motor4 = 0
-                self.output.fw.throttle = 0
-                self.output.fw.aileron = 0
-                self.output.fw.elevator = 0
-                self.output.fw.rudder = 0
-
-            # case "manual":
-            #     self.motor = mixerinput[0:5]
-            #     self.ctrl_surface = mixerinput[5:]
-            #     self.motor_pwm[0:4] = [0] * 4
-            #     self.motor_pwm[4] = linear_scale(
-            #         self.motor[4],
-            #         in_min=configs.stick_input_min,
-            #         in_max=configs.stick_input_min,
-            #         out_min=configs.PWM_min,
-            #         out_max=configs.PWM_max,
-            #     )
-
-            #     # Assign values to the 3 control surfaces (indices 0 to 2)
-            #     self.ctrl_surface_pwm[0] = linear_scale(
-            #         self.ctrl_surface[0],
-            #         in_min=configs.stick_input_min,
-            #         in_max=configs.stick_input_min,
-            #         out_min=configs.PWM_min,
-            #         out_max=configs.PWM_max,
-            #     )
-            #     self.ctrl_surface_pwm[1] = linear_scale(
-            #         self.ctrl_surface[1],
-            #         in_min=configs.stick_input_min,
-            #         in_max=configs.stick_input_min,
-            #         out_min=configs.PWM_min,
-            #         out_max=configs.PWM_max,
-            #     )
-            #     self.ctrl_surface_pwm[2] = linear_scale(
-            #         self.ctrl_surface[2],
-            #         in_min=configs.stick_input_min,
-            #         in_max=configs.stick_input_min,
-            #         out_min=configs.PWM_min,
-            #         out_max=configs.PWM_max,
-            #     )
-            #     self.output = self.motor_pwm + self.ctrl_surface_pwm
-            #     return self.output
+    def table(self, mode: str) -> MixerTable:
+        """Table for a controller mode; unknown modes (e.g. before the first navigation update) shut down."""
+        return self.tables.get(mode.upper()) or self.tables["SHUTDOWN"]
 
+    def mix(self, mode: str, inputs: np.ndarray) -> np.ndarray:
+        """
+        Batch mixing.
+
+        Args:
+            mode (str): controller mode.
+            inputs (np.ndarray): (N, 8) controller axes laid out as ControlOutputs.
+
+        Returns:
+            np.ndarray: (N, 8) PWM commands laid out as ActuatorOutputs.
+        """
+        commands = self.table(mode).mix(np.atleast_2d(inputs))
+        commands *= self.pwm_half_range
+        commands += self.pwm_mid
+        return commands
+
+    def run(self, mode: str, input: ControlOutputs) -> ActuatorOutputs:
+        self.input = input
+        self.output.assign(self.mix(mode, input.as_array())[0])
         return self.output
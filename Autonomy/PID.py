@@ -1,4 +1,5 @@
 import numpy as np
+from Global.fastmath import clamp
 
 class PID_class:
     def __init__(self, kp=0.5, ki=0.01, kd=0.1):
@@ -46,7 +47,7 @@ class PID_class:
             self.integral_sum = 0.0
             self.reset_integral = False
         self.integral_sum += error * dt
-        self.integral_sum = np.clip(self.integral_sum, *self.integral_limits)
+        self.integral_sum = clamp(self.integral_sum, *self.integral_limits)
         I = self.ki * self.integral_sum
 
         # --- Derivative (on measurement)
@@ -55,10 +56,275 @@ class PID_class:
 
         # --- Compute output
         output = P + I + D
-        output = np.clip(output, *self.output_limits)
+        output = clamp(output, *self.output_limits)
 
         # --- Save state
         self.previous_error = error
         self.last_input = current
 
         return output
+
+
+class PIDLoop:
+    """
+    Named view of one loop of a PIDBank, with the PID_class interface
+    (gains, limits, reset_integral flag, run_pid) for code that addresses a single loop.
+    Reads and writes go to the bank arrays, for every vehicle of the bank at once.
+    """
+
+    __slots__ = ("bank", "name", "index")
+
+    def __init__(self, bank, name):
+        self.bank = bank
+        self.name = name
+        self.index = bank.names.index(name)
+
+    def _get(self, array):
+        value = array[..., self.index]
+        return value if value.ndim else float(value)
+
+    kp = property(lambda self: self._get(self.bank.kp), lambda self, v: self.update_gains(kp=v))
+    ki = property(lambda self: self._get(self.bank.ki), lambda self, v: self.update_gains(ki=v))
+    kd = property(lambda self: self._get(self.bank.kd), lambda self, v: self.update_gains(kd=v))
+    integral_sum = property(lambda self: self._get(self.bank.integral_sum))
+    previous_error = property(lambda self: self._get(self.bank.previous_error))
+    last_input = property(lambda self: self._get(self.bank.last_input))
+
+    @property
+    def output_limits(self):
+        return self._get(self.bank.output_lower), self._get(self.bank.output_upper)
+
+    @property
+    def integral_limits(self):
+        return self._get(self.bank.integral_lower), self._get(self.bank.integral_upper)
+
+    @property
+    def reset_integral(self):
+        return bool(np.any(self.bank.reset_flags[..., self.index]))
+
+    @reset_integral.setter
+    def reset_integral(self, value):
+        if value:
+            self.bank.reset_integrals(self.name)
+        else:
+            self.bank.reset_flags[..., self.index] = False
+
+    def update_gains(self, kp=None, ki=None, kd=None):
+        self.bank.update_gains(self.name, kp=kp, ki=ki, kd=kd)
+
+    def set_output_limits(self, lower, upper):
+        self.bank.set_output_limits(self.name, lower, upper)
+
+    def set_integral_limits(self, lower, upper):
+        self.bank.set_integral_limits(self.name, lower, upper)
+
+    def run_pid(self, target, current, dt):
+        output = self.bank.run(np.atleast_1d(target), np.atleast_1d(current), dt, self.name)
+        return output[..., 0] if output.ndim > 1 else output[0]
+
+
+class PIDBank:
+    """
+    Gains, limits, integrators and last inputs of many PID loops (and optionally many
+    vehicles) held in arrays, so a whole stage of a cascade updates in one vectorized call.
+    Each loop follows PID_class.run_pid exactly: per-loop integrator reset flag, integral
+    clamped to its limits (anti-windup), derivative on measurement, clamped output.
+
+    Arrays are shaped (n_loops,) for a single vehicle or (n_vehicles, n_loops).
+    Loops that run together should be adjacent in `names` so that a stage is a slice (a view)
+    of the arrays rather than a gather:
+
+        bank = PIDBank(["roll", "pitch", "roll_rate", "pitch_rate"])
+        bank.add_stage("angle", ["roll", "pitch"])
+        rate_cmd = bank.run((roll_sp, pitch_sp), (state.phi, state.theta), dt, "angle")
+    """
+
+    def __init__(self, names, n_vehicles: int | None = None, kp=0.5, ki=0.01, kd=0.1):
+        """
+        Args:
+            names (list[str]): loop names, in array order.
+            n_vehicles (int): adds a leading vehicle axis when given.
+            kp, ki, kd (float): initial gains of every loop (PID_class defaults).
+        """
+        self.names = list(names)
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("PID loop names must be unique")
+        self.n_vehicles = n_vehicles
+        shape = (len(self.names),) if n_vehicles is None else (n_vehicles, len(self.names))
+
+        # Gains
+        self.kp = np.full(shape, float(kp))
+        self.ki = np.full(shape, float(ki))
+        self.kd = np.full(shape, float(kd))
+
+        # Limits
+        self.output_lower = np.full(shape, -1.0)
+        self.output_upper = np.full(shape, 1.0)
+        self.integral_lower = np.full(shape, -10.0)
+        self.integral_upper = np.full(shape, 10.0)
+
+        # Internal state
+        self.integral_sum = np.zeros(shape)
+        self.previous_error = np.zeros(shape)
+        self.last_input = np.zeros(shape)
+
+        # Reset flags, consumed by the next run of each loop
+        self.reset_flags = np.zeros(shape, dtype=bool)
+        self._reset_pending = False
+
+        self.stages: dict[str, slice | np.ndarray] = {}
+        self._selections: dict = {}
+        self._loops = {name: PIDLoop(self, name) for name in self.names}
+
+    def __getitem__(self, name) -> PIDLoop:
+        return self._loops[name]
+
+    def __contains__(self, name):
+        return name in self._loops
+
+    def __len__(self):
+        return len(self.names)
+
+    def items(self):
+        return self._loops.items()
+
+    # ---------- loop selection ----------
+    def select(self, loops=None):
+        """
+        Array index for a stage name, a loop name, a list of loop names or None (all loops).
+        Adjacent loops resolve to a slice, so the stage arrays are views.
+        """
+        return self._resolve(loops)[0]
+
+    def _resolve(self, loops):
+        # (array index, per-array views or None), cached per selection key
+        key = loops if loops is None or isinstance(loops, str) else tuple(loops)
+        resolved = self._selections.get(key)
+        if resolved is None:
+            if key is None:
+                selection = slice(None)
+            elif key in self.stages:
+                selection = self.stages[key]
+            else:
+                names = (key,) if isinstance(key, str) else key
+                idx = [self.names.index(n) for n in names]
+                if idx == list(range(idx[0], idx[0] + len(idx))):
+                    selection = slice(idx[0], idx[0] + len(idx))
+                else:
+                    selection = np.array(idx)
+            resolved = self._selections[key] = (selection, self._stage_views(selection))
+        return resolved
+
+    def add_stage(self, stage: str, names):
+        """Registers a named group of loops that update together."""
+        if stage in self._loops:
+            raise ValueError(f"Stage name '{stage}' clashes with a loop name")
+        self._selections.pop(stage, None)
+        self.stages[stage] = self.select(names)
+
+    # ---------- configuration ----------
+    def update_gains(self, loops, kp=None, ki=None, kd=None):
+        idx = self.select(loops)
+        if kp is not None: self.kp[..., idx] = kp
+        if ki is not None: self.ki[..., idx] = ki
+        if kd is not None: self.kd[..., idx] = kd
+
+    def set_output_limits(self, loops, lower, upper):
+        assert np.all(np.less(lower, upper)), "Lower output limit must be less than upper"
+        idx = self.select(loops)
+        self.output_lower[..., idx] = lower
+        self.output_upper[..., idx] = upper
+
+    def set_integral_limits(self, loops, lower, upper):
+        assert np.all(np.less(lower, upper)), "Lower integral limit must be less than upper"
+        idx = self.select(loops)
+        self.integral_lower[..., idx] = lower
+        self.integral_upper[..., idx] = upper
+
+    def reset_integrals(self, loops=None, vehicles=None):
+        """Flags integrators to be zeroed on their next run (all vehicles unless given)."""
+        idx = self.select(loops)
+        if vehicles is None:
+            self.reset_flags[..., idx] = True
+        else:
+            self.reset_flags[vehicles, idx] = True
+        self._reset_pending = True
+
+    def preload(self, loops, integrals=None, last_inputs=None):
+        """Sets integrators and / or last inputs of the selected loops, e.g. to start a cascade in trim."""
+        idx = self.select(loops)
+        if integrals is not None:
+            self.integral_sum[..., idx] = integrals
+        if last_inputs is not None:
+            self.last_input[..., idx] = last_inputs
+
+    def reset(self):
+        """Clears integrators, stored errors and last inputs of every loop."""
+        self.integral_sum.fill(0.0)
+        self.previous_error.fill(0.0)
+        self.last_input.fill(0.0)
+        self.reset_flags.fill(False)
+        self._reset_pending = False
+
+    # ---------- update ----------
+    def run(self, target, current, dt, loops=None):
+        """
+        Runs one update of the selected loops.
+
+        Args:
+            target, current: setpoints and measurements, shaped like the selection
+                ((k,) or (n_vehicles, k)); sequences of floats are accepted.
+            dt (float): timestep.
+            loops: stage name, loop name, list of loop names or None for all loops.
+
+        Returns:
+            np.ndarray: clamped outputs of the selected loops.
+        """
+        if dt <= 0.0:
+            raise ValueError("dt must be > 0")
+        idx, views = self._resolve(loops)
+        if views is None:
+            views = tuple(a[..., idx] for a in self._arrays())
+        kp, ki, kd, out_lo, out_hi, int_lo, int_hi, integral_sum, previous_error, last_input = views
+        current = np.asarray(current, dtype=float)
+        error = np.subtract(target, current)
+
+        # --- Integral with anti-windup
+        integral = integral_sum + error * dt
+        if self._reset_pending:
+            flags = self.reset_flags[..., idx]
+            if flags.any():
+                integral = np.where(flags, error * dt, integral)
+                self.reset_flags[..., idx] = False
+                self._reset_pending = bool(self.reset_flags.any())
+        np.minimum(np.maximum(integral, int_lo, out=integral), int_hi, out=integral)
+
+        # --- P + I + D (on measurement)
+        output = kp * error
+        output += ki * integral
+        output -= kd * ((current - last_input) / dt)
+        np.minimum(np.maximum(output, out_lo, out=output), out_hi, out=output)
+
+        # --- Save state
+        if isinstance(idx, slice):
+            integral_sum[...] = integral
+            previous_error[...] = error
+            last_input[...] = current
+        else:
+            self.integral_sum[..., idx] = integral
+            self.previous_error[..., idx] = error
+            self.last_input[..., idx] = current
+
+        return output
+
+    def _arrays(self):
+        return (
+            self.kp, self.ki, self.kd, self.output_lower, self.output_upper,
+            self.integral_lower, self.integral_upper,
+            self.integral_sum, self.previous_error, self.last_input,
+        )
+
+    def _stage_views(self, idx):
+        # a slice selects views that stay valid (arrays are only ever written in place);
+        # an index array would gather copies, so those are taken per run
+        return tuple(a[..., idx] for a in self._arrays()) if isinstance(idx, slice) else None
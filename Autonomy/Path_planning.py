@@ -1,6 +1,8 @@
-import numpy as np
+import math
 from Global.simdata import UAVState, Waypoint, GCSData, MissionTrack
 
+QD_LOITER_TIME = 1.0  # s within 5 m of a waypoint before a quad advances
+
 
 class WaypointNavigator:
     """
@@ -9,39 +11,54 @@ class WaypointNavigator:
     """
 
     def __init__(self):
-        self.timer = 0  # Used for QD loiter check
+        self.loiter_time = 0.0  # s spent inside the QD acceptance radius
         self.track = MissionTrack()
+        self.event_listeners = []  # callables (event, value) told about "mode" switches and "waypoint" advances
+        self._mode = None
+
+    def _notify(self, event: str, value):
+        for listener in self.event_listeners:
+            listener(event, value)
 
     def _distance_to_wp(self, state: UAVState, wp: Waypoint) -> float:
         """Computes 3D distance between UAV and a waypoint."""
-        return float(np.linalg.norm([wp.x - state.x, wp.y - state.y, wp.z - state.z]))
+        return math.sqrt((wp.x - state.x) ** 2 + (wp.y - state.y) ** 2 + (wp.z - state.z) ** 2)
 
-    def should_advance(self, dist: float, mode: str) -> bool:
+    def should_advance(self, dist: float, mode: str, dt: float) -> bool:
         """
         Determines if the UAV should move to the next waypoint based on:
         - distance to waypoint
         - vehicle mode
+        - time spent loitering (QD), accumulated from dt, the time since the last update
         """
         if mode == "FW":
             return dist < 120.0
 
         elif mode == "QD":
-            self.timer = self.timer + 1 if dist < 5.0 else 0
-            return self.timer > 100  # 1 second if running at 100Hz
+            self.loiter_time = self.loiter_time + dt if dist < 5.0 else 0.0
+            return self.loiter_time > QD_LOITER_TIME
 
         return False  # Don't advance in other modes
 
-    def update(self, state: UAVState, gcs_data: GCSData) -> MissionTrack:
+    def update(self, state: UAVState, gcs_data: GCSData, dt: float) -> MissionTrack:
         """
         Updates the waypoint navigation logic:
         - Validates mission state
         - Computes distance to current waypoint
         - Advances to next waypoint if required
         - Updates mission track (prev/target)
+
+        Args:
+            dt (float): time since the previous update (s), the navigation stage period
         """
         mission = gcs_data.mission
         waypoints = mission.waypoints
 
+        if gcs_data.mode != self._mode:
+            if self._mode is not None:
+                self._notify("mode", gcs_data.mode)
+            self._mode = gcs_data.mode
+
         # Early exit: invalid mission or no waypoints
         if not waypoints:
             self.track = MissionTrack()  # reset just to be safe
@@ -53,7 +70,7 @@ class WaypointNavigator:
         current_wp = waypoints[mission.current_index]
         dist = self._distance_to_wp(state, current_wp)
 
-        if self.should_advance(dist, gcs_data.mode):
+        if self.should_advance(dist, gcs_data.mode, dt):
             next_idx = current_wp.next
             if 0 <= next_idx < len(waypoints):
                 mission.previous_index = mission.current_index
@@ -61,6 +78,7 @@ class WaypointNavigator:
             else:
                 mission.previous_index = mission.current_index
                 mission.current_index = 0  # Restart loop
+            self._notify("waypoint", mission.current_index)
 
         # Ensure mission track is up to date
         mission.update_track()
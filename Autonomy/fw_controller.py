@@ -1,7 +1,6 @@
-import numpy as np
-from Autonomy.PID import PID_class
-from Global.utils import linear_scale
-from Global.simdata import FWTarget, FWControlOutputs, ControllerFlags, UAVState
+from Autonomy.PID import PIDBank
+from Global.fastmath import clamp, scale
+from Global.simdata import FWTarget, FWControlOutputs, ControllerFlags, UAVState, FWActuators
 import Global.configs as configs
 
 
@@ -23,15 +22,15 @@ class FixedWingController:
         self.prev_e_balance = 0.0
 
     def _init_pids(self):
-        self.pids = {
-            "airspeed": PID_class(),
-            "altitude": PID_class(),
-            "roll": PID_class(),
-            "roll_rate": PID_class(),
-            "pitch": PID_class(),
-            "pitch_rate": PID_class(),
-            "heading": PID_class(),
-        }
+        # loops ordered by cascade stage so that each stage updates as one slice of the bank
+        self.pids = PIDBank([
+            "altitude", "airspeed", "roll",  # outer loops
+            "pitch",  # altitude -> pitch -> pitch rate
+            "roll_rate", "pitch_rate",  # rate loops driving the surfaces
+            "heading",
+        ])
+        self.pids.add_stage("outer", ["altitude", "airspeed", "roll"])
+        self.pids.add_stage("rate", ["roll_rate", "pitch_rate"])
 
         # Airspeed control → affects throttle
         self.pids["airspeed"].update_gains(kp=5.0, ki=0.3, kd=0.2)
@@ -65,6 +64,48 @@ class FixedWingController:
         self.pids["roll_rate"].set_integral_limits(lower=-20.0, upper=20.0)
 
 
+    def seed_trim(self, trim_pwm: FWActuators, state: UAVState):
+        """
+        Starts the loops holding a trim: the airspeed and rate integrators are preloaded so that
+        with zero error the throttle, aileron and elevator outputs equal the trim PWM (integral
+        limits are widened to fit), and every loop's last input is the current measurement so
+        the first update has no derivative kick.
+
+        Args:
+            trim_pwm (FWActuators): trim throttle and surface PWM, e.g. TrimPoint.pwm().fw.
+            state (UAVState): the trimmed state the run starts from.
+        """
+        pwm_mid = (configs.PWM_max + configs.PWM_min) / 2
+        pwm_half_range = (configs.PWM_max - configs.PWM_min) / 2
+        stick_half_range = (configs.stick_input_max - configs.stick_input_min) / 2
+
+        def loop_output(pwm, name):
+            # inverse of the output scaling in run() and of the mixer's FW rows
+            stick = (pwm - pwm_mid) / pwm_half_range * stick_half_range
+            lower, upper = self.pids[name].output_limits
+            return scale(stick, configs.stick_input_min, configs.stick_input_max, lower, upper)
+
+        outputs = {
+            "airspeed": loop_output(trim_pwm.throttle, "airspeed"),
+            "roll_rate": loop_output(trim_pwm.aileron, "roll_rate"),
+            "pitch_rate": -loop_output(trim_pwm.elevator, "pitch_rate"),  # run() flips the elevator sign
+        }
+        for name, output in outputs.items():
+            loop = self.pids[name]
+            if loop.ki == 0.0:
+                continue  # no integrator to hold the trim
+            integral = output / loop.ki
+            lower, upper = loop.integral_limits
+            if not lower <= integral <= upper:
+                loop.set_integral_limits(min(lower, integral - 1.0), max(upper, integral + 1.0))
+            self.pids.preload(name, integrals=integral)
+
+        measured = {
+            "altitude": state.z, "airspeed": state.x_vel, "roll": state.phi, "pitch": state.theta,
+            "roll_rate": state.phi_rate, "pitch_rate": state.theta_rate, "heading": state.psi,
+        }
+        self.pids.preload(list(measured), last_inputs=list(measured.values()))
+
     def tecs(self, h, h_des, V, V_des, dt):
         e_total = (h - h_des) + (V**2 - V_des**2) / (2 * self.g)
         e_balance = (h - h_des) - (V**2 - V_des**2) / (2 * self.g)
@@ -78,7 +119,7 @@ class FixedWingController:
         self.prev_e_total = e_total
         self.prev_e_balance = e_balance
 
-        return np.clip(throttle_cmd, 0, 100), np.clip(pitch_cmd, -30, 30)
+        return clamp(throttle_cmd, 0, 100), clamp(pitch_cmd, -30, 30)
 
     def run(
         self,
@@ -89,19 +130,16 @@ class FixedWingController:
         # extract the target data
         self.target = target
 
-        # Step 2 - Roll controls loop
-        roll_cmd = self.pids["roll"].run_pid(
-            self.target.roll, current_state.phi, self.dt
-        )
-        self.output.aileron = self.pids["roll_rate"].run_pid(
-            roll_cmd, current_state.phi_rate, self.dt
-        )
-
-        # step 3 - Rudder for coordinated turn (simplified)
-        self.output.rudder = -0.7 * self.output.aileron
-
         # step 4 - Altitude and airspeed control by TECS or traditional method by configs
         if self.TECS_control:
+            # Step 2 - Roll controls loop
+            roll_cmd = self.pids.run(
+                (self.target.roll,), (current_state.phi,), self.dt, "roll"
+            )[0]
+            self.output.aileron = self.pids.run(
+                (roll_cmd,), (current_state.phi_rate,), self.dt, "roll_rate"
+            )[0]
+
             self.output.throttle, self.output.elevator = self.tecs(
                 h=current_state.z,
                 h_des=self.target.altitude,
@@ -111,24 +149,32 @@ class FixedWingController:
             )
 
         else:
-            # --- Vertical Control: Altitude → Pitch → Pitch Rate ---
-            pitch_cmd = self.pids["altitude"].run_pid(
-                self.target.altitude, current_state.z, self.dt
-            )
-            pitch_rate_cmd = self.pids["pitch"].run_pid(
-                pitch_cmd, current_state.theta, self.dt
-            )
-            self.output.elevator = -self.pids["pitch_rate"].run_pid(
-                pitch_rate_cmd, current_state.theta_rate, self.dt
+            # --- Outer loops: Altitude → Pitch, Airspeed → Throttle, Roll → Roll Rate ---
+            pitch_cmd, self.output.throttle, roll_cmd = self.pids.run(
+                (self.target.altitude, self.target.airspeed, self.target.roll),
+                (current_state.z, current_state.x_vel, current_state.phi),
+                self.dt, "outer",
             )
 
-            # --- Throttle Control: Airspeed loop ---
-            self.output.throttle = self.pids["airspeed"].run_pid(
-                self.target.airspeed, current_state.x_vel, self.dt
+            # --- Pitch → Pitch Rate ---
+            pitch_rate_cmd = self.pids.run(
+                (pitch_cmd,), (current_state.theta,), self.dt, "pitch"
+            )[0]
+
+            # --- Rate loops: aileron and elevator ---
+            aileron, elevator = self.pids.run(
+                (roll_cmd, pitch_rate_cmd),
+                (current_state.phi_rate, current_state.theta_rate),
+                self.dt, "rate",
             )
+            self.output.aileron = aileron
+            self.output.elevator = -elevator
+
+        # step 3 - Rudder for coordinated turn (simplified)
+        self.output.rudder = -0.7 * self.output.aileron
 
         # Scale aileron output
-        self.output.aileron = linear_scale(
+        self.output.aileron = scale(
             self.output.aileron,
             self.pids["roll_rate"].output_limits[0],
             self.pids["roll_rate"].output_limits[1],
@@ -137,7 +183,7 @@ class FixedWingController:
         )
 
         # Scale elevator output
-        self.output.elevator = linear_scale(
+        self.output.elevator = scale(
             self.output.elevator,
             self.pids["pitch_rate"].output_limits[0],
             self.pids["pitch_rate"].output_limits[1],
@@ -146,7 +192,7 @@ class FixedWingController:
         )
 
         # Scale rudder output
-        self.output.rudder = linear_scale(
+        self.output.rudder = scale(
             self.output.rudder,
             self.pids["roll_rate"].output_limits[
                 0
@@ -157,7 +203,7 @@ class FixedWingController:
         )
 
         # Scale throttle output
-        self.output.throttle = linear_scale(
+        self.output.throttle = scale(
             self.output.throttle,
             self.pids["airspeed"].output_limits[0],
             self.pids["airspeed"].output_limits[1],
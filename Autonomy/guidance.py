@@ -1,4 +1,5 @@
-import numpy as np
+import math
+from Global.fastmath import wrap_angle
 from Global.simdata import FWTarget, MissionTrack, UAVState
 
 class FW_guidance:
@@ -6,30 +7,35 @@ class FW_guidance:
         self.min_L1_dist = min_L1_dist
         self.L1_ratio = L1_ratio
         self.default_airspeed = default_airspeed
+        self.output: FWTarget = FWTarget()
 
     def get_L1_distance(self, v):
-        gs = float(np.linalg.norm(v))
+        gs = math.hypot(v[0], v[1])
         return max(self.L1_ratio * gs, self.min_L1_dist)
 
     def run(self, state: UAVState, mission_track: MissionTrack) -> FWTarget:
         prev = mission_track.previous
         curr = mission_track.target
-        pos = np.array([state.x, state.y])
-        vel = np.array([state.x_vel, state.y_vel])
+        vel_x, vel_y = state.x_vel, state.y_vel
 
-        path_vec = np.array([curr.x - prev.x, curr.y - prev.y])
-        path_unit = path_vec / (np.linalg.norm(path_vec) + 1e-6)
+        path_x, path_y = curr.x - prev.x, curr.y - prev.y
+        path_norm = math.hypot(path_x, path_y) + 1e-6
+        unit_x, unit_y = path_x / path_norm, path_y / path_norm
 
-        pos_vec = pos - np.array([prev.x, prev.y])
-        along_track = np.dot(pos_vec, path_unit)
-        L1_vec = (along_track + self.get_L1_distance(vel)) * path_unit - pos_vec
+        pos_x, pos_y = state.x - prev.x, state.y - prev.y
+        along_track = pos_x * unit_x + pos_y * unit_y
+        L1_dist = self.get_L1_distance((vel_x, vel_y))
+        L1_x = (along_track + L1_dist) * unit_x - pos_x
+        L1_y = (along_track + L1_dist) * unit_y - pos_y
 
-        eta = np.arctan2(L1_vec[1], L1_vec[0]) - np.arctan2(vel[1], vel[0])
-        eta = np.arctan2(np.sin(eta), np.cos(eta))
-        gs = np.linalg.norm(vel)
-        a_lat = 2.0 * gs ** 2 / self.get_L1_distance(vel) * np.sin(eta)
+        eta = math.atan2(L1_y, L1_x) - math.atan2(vel_y, vel_x)
+        eta = wrap_angle(eta)
+        gs = math.hypot(vel_x, vel_y)
+        a_lat = 2.0 * gs ** 2 / L1_dist * math.sin(eta)
 
         g = 9.81
-        roll = np.arctan2(a_lat, g)
-        output  = FWTarget(roll=roll, altitude=curr.z, airspeed=self.default_airspeed)
-        return output
+        # update the preallocated target in place
+        self.output.roll = math.atan2(a_lat, g)
+        self.output.altitude = curr.z
+        self.output.airspeed = self.default_airspeed
+        return self.output
@@ -1,9 +1,17 @@
 # Autonomy/Controller/quad_controller.py
-import numpy as np
-from Autonomy.PID import PID_class
-from Global.utils import linear_scale
+import math
+from Autonomy.PID import PIDBank
+from Global.fastmath import clamp, scale
 from Global.simdata import UAVState, QuadControlOutputs, QuadTarget
 
+MAX_TILT = math.radians(30)  # roll / pitch setpoint limit
+# Setpoint limits for the position and heading loops. Faster than this the airframe's aero forces
+# (alpha near +-90 deg climbing, near 180 deg flying tail first) outgrow the motors and the attitude loops lose it.
+MAX_GROUND_SPEED = 1.5  # m/s
+MAX_CLIMB_RATE = 0.75  # m/s
+MAX_YAW_RATE = 0.5  # rad/s
+
+
 class QuadController:
     def __init__(self, dt):
         self.dt = dt
@@ -12,103 +20,110 @@ class QuadController:
         self._init_pids()
 
     def _init_pids(self):
-        self.pids = {
-            "x": PID_class(),
-            "y": PID_class(),
-            "z": PID_class(),
-            "x_vel": PID_class(),
-            "y_vel": PID_class(),
-            "z_vel": PID_class(),
-            "phi": PID_class(),
-            "theta": PID_class(),
-            "psi": PID_class(),
-            "phi_rate": PID_class(),
-            "theta_rate": PID_class(),
-            "psi_rate": PID_class(),
-        }
+        # loops ordered by cascade stage so that each stage updates as one slice of the bank
+        self.pids = PIDBank([
+            "x", "y", "z", "psi",  # position and heading -> velocity / yaw rate setpoints
+            "x_vel", "y_vel", "z_vel", "psi_rate",  # velocity -> acceleration, yaw rate -> yaw output
+            "phi", "theta",  # attitude -> rate setpoints
+            "phi_rate", "theta_rate",  # rates -> roll / pitch outputs
+        ])
+        self.pids.add_stage("position", ["x", "y", "z", "psi"])
+        self.pids.add_stage("velocity", ["x_vel", "y_vel", "z_vel", "psi_rate"])
+        self.pids.add_stage("angle", ["phi", "theta"])
+        self.pids.add_stage("rate", ["phi_rate", "theta_rate"])
 
         # x position controller
-        self.pids["x"].update_gains(kp=1, kd=0, ki=0)
-        self.pids["x"].set_output_limits(lower=-5, upper=5)
+        self.pids["x"].update_gains(kp=0.5, kd=0, ki=0)
+        self.pids["x"].set_output_limits(lower=-MAX_GROUND_SPEED, upper=MAX_GROUND_SPEED)
 
         self.pids["x_vel"].update_gains(kp=1, kd=0, ki=0)
         self.pids["x_vel"].set_output_limits(lower=-5, upper=5)
         self.pids["x_vel"].set_integral_limits(lower=-3, upper=3)
 
         # y position controller
-        self.pids["y"].update_gains(kp=1, kd=0, ki=0)
-        self.pids["y"].set_output_limits(lower=-5, upper=5)
+        self.pids["y"].update_gains(kp=0.5, kd=0, ki=0)
+        self.pids["y"].set_output_limits(lower=-MAX_GROUND_SPEED, upper=MAX_GROUND_SPEED)
         self.pids["y_vel"].update_gains(kp=1, kd=0, ki=0)
         self.pids["y_vel"].set_output_limits(lower=-5, upper=5)
         self.pids["y_vel"].set_integral_limits(lower=-3, upper=3)
 
         # z position controller
         self.pids["z"].update_gains(kp=1, kd=0, ki=0)
-        self.pids["z"].set_output_limits(lower=-5, upper=5)
-        self.pids["z_vel"].update_gains(kp=1, kd=0, ki=0)
+        self.pids["z"].set_output_limits(lower=-MAX_CLIMB_RATE, upper=MAX_CLIMB_RATE)
+        self.pids["z_vel"].update_gains(kp=3, kd=0, ki=1)  # the integrator carries the hover collective
         self.pids["z_vel"].set_output_limits(lower=-5, upper=5)
         self.pids["z_vel"].set_integral_limits(lower=-3, upper=3)
 
         # roll controller
-        self.pids["phi"].update_gains(kp=1, kd=0, ki=0)
+        self.pids["phi"].update_gains(kp=4, kd=0, ki=0)
         self.pids["phi"].set_output_limits(lower=-5, upper=5)
         self.pids["phi_rate"].update_gains(kp=1, kd=0, ki=0)
         self.pids["phi_rate"].set_output_limits(lower=-5, upper=5)
         self.pids["phi_rate"].set_integral_limits(lower=-3, upper=3)
 
         # pitch controller
-        self.pids["theta"].update_gains(kp=1, kd=0, ki=0)
+        self.pids["theta"].update_gains(kp=4, kd=0, ki=0)
         self.pids["theta"].set_output_limits(lower=-5, upper=5)
         self.pids["theta_rate"].update_gains(kp=1, kd=0, ki=0)
         self.pids["theta_rate"].set_output_limits(lower=-5, upper=5)
         self.pids["theta_rate"].set_integral_limits(lower=-3, upper=3)
 
         # yaw controller
-        self.pids["psi"].update_gains(kp=1, kd=0, ki=0)
-        self.pids["psi"].set_output_limits(lower=-5, upper=5)
+        self.pids["psi"].update_gains(kp=0.5, kd=0, ki=0)
+        self.pids["psi"].set_output_limits(lower=-MAX_YAW_RATE, upper=MAX_YAW_RATE)
         self.pids["psi_rate"].update_gains(kp=1, kd=0, ki=0)
         self.pids["psi_rate"].set_output_limits(lower=-5, upper=5)
         self.pids["psi_rate"].set_integral_limits(lower=-3, upper=3)
 
     def run(self, current_state: UAVState , Target: QuadTarget):
         self.input = Target
-        # x axis controller
-        target_x_vel = self.pids["x"].run_pid(self.input.x, current_state.x, self.dt)
-        target_x_accel = self.pids["x_vel"].run_pid(target_x_vel, current_state.x_vel, self.dt)
-
-        # y axis controller
-        target_y_vel = self.pids["y"].run_pid(self.input.y, current_state.y, self.dt)
-        target_y_accel = self.pids["y_vel"].run_pid(target_y_vel, current_state.y_vel, self.dt)
+        # position and heading loops -> velocity and yaw rate setpoints
+        target_x_vel, target_y_vel, desired_z_vel, desired_psi_rate = self.pids.run(
+            (self.input.x, self.input.y, self.input.altitude, self.input.heading),
+            (current_state.x, current_state.y, current_state.z, current_state.psi),
+            self.dt, "position",
+        )
+
+        # The position setpoints are NED, so rotate the body velocity (u, v, w) into NED before the velocity loops
+        u, v, w = current_state.x_vel, current_state.y_vel, current_state.z_vel
+        R = current_state.dcm()
+        north_vel = R[0] * u + R[3] * v + R[6] * w
+        east_vel = R[1] * u + R[4] * v + R[7] * w
+        down_vel = R[2] * u + R[5] * v + R[8] * w
+
+        # velocity loops -> accelerations, altitude output; yaw rate loop -> yaw output
+        target_x_accel, target_y_accel, altitude_output, yaw_output = self.pids.run(
+            (target_x_vel, target_y_vel, desired_z_vel, desired_psi_rate),
+            (north_vel, east_vel, down_vel, current_state.psi_rate),
+            self.dt, "velocity",
+        )
 
         # Convert acceleration to desired angles using desired force and yaw
-        AX = target_x_accel * np.cos(current_state.psi) + target_y_accel * np.sin(current_state.psi)
-        AY = -target_x_accel * np.sin(current_state.psi) + target_y_accel * np.cos(current_state.psi)
+        cpsi, spsi = math.cos(current_state.psi), math.sin(current_state.psi)
+        AX = target_x_accel * cpsi + target_y_accel * spsi
+        AY = -target_x_accel * spsi + target_y_accel * cpsi
 
         desired_theta = -AX / 9.81
-        desired_phi = (np.cos(current_state.theta) * AY) / 9.81
-
-        desired_theta = np.clip(desired_theta, a_min=np.deg2rad(-30), a_max=np.deg2rad(30))
-        desired_phi   = np.clip(desired_phi, a_min=np.deg2rad(-30), a_max=np.deg2rad(30))
-
-        # roll controller
-        desired_phi_rate = self.pids["phi"].run_pid(desired_phi, current_state.phi, self.dt)
-        roll_output = self.pids["phi_rate"].run_pid(desired_phi_rate, current_state.phi_rate, self.dt)
-
-        # pitch controller
-        desired_theta_rate = self.pids["theta"].run_pid(desired_theta, current_state.theta, self.dt)
-        pitch_output = self.pids["theta_rate"].run_pid(desired_theta_rate, current_state.theta_rate, self.dt)
-
-        # yaw controller
-        desired_psi_rate = self.pids["psi"].run_pid(self.input.heading, current_state.psi, self.dt)
-        yaw_output = self.pids["psi_rate"].run_pid(desired_psi_rate, current_state.psi_rate, self.dt)
-
-        # altitude controller
-        desired_z_vel = self.pids["z"].run_pid(self.input.altitude, current_state.z, self.dt)
-        altitude_output = self.pids["z_vel"].run_pid(desired_z_vel, current_state.z_vel, self.dt)
-
-        self.output.throttle = linear_scale(altitude_output, -5, 5, -1, 1)
-        self.output.roll = linear_scale(roll_output, -5, 5, -1, 1)
-        self.output.pitch = linear_scale(pitch_output, -5, 5, -1, 1)
-        self.output.yaw = linear_scale(yaw_output, -5, 5, -1, 1)
+        desired_phi = (math.cos(current_state.theta) * AY) / 9.81
+
+        desired_theta = clamp(desired_theta, -MAX_TILT, MAX_TILT)
+        desired_phi   = clamp(desired_phi, -MAX_TILT, MAX_TILT)
+
+        # attitude loops -> rate setpoints
+        desired_phi_rate, desired_theta_rate = self.pids.run(
+            (desired_phi, desired_theta), (current_state.phi, current_state.theta), self.dt, "angle"
+        )
+
+        # rate loops -> roll and pitch outputs
+        roll_output, pitch_output = self.pids.run(
+            (desired_phi_rate, desired_theta_rate),
+            (current_state.phi_rate, current_state.theta_rate),
+            self.dt, "rate",
+        )
+
+        self.output.throttle = -scale(altitude_output, -5, 5, -1, 1)  # NED: a positive z_vel output asks for descent
+        self.output.roll = scale(roll_output, -5, 5, -1, 1)
+        self.output.pitch = scale(pitch_output, -5, 5, -1, 1)
+        self.output.yaw = scale(yaw_output, -5, 5, -1, 1)
 
         return self.output
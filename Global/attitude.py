@@ -0,0 +1,150 @@
+"""
+Quaternion attitude math.
+
+Quaternions are (q0, q1, q2, q3) with q0 the scalar part and rotate body vectors into NED.
+Euler angles follow the ZYX (yaw, pitch, roll) convention used across the project and the
+direction cosine matrix is R_ned_to_body, the same matrix as utils.rotation_matrix.
+
+Scalar functions take and return plain floats / tuples (math module, no NumPy dispatch).
+The batch_ variants work on arrays with the quaternion on the last axis, shape (..., 4).
+"""
+
+import math
+import numpy as np
+
+
+# ---------- Scalar ----------
+def euler_to_quaternion(phi, theta, psi):
+    cphi, sphi = math.cos(0.5 * phi), math.sin(0.5 * phi)
+    ctheta, stheta = math.cos(0.5 * theta), math.sin(0.5 * theta)
+    cpsi, spsi = math.cos(0.5 * psi), math.sin(0.5 * psi)
+    return (
+        cphi * ctheta * cpsi + sphi * stheta * spsi,
+        sphi * ctheta * cpsi - cphi * stheta * spsi,
+        cphi * stheta * cpsi + sphi * ctheta * spsi,
+        cphi * ctheta * spsi - sphi * stheta * cpsi,
+    )
+
+
+def quaternion_to_euler(q0, q1, q2, q3):
+    phi = math.atan2(2.0 * (q0 * q1 + q2 * q3), q0 * q0 + q3 * q3 - q1 * q1 - q2 * q2)
+    theta = math.asin(min(max(2.0 * (q0 * q2 - q1 * q3), -1.0), 1.0))
+    psi = math.atan2(2.0 * (q0 * q3 + q1 * q2), q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3)
+    return phi, theta, psi
+
+
+def quaternion_to_dcm(q0, q1, q2, q3):
+    """R_ned_to_body as a row-major 9-tuple."""
+    q00, q11, q22, q33 = q0 * q0, q1 * q1, q2 * q2, q3 * q3
+    q01, q02, q03 = q0 * q1, q0 * q2, q0 * q3
+    q12, q13, q23 = q1 * q2, q1 * q3, q2 * q3
+    return (
+        q00 + q11 - q22 - q33, 2.0 * (q12 + q03), 2.0 * (q13 - q02),
+        2.0 * (q12 - q03), q00 - q11 + q22 - q33, 2.0 * (q23 + q01),
+        2.0 * (q13 + q02), 2.0 * (q23 - q01), q00 - q11 - q22 + q33,
+    )
+
+
+def quaternion_rates(q0, q1, q2, q3, p, q, r):
+    """Time derivative of the quaternion for body rates p, q, r."""
+    return (
+        0.5 * (-q1 * p - q2 * q - q3 * r),
+        0.5 * (q0 * p + q2 * r - q3 * q),
+        0.5 * (q0 * q - q1 * r + q3 * p),
+        0.5 * (q0 * r + q1 * q - q2 * p),
+    )
+
+
+def propagate_quaternion(q0, q1, q2, q3, p, q, r, dt):
+    """
+    Rotates the attitude by constant body rates over dt (exact exponential map),
+    then renormalizes. No Euler angles, no singularity.
+    """
+    w = math.sqrt(p * p + q * q + r * r)
+    half = 0.5 * w * dt
+    if w > 1e-12:
+        c, s = math.cos(half), math.sin(half) / w
+    else:
+        c, s = 1.0, 0.5 * dt
+    a, b, d = p * s, q * s, r * s
+
+    n0 = q0 * c - q1 * a - q2 * b - q3 * d
+    n1 = q0 * a + q1 * c + q2 * d - q3 * b
+    n2 = q0 * b - q1 * d + q2 * c + q3 * a
+    n3 = q0 * d + q1 * b - q2 * a + q3 * c
+    norm = 1.0 / math.sqrt(n0 * n0 + n1 * n1 + n2 * n2 + n3 * n3)
+    return n0 * norm, n1 * norm, n2 * norm, n3 * norm
+
+
+# ---------- Arrays ----------
+def batch_euler_to_quaternion(phi, theta, psi) -> np.ndarray:
+    cphi, sphi = np.cos(0.5 * phi), np.sin(0.5 * phi)
+    ctheta, stheta = np.cos(0.5 * theta), np.sin(0.5 * theta)
+    cpsi, spsi = np.cos(0.5 * psi), np.sin(0.5 * psi)
+    return np.stack([
+        cphi * ctheta * cpsi + sphi * stheta * spsi,
+        sphi * ctheta * cpsi - cphi * stheta * spsi,
+        cphi * stheta * cpsi + sphi * ctheta * spsi,
+        cphi * ctheta * spsi - sphi * stheta * cpsi,
+    ], axis=-1)
+
+
+def batch_quaternion_to_euler(quat: np.ndarray) -> np.ndarray:
+    """(..., 4) quaternions to (..., 3) Euler angles [phi, theta, psi]."""
+    q0, q1, q2, q3 = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    out = np.empty(quat.shape[:-1] + (3,))
+    out[..., 0] = np.arctan2(2.0 * (q0 * q1 + q2 * q3), q0 * q0 + q3 * q3 - q1 * q1 - q2 * q2)
+    out[..., 1] = np.arcsin(np.clip(2.0 * (q0 * q2 - q1 * q3), -1.0, 1.0))
+    out[..., 2] = np.arctan2(2.0 * (q0 * q3 + q1 * q2), q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3)
+    return out
+
+
+def batch_quaternion_to_dcm(quat: np.ndarray) -> np.ndarray:
+    """(..., 4) quaternions to (..., 3, 3) R_ned_to_body matrices."""
+    q0, q1, q2, q3 = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    q00, q11, q22, q33 = q0 * q0, q1 * q1, q2 * q2, q3 * q3
+    R = np.empty(quat.shape[:-1] + (3, 3))
+    R[..., 0, 0] = q00 + q11 - q22 - q33
+    R[..., 0, 1] = 2.0 * (q1 * q2 + q0 * q3)
+    R[..., 0, 2] = 2.0 * (q1 * q3 - q0 * q2)
+    R[..., 1, 0] = 2.0 * (q1 * q2 - q0 * q3)
+    R[..., 1, 1] = q00 - q11 + q22 - q33
+    R[..., 1, 2] = 2.0 * (q2 * q3 + q0 * q1)
+    R[..., 2, 0] = 2.0 * (q1 * q3 + q0 * q2)
+    R[..., 2, 1] = 2.0 * (q2 * q3 - q0 * q1)
+    R[..., 2, 2] = q00 - q11 - q22 + q33
+    return R
+
+
+def batch_quaternion_rates(quat: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    q0, q1, q2, q3 = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    p, q, r = rates[..., 0], rates[..., 1], rates[..., 2]
+    out = np.empty(quat.shape)
+    out[..., 0] = 0.5 * (-q1 * p - q2 * q - q3 * r)
+    out[..., 1] = 0.5 * (q0 * p + q2 * r - q3 * q)
+    out[..., 2] = 0.5 * (q0 * q - q1 * r + q3 * p)
+    out[..., 3] = 0.5 * (q0 * r + q1 * q - q2 * p)
+    return out
+
+
+def batch_propagate_quaternion(quat: np.ndarray, rates: np.ndarray, dt: float) -> np.ndarray:
+    """Vectorized propagate_quaternion: (..., 4) attitudes, (..., 3) body rates."""
+    w = np.sqrt(np.sum(rates * rates, axis=-1))
+    half = 0.5 * w * dt
+    spinning = w > 1e-12
+    c = np.cos(half)
+    s = np.where(spinning, np.sin(half) / np.where(spinning, w, 1.0), 0.5 * dt)
+
+    dq = np.empty(quat.shape)
+    dq[..., 0] = c
+    dq[..., 1:4] = rates * s[..., None]
+
+    q0, q1, q2, q3 = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    c, a, b, d = dq[..., 0], dq[..., 1], dq[..., 2], dq[..., 3]
+    out = np.empty(quat.shape)
+    out[..., 0] = q0 * c - q1 * a - q2 * b - q3 * d
+    out[..., 1] = q0 * a + q1 * c + q2 * d - q3 * b
+    out[..., 2] = q0 * b - q1 * d + q2 * c + q3 * a
+    out[..., 3] = q0 * d + q1 * b - q2 * a + q3 * c
+    out /= np.linalg.norm(out, axis=-1, keepdims=True)
+    return out
@@ -0,0 +1,173 @@
+"""
+Fast math kernels for the simulation hot path.
+
+Scalar functions take and return plain floats / tuples and use the math module and builtin
+min/max, so they skip NumPy dispatch (np.clip or np.cos on a Python float costs several times
+the arithmetic). The batch_ variants are the same operations on arrays, fully vectorized,
+with the vector / matrix on the last axes: 3-vectors (..., 3), DCMs (..., 3, 3).
+
+DCMs are R_ned_to_body (ZYX Euler convention, see Global/attitude.py). Scalar DCMs are
+row-major 9-tuples, the format of attitude.quaternion_to_dcm and UAVState.dcm().
+"""
+
+import math
+import numpy as np
+
+from Global.attitude import (  # re-exported: the quaternion kernels belong to the same layer
+    euler_to_quaternion,
+    quaternion_to_euler,
+    quaternion_to_dcm,
+    quaternion_rates,
+    propagate_quaternion,
+    batch_euler_to_quaternion,
+    batch_quaternion_to_euler,
+    batch_quaternion_to_dcm,
+    batch_quaternion_rates,
+    batch_propagate_quaternion,
+)
+
+PI = math.pi
+TWO_PI = 2.0 * math.pi
+
+
+# ---------- Scalar ----------
+def clamp(x, lower, upper):
+    return min(max(x, lower), upper)
+
+
+def scale(x, in_min, in_max, out_min, out_max):
+    """Linear map of x from [in_min, in_max] to [out_min, out_max], input clamped to its range."""
+    lo, hi = (in_min, in_max) if in_min < in_max else (in_max, in_min)
+    x = min(max(x, lo), hi)
+    return (x - in_min) / (in_max - in_min) * (out_max - out_min) + out_min
+
+
+def wrap(x, min_val, max_val):
+    """Wraps x into [min_val, max_val)."""
+    return (x - min_val) % (max_val - min_val) + min_val
+
+
+def wrap_angle(x):
+    """Wraps an angle into [-pi, pi)."""
+    return (x + PI) % TWO_PI - PI
+
+
+def euler_to_dcm(phi, theta, psi):
+    """R_ned_to_body from ZYX Euler angles as a row-major 9-tuple."""
+    cphi, sphi = math.cos(phi), math.sin(phi)
+    ctheta, stheta = math.cos(theta), math.sin(theta)
+    cpsi, spsi = math.cos(psi), math.sin(psi)
+    return (
+        ctheta * cpsi, ctheta * spsi, -stheta,
+        sphi * stheta * cpsi - cphi * spsi, sphi * stheta * spsi + cphi * cpsi, sphi * ctheta,
+        cphi * stheta * cpsi + sphi * spsi, cphi * stheta * spsi - sphi * cpsi, cphi * ctheta,
+    )
+
+
+def dcm_apply(R, v):
+    """R @ v for a row-major 9-tuple R (e.g. NED -> body)."""
+    x, y, z = v
+    return (
+        R[0] * x + R[1] * y + R[2] * z,
+        R[3] * x + R[4] * y + R[5] * z,
+        R[6] * x + R[7] * y + R[8] * z,
+    )
+
+
+def dcm_apply_transpose(R, v):
+    """R^T @ v for a row-major 9-tuple R (e.g. body -> NED)."""
+    x, y, z = v
+    return (
+        R[0] * x + R[3] * y + R[6] * z,
+        R[1] * x + R[4] * y + R[7] * z,
+        R[2] * x + R[5] * y + R[8] * z,
+    )
+
+
+def add3(a, b):
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def sub3(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def scale3(a, k):
+    return (a[0] * k, a[1] * k, a[2] * k)
+
+
+def dot3(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def cross3(a, b):
+    return (
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    )
+
+
+def norm3(a):
+    return math.sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
+
+
+# ---------- Batch ----------
+def batch_clamp(x, lower, upper, out=None) -> np.ndarray:
+    """Elementwise clamp; lower / upper broadcast (per-column limits as 1-D arrays)."""
+    out = np.maximum(x, lower, out=out)
+    return np.minimum(out, upper, out=out)
+
+
+def batch_scale(x, in_min, in_max, out_min, out_max) -> np.ndarray:
+    lo, hi = np.minimum(in_min, in_max), np.maximum(in_min, in_max)
+    x = batch_clamp(np.asarray(x, dtype=float), lo, hi)
+    return (x - in_min) / np.subtract(in_max, in_min) * np.subtract(out_max, out_min) + out_min
+
+
+def batch_wrap(x, min_val, max_val) -> np.ndarray:
+    return np.mod(np.subtract(x, min_val), np.subtract(max_val, min_val)) + min_val
+
+
+def batch_wrap_angle(x) -> np.ndarray:
+    return np.mod(np.add(x, PI), TWO_PI) - PI
+
+
+def batch_euler_to_dcm(phi, theta, psi) -> np.ndarray:
+    """R_ned_to_body, shape (..., 3, 3)."""
+    cphi, sphi = np.cos(phi), np.sin(phi)
+    ctheta, stheta = np.cos(theta), np.sin(theta)
+    cpsi, spsi = np.cos(psi), np.sin(psi)
+    R = np.empty(np.shape(cphi) + (3, 3))
+    R[..., 0, 0] = ctheta * cpsi
+    R[..., 0, 1] = ctheta * spsi
+    R[..., 0, 2] = -stheta
+    R[..., 1, 0] = sphi * stheta * cpsi - cphi * spsi
+    R[..., 1, 1] = sphi * stheta * spsi + cphi * cpsi
+    R[..., 1, 2] = sphi * ctheta
+    R[..., 2, 0] = cphi * stheta * cpsi + sphi * spsi
+    R[..., 2, 1] = cphi * stheta * spsi - sphi * cpsi
+    R[..., 2, 2] = cphi * ctheta
+    return R
+
+
+def batch_dcm_apply(R: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """R @ v over the leading axes: R (..., 3, 3), v (..., 3)."""
+    return np.einsum("...ij,...j->...i", R, v)
+
+
+def batch_dcm_apply_transpose(R: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """R^T @ v over the leading axes: R (..., 3, 3), v (..., 3)."""
+    return np.einsum("...ji,...j->...i", R, v)
+
+
+def batch_dot3(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+
+def batch_cross3(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.cross(a, b)
+
+
+def batch_norm3(a: np.ndarray) -> np.ndarray:
+    return np.sqrt(batch_dot3(a, a))
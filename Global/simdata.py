@@ -1,12 +1,161 @@
 from dataclasses import dataclass, field
 from typing import List
+import numpy as np
+from Global.attitude import euler_to_quaternion, quaternion_to_euler, quaternion_to_dcm
+
+
+########################################################################
+############################# Array messages ###########################
+########################################################################
+
+
+def _float_property(index: int):
+    # scalar access goes through a memoryview of the array: returns plain floats, no NumPy dispatch
+    def fget(self):
+        return self._view[index]
+
+    def fset(self, value):
+        self._view[index] = value
+
+    return property(fget, fset)
+
+
+def _child_property(slot: str, start: int, stop: int):
+    def fget(self):
+        return getattr(self, slot)
+
+    def fset(self, value):
+        self._data[start:stop] = value._data
+
+    return property(fget, fset)
+
+
+def _rebuild(cls, data, extras):
+    obj = cls(buffer=data)
+    for name, value in extras.items():
+        setattr(obj, name, value)
+    return obj
+
+
+class ArrayStruct:
+    """
+    Base class for the messages exchanged every simulation step.
+
+    All float fields live in one contiguous float64 array and are accessed by name
+    (state.x, actuators.fw.throttle). Nested messages are views into the parent array,
+    so as_array() is a zero-copy view of every field and assigning a nested message
+    (output.fw = other_fw) copies values in place instead of rebinding.
+
+    Subclasses declare:
+        _fields   - float field names, in array order
+        _children - (name, ArrayStruct subclass) pairs laid out after _fields
+        _extras   - (name, default) non-float attributes kept in plain slots
+        _defaults - (name, value) float fields that do not start at zero
+        __slots__ - the extras plus one "_<name>" slot per child
+
+    A property defined in the subclass body replaces the generated one for that field.
+    """
+
+    __slots__ = ("_data", "_view")
+    _fields: tuple = ()
+    _children: tuple = ()
+    _extras: tuple = ()
+    _defaults: tuple = ()
+    size: int = 0
+    field_names: tuple = ()  # flattened float names, e.g. "quad.motor1"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = list(cls._fields)
+        for i, name in enumerate(cls._fields):
+            if name not in cls.__dict__:
+                setattr(cls, name, _float_property(i))
+        offset = len(cls._fields)
+        for name, child in cls._children:
+            setattr(cls, name, _child_property("_" + name, offset, offset + child.size))
+            names += [f"{name}.{sub}" for sub in child.field_names]
+            offset += child.size
+        cls.size = offset
+        cls.field_names = tuple(names)
+
+    def __init__(self, *args, buffer: np.ndarray | None = None, **kwargs):
+        """
+        Args:
+            *args, **kwargs: field values, positional args follow _fields.
+            buffer: optional float64 array of length `size` to use as storage (no copy).
+        """
+        self._data = np.zeros(self.size) if buffer is None else buffer
+        self._view = memoryview(self._data)
+        if buffer is None:
+            for name, value in self._defaults:
+                self._view[self._fields.index(name)] = value
+        offset = len(self._fields)
+        for name, child in self._children:
+            setattr(self, "_" + name, child(buffer=self._data[offset:offset + child.size]))
+            offset += child.size
+        for name, default in self._extras:
+            setattr(self, name, default)
+
+        if len(args) > len(self._fields):
+            raise TypeError(f"{type(self).__name__} takes at most {len(self._fields)} positional arguments")
+        for name, value in zip(self._fields, args):
+            setattr(self, name, value)
+        for name, value in kwargs.items():
+            if not isinstance(getattr(type(self), name, None), property) and name not in dict(self._extras):
+                raise TypeError(f"{type(self).__name__} got an unexpected keyword argument '{name}'")
+            setattr(self, name, value)
+
+    def as_array(self) -> np.ndarray:
+        """Zero-copy float64 view of all fields, laid out as field_names."""
+        return self._data
+
+    def assign(self, values):
+        """Overwrites all float fields in place from a sequence laid out as field_names."""
+        self._data[:] = values
+
+    def copy_from(self, other: "ArrayStruct"):
+        """In-place copy of another message of the same type."""
+        self._data[:] = other.as_array()
+        for name, _ in self._extras:
+            setattr(self, name, getattr(other, name))
+
+    def clear(self):
+        """Resets all float fields in place (zero, or the _defaults value)."""
+        self._data.fill(0.0)
+        for name, value in self._defaults:
+            self._view[self._fields.index(name)] = value
+
+    def copy(self):
+        return _rebuild(type(self), self.as_array().copy(), self._extra_values())
+
+    def to_dict(self) -> dict:
+        values = self._extra_values()
+        values.update(zip(self.field_names, self.as_array().tolist()))
+        return values
+
+    def _extra_values(self) -> dict:
+        return {name: getattr(self, name) for name, _ in self._extras}
+
+    def __reduce__(self):
+        return _rebuild, (type(self), self.as_array().copy(), self._extra_values())
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return bool(np.array_equal(self.as_array(), other.as_array())) and self._extra_values() == other._extra_values()
+
+    def __repr__(self):
+        parts = [f"{name}={value!r}" for name, value in self._extra_values().items()]
+        parts += [f"{name}={getattr(self, name)!r}" for name in self._fields]
+        parts += [f"{name}={getattr(self, name)!r}" for name, _ in self._children]
+        return f"{type(self).__name__}({', '.join(parts)})"
 
 ########################################################################
 ################################### GCS ################################
 ########################################################################
 
 
-@dataclass
+@dataclass(slots=True)
 class Waypoint:
     x: float = 0
     y: float = 0
@@ -17,7 +166,7 @@ class Waypoint:
     next: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class RCInput:
     roll: float = 0
     pitch: float = 0
@@ -26,13 +175,13 @@ class RCInput:
     mode_switch: str = "QD_MANUAL"
 
 
-@dataclass
+@dataclass(slots=True)
 class MissionTrack:
     target: Waypoint = field(default_factory=Waypoint)
     previous: Waypoint = field(default_factory=Waypoint)
 
 
-@dataclass
+@dataclass(slots=True)
 class MissionPlan:
     home: Waypoint = field(default_factory=Waypoint)
     waypoints: List[Waypoint] = field(default_factory=list)
@@ -49,7 +198,7 @@ class MissionPlan:
                 self.track.target = self.waypoints[self.previous_index]
 
 
-@dataclass
+@dataclass(slots=True)
 class GCSData:
     sim_command: str = "NONE"  # START, PAUSE, STOP
     mode: str = "NONE"  # AUTO, STABILIZE, etc.
@@ -63,50 +212,37 @@ class GCSData:
 ########################################################################
 
 
-@dataclass
-class FWTarget:
-    roll: float = 0
-    airspeed: float = 0
-    altitude: float = 0
+class FWTarget(ArrayStruct):
+    __slots__ = ()
+    _fields = ("roll", "airspeed", "altitude")
 
 
-@dataclass
-class QuadTarget:
-    x: float = 0
-    y: float = 0
-    altitude: float = 0
-    heading: float = 0
+class QuadTarget(ArrayStruct):
+    __slots__ = ()
+    _fields = ("x", "y", "altitude", "heading")
 
 
-@dataclass
-class TargetSetpoints:
-    quad: QuadTarget = field(default_factory=QuadTarget)
-    fw: FWTarget = field(default_factory=FWTarget)
+class TargetSetpoints(ArrayStruct):
+    __slots__ = ("_quad", "_fw")
+    _children = (("quad", QuadTarget), ("fw", FWTarget))
 
 
-@dataclass
-class FWControlOutputs:
-    throttle: float = 0
-    aileron: float = 0
-    elevator: float = 0
-    rudder: float = 0
+class FWControlOutputs(ArrayStruct):
+    __slots__ = ()
+    _fields = ("throttle", "aileron", "elevator", "rudder")
 
 
-@dataclass
-class QuadControlOutputs:
-    throttle: float = 0
-    roll: float = 0
-    pitch: float = 0
-    yaw: float = 0
+class QuadControlOutputs(ArrayStruct):
+    __slots__ = ()
+    _fields = ("throttle", "roll", "pitch", "yaw")
 
 
-@dataclass
-class ControlOutputs:
-    fw: FWControlOutputs = field(default_factory=FWControlOutputs)
-    quad: QuadControlOutputs = field(default_factory=QuadControlOutputs)
+class ControlOutputs(ArrayStruct):
+    __slots__ = ("_fw", "_quad")
+    _children = (("fw", FWControlOutputs), ("quad", QuadControlOutputs))
 
 
-@dataclass
+@dataclass(slots=True)
 class ControllerFlags:
     angle_ctrl_enabled: bool = False
     angle_rate_ctrl_enabled: bool = False
@@ -114,7 +250,7 @@ class ControllerFlags:
     current_mode: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ControllerResetFlags:
     reset_int: dict = field(
         default_factory=lambda: {
@@ -139,64 +275,157 @@ class ControllerResetFlags:
 ########################################################################
 
 
-@dataclass
-class UAVState:
-    armed: bool = False
-    flight_mode: str = "IDLE"
+def _euler_property(index: int):
+    # Euler angles are derived from the quaternion on first read after it changes
+    def fget(self):
+        if self._euler_stale:
+            self._sync_euler()
+        return self._view[index]
 
-    x: float = 0
-    y: float = 0
-    z: float = 0
+    def fset(self, value):
+        if self._euler_stale:
+            self._sync_euler()
+        view = self._view
+        view[index] = value
+        view[13], view[14], view[15], view[16] = euler_to_quaternion(view[6], view[7], view[8])
+        self._dcm = None
 
-    x_vel: float = 0
-    y_vel: float = 0
-    z_vel: float = 0
+    return property(fget, fset)
 
-    phi: float = 0  # roll
-    theta: float = 0  # pitch
-    psi: float = 0  # yaw
 
-    phi_rate: float = 0
-    theta_rate: float = 0
-    psi_rate: float = 0
+def _quaternion_property(index: int):
+    def fget(self):
+        return self._view[index]
 
-    airspeed: float = 0
+    def fset(self, value):
+        self._view[index] = value
+        self._euler_stale = True
+        self._dcm = None
 
+    return property(fget, fset)
 
-@dataclass
-class QuadActuators:
-    motor1: float = 0
-    motor2: float = 0
-    motor3: float = 0
-    motor4: float = 0
 
+# UAVState indices of the rigid-body vector used by the integrators and the batched simulation
+_RIGID_BODY_INDEX = np.array([0, 1, 2, 3, 4, 5, 13, 14, 15, 16, 9, 10, 11])
 
-@dataclass
-class FWActuators:
-    throttle: float = 0
-    aileron: float = 0
-    elevator: float = 0
-    rudder: float = 0
 
+class UAVState(ArrayStruct):
+    """
+    Vehicle state. The first 12 floats (x ... psi_rate) are the 6-DOF state vector with
+    Euler angles; airspeed and the attitude quaternion (q0 scalar, body to NED) follow.
+
+    The quaternion is the authoritative attitude. phi/theta/psi are recomputed from it only
+    when read after the quaternion changed, and setting an Euler angle updates the quaternion.
+    Write attitude through those setters or set_quaternion, not through as_array().
+    """
+
+    __slots__ = ("armed", "flight_mode", "_euler_stale", "_dcm")
+    _extras = (("armed", False), ("flight_mode", "IDLE"))
+    _fields = (
+        "x", "y", "z",
+        "x_vel", "y_vel", "z_vel",
+        "phi", "theta", "psi",  # roll, pitch, yaw
+        "phi_rate", "theta_rate", "psi_rate",
+        "airspeed",
+        "q0", "q1", "q2", "q3",  # attitude quaternion
+    )
+    _defaults = (("q0", 1.0),)
+
+    rigid_body_fields: tuple = ()  # position, body velocity, quaternion, body rates (set below)
+
+    phi = _euler_property(6)
+    theta = _euler_property(7)
+    psi = _euler_property(8)
+    q0 = _quaternion_property(13)
+    q1 = _quaternion_property(14)
+    q2 = _quaternion_property(15)
+    q3 = _quaternion_property(16)
+
+    def __init__(self, *args, buffer: np.ndarray | None = None, **kwargs):
+        self._euler_stale = False
+        self._dcm = None
+        super().__init__(*args, buffer=buffer, **kwargs)
+
+    @property
+    def quaternion(self) -> tuple:
+        view = self._view
+        return view[13], view[14], view[15], view[16]
+
+    def set_quaternion(self, q0: float, q1: float, q2: float, q3: float):
+        view = self._view
+        view[13], view[14], view[15], view[16] = q0, q1, q2, q3
+        self._euler_stale = True
+        self._dcm = None
+
+    def dcm(self) -> tuple:
+        """R_ned_to_body for the current attitude as a row-major 9-tuple, cached until it changes."""
+        if self._dcm is None:
+            self._dcm = quaternion_to_dcm(*self.quaternion)
+        return self._dcm
+
+    def rigid_body(self) -> np.ndarray:
+        """Copy of the state laid out as rigid_body_fields."""
+        return self._data[_RIGID_BODY_INDEX]
+
+    def set_rigid_body(self, values, dcm: tuple | None = None):
+        """
+        Overwrites position, velocity, quaternion and rates from a rigid_body_fields sequence.
+        dcm: R_ned_to_body of the new quaternion, if the caller has already built it.
+        """
+        self._data[_RIGID_BODY_INDEX] = values
+        self._euler_stale = True
+        self._dcm = dcm
+
+    def _sync_euler(self):
+        view = self._view
+        view[6], view[7], view[8] = quaternion_to_euler(view[13], view[14], view[15], view[16])
+        self._euler_stale = False
+
+    def as_array(self) -> np.ndarray:
+        if self._euler_stale:
+            self._sync_euler()
+        return self._data
 
-@dataclass
-class ActuatorOutputs:
-    quad: QuadActuators = field(default_factory=QuadActuators)
-    fw: FWActuators = field(default_factory=FWActuators)
+    def assign(self, values):
+        super().assign(values)
+        self._euler_stale = False
+        self._dcm = None
 
+    def copy_from(self, other: "UAVState"):
+        super().copy_from(other)
+        self._euler_stale = False
+        self._dcm = other._dcm
 
-@dataclass
-class UAVForces:
-    # Aero forces
-    lift: float = 0
-    drag: float = 0
+    def clear(self):
+        super().clear()
+        self._euler_stale = False
+        self._dcm = None
 
-    # Body-frame forces
-    fx: float = 0
-    fy: float = 0
-    fz: float = 0
 
-    # Moments
-    l: float = 0
-    m: float = 0
-    n: float = 0
+UAVState.rigid_body_fields = tuple(UAVState._fields[i] for i in _RIGID_BODY_INDEX)
+
+
+class QuadActuators(ArrayStruct):
+    __slots__ = ()
+    _fields = ("motor1", "motor2", "motor3", "motor4")
+
+
+class FWActuators(ArrayStruct):
+    __slots__ = ()
+    _fields = ("throttle", "aileron", "elevator", "rudder")
+
+
+class ActuatorOutputs(ArrayStruct):
+    """Laid out as motor1-4 then throttle, aileron, elevator, rudder."""
+
+    __slots__ = ("_quad", "_fw")
+    _children = (("quad", QuadActuators), ("fw", FWActuators))
+
+
+class UAVForces(ArrayStruct):
+    __slots__ = ()
+    _fields = (
+        "lift", "drag",  # Aero forces
+        "fx", "fy", "fz",  # Body-frame forces
+        "l", "m", "n",  # Moments
+    )
@@ -1,4 +1,5 @@
 import numpy as np
+from Global import fastmath
 
 
 def wrap(value, min_val, max_val):
@@ -16,8 +17,9 @@ def wrap(value, min_val, max_val):
     Returns:
         float: The wrapped value within the range [min_val, max_val].
     """
-    range_size = max_val - min_val
-    return (value - min_val) % range_size + min_val
+    if isinstance(value, np.ndarray):
+        return fastmath.batch_wrap(value, min_val, max_val)
+    return fastmath.wrap(value, min_val, max_val)
 
 #----------------Linear Scaling------------------
 def linear_scale(input:float, in_min:float, in_max:float, out_min:float, out_max:float):
@@ -37,36 +39,16 @@ def linear_scale(input:float, in_min:float, in_max:float, out_min:float, out_max
     if in_min == in_max:
         raise ValueError("Input range cannot be zero (in_min == in_max)")
 
-    # Clamp input to avoid extrapolation if needed
-    input = np.clip(input, in_min, in_max)
-
-    # Linear scaling formula
-    scaled = (input - in_min) / (in_max - in_min) * (out_max - out_min) + out_min
-    return scaled
+    # Clamp input to avoid extrapolation, then linear scaling (scalar path avoids NumPy dispatch)
+    if isinstance(input, np.ndarray):
+        return fastmath.batch_scale(input, in_min, in_max, out_min, out_max)
+    return fastmath.scale(input, in_min, in_max, out_min, out_max)
 
 
 # ---------- Rotation Matrix ----------
 def rotation_matrix(phi, theta, psi):
-    cphi, sphi = np.cos(phi), np.sin(phi)
-    ctheta, stheta = np.cos(theta), np.sin(theta)
-    cpsi, spsi = np.cos(psi), np.sin(psi)
-
-    R = np.array(
-        [
-            [ctheta * cpsi, ctheta * spsi, -stheta],
-            [
-                sphi * stheta * cpsi - cphi * spsi,
-                sphi * stheta * spsi + cphi * cpsi,
-                sphi * ctheta,
-            ],
-            [
-                cphi * stheta * cpsi + sphi * spsi,
-                cphi * stheta * spsi - sphi * cpsi,
-                cphi * ctheta,
-            ],
-        ]
-    )
-    return R
+    """R_ned_to_body as a 3x3 array (see fastmath.euler_to_dcm for the allocation-free 9-tuple)."""
+    return np.array(fastmath.euler_to_dcm(phi, theta, psi)).reshape(3, 3)
 
 
 # LOW PASS FILTER
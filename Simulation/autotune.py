@@ -0,0 +1,376 @@
+"""
+PID gain auto-tuner.
+Searches the controller gain space ("<fw|quad>.<loop>.<kp|ki|kd>" keys, as Scenario.gains and
+ControllerManager.set_gains) with an evolution strategy, evaluating every generation's candidates
+in parallel across worker processes. Each candidate is one closed-loop simulation scored by a
+cost function:
+
+    StepResponseCost  - setpoint steps fed straight to the controllers (no guidance): integrated
+                        absolute tracking error, normalized per setpoint, plus actuator effort
+    CrossTrackCost    - full mission flown headless: RMS distance from the current leg plus effort
+
+Diverging or crashing candidates get a penalty that grows the earlier they fail, so the search
+is pulled towards stable gains first.
+
+    tuner = GainTuner(COSTS["roll_step"], search_space(["fw.roll", "fw.roll_rate"], signed=True))
+    result = tuner.tune(generations=15)
+    print(result.summary())
+
+    python -m Simulation.autotune --cost roll_step --loops fw.roll,fw.roll_rate --signed --workers 8
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import numpy as np
+
+from AeroVehicle.Vehicle_Sim import UAVSimulation
+from Autonomy.Controller import ControllerManager, GAIN_TERMS
+from Autonomy.Mixer import Mixer
+from Global.simdata import ActuatorOutputs, ControllerFlags, TargetSetpoints, UAVState
+from Simulation.headless import HeadlessSimulator
+from Simulation.scenario import Scenario, default_scenario
+
+FAIL_COST = 1e3  # cost of a candidate that diverges on the first step
+ATTITUDE_LIMIT = math.radians(80.0)  # |roll| or |pitch| beyond this counts as lost control
+PWM_SPAN = 1000.0  # effort is measured in PWM_max - PWM_min units
+
+# Setpoint field -> (UAVState attribute it tracks, error scale); airspeed is tracked on body x velocity like fw_controller
+TRACKED = {
+    "fw.roll": ("phi", 0.1),
+    "fw.airspeed": ("x_vel", 1.0),
+    "fw.altitude": ("z", 5.0),
+    "quad.x": ("x", 1.0),
+    "quad.y": ("y", 1.0),
+    "quad.altitude": ("z", 1.0),
+    "quad.heading": ("psi", 0.1),
+}
+
+
+def _lost_control(state: UAVState) -> bool:
+    z = state.z
+    return not math.isfinite(z) or z >= 0.0 or abs(state.phi) > ATTITUDE_LIMIT or abs(state.theta) > ATTITUDE_LIMIT
+
+
+# ---------- cost functions ----------
+@dataclass
+class StepResponseCost:
+    """
+    Steps setpoints from the initial condition and scores the tracking of every setpoint of the mode.
+    FW starts from the scenario's trimmed state holding its airspeed and altitude; QD starts at rest.
+    """
+    mode: str = "FW"
+    steps: dict = field(default_factory=lambda: {"fw.roll": 0.3})  # setpoint field -> step size
+    duration: float = 10.0  # s
+    step_time: float = 1.0  # s
+    effort_weight: float = 0.1
+    scenario: Scenario = field(default_factory=default_scenario)
+
+    def initial(self) -> tuple[UAVState, TargetSetpoints, ActuatorOutputs | None]:
+        """Initial state, setpoints and trim PWM (FW with a trimmed scenario, else None)."""
+        targets = TargetSetpoints()
+        trim_pwm = None
+        if self.mode == "QD":
+            s = self.scenario.initial_state
+            state = UAVState(x=s.x, y=s.y, z=s.z, psi=s.psi)
+            targets.quad.assign((s.x, s.y, s.z, s.psi))
+        else:
+            state, trim_pwm = self.scenario.build_initial_conditions()
+            airspeed = self.scenario.trim_airspeed if self.scenario.trim_airspeed is not None else state.x_vel
+            targets.fw.assign((0.0, airspeed, state.z))
+        return state, targets, trim_pwm
+
+    def __call__(self, gains: dict) -> float:
+        dt = self.scenario.dt
+        state, targets, trim_pwm = self.initial()
+        controllers = ControllerManager(dt)
+        controllers.set_gains(gains)
+        mixer = Mixer()
+        sim = UAVSimulation(self.scenario.vehicle_prop, dt, wind=self.scenario.wind)
+        if trim_pwm is not None:
+            # candidate gains start holding the trim (after set_gains: the preload depends on ki)
+            sim.actuators.initialize(trim_pwm)
+            controllers.fw_controller.seed_trim(trim_pwm.fw, state)
+        flags = ControllerFlags(current_mode=self.mode)
+
+        prefix = "quad." if self.mode == "QD" else "fw."
+        tracked = [(name, TargetSetpoints.field_names.index(name), attr, scale)
+                   for name, (attr, scale) in TRACKED.items() if name.startswith(prefix)]
+        step_values = [(TargetSetpoints.field_names.index(name), size) for name, size in self.steps.items()]
+        target_array = targets.as_array()
+        n_steps = int(round(self.duration / dt))
+        step_index = int(round(self.step_time / dt))
+
+        error = effort = 0.0
+        previous = None
+        for k in range(n_steps):
+            if k == step_index:
+                for i, size in step_values:
+                    target_array[i] += size
+            pwm = mixer.run(self.mode, controllers.run(state, targets, flags)).as_array()
+            if previous is not None:
+                effort += float(np.dot(pwm - previous, pwm - previous))
+            previous = pwm.copy()
+            state, _ = sim.simulate_one_step(state, mixer.output)
+            if _lost_control(state):
+                return FAIL_COST * (2.0 - k / n_steps)
+            for _, i, attr, scale in tracked:
+                error += abs(target_array[i] - getattr(state, attr)) / scale
+        return (error + self.effort_weight * effort / PWM_SPAN ** 2) / n_steps
+
+
+@dataclass
+class CrossTrackCost:
+    """Flies the scenario mission with the candidate gains: RMS cross-track distance (m) plus effort."""
+    duration: float = 120.0  # s
+    effort_weight: float = 0.1
+    scenario: Scenario = field(default_factory=default_scenario)
+
+    def __call__(self, gains: dict) -> float:
+        scenario = replace(self.scenario, gains={**self.scenario.gains, **gains})
+        sim = HeadlessSimulator(scenario)
+        track = sim.GCS_data.mission.track
+        n_steps = int(round(self.duration * sim.freq))
+
+        squared = effort = 0.0
+        previous = None
+        for k in range(n_steps):
+            sim.step()
+            state = sim.current_state
+            if _lost_control(state):
+                return FAIL_COST * (2.0 - k / n_steps)
+            pwm = sim.control_input.as_array()
+            if previous is not None:
+                effort += float(np.dot(pwm - previous, pwm - previous))
+            previous = pwm.copy()
+
+            a, b = track.previous, track.target
+            leg_x, leg_y = b.x - a.x, b.y - a.y
+            length = math.hypot(leg_x, leg_y)
+            if length > 0:
+                squared += ((state.x - a.x) * leg_y - (state.y - a.y) * leg_x) ** 2 / (length * length)
+        return math.sqrt(squared / n_steps) + self.effort_weight * effort / PWM_SPAN ** 2 / n_steps
+
+
+COSTS = {
+    "roll_step": StepResponseCost("FW", {"fw.roll": 0.3}),
+    "altitude_step": StepResponseCost("FW", {"fw.altitude": -20.0}, duration=20.0),
+    "airspeed_step": StepResponseCost("FW", {"fw.airspeed": 3.0}, duration=15.0),
+    "quad_position": StepResponseCost("QD", {"quad.x": 5.0, "quad.y": -3.0, "quad.altitude": -5.0}),
+    "quad_heading": StepResponseCost("QD", {"quad.heading": 0.5}),
+    "cross_track": CrossTrackCost(),
+}
+
+
+# ---------- search space ----------
+def nominal_gains(dt: float = 0.01) -> dict:
+    """The hand-set controller gains."""
+    return ControllerManager(dt).get_gains()
+
+
+def search_space(loops, terms=GAIN_TERMS, scale: float = 5.0, signed: bool = False, dt: float = 0.01) -> dict:
+    """
+    Bounds for every gain term of the given loops ("fw.roll", "quad.x", ...) around the nominal gains:
+    [nominal / scale, nominal * scale] (searched in log space) for positive gains, [0, 1] for zero
+    gains, or [-m, m] with m = max(scale * |nominal|, 1) when signed (searched linearly, so the tuner
+    can also flip a loop's sign). Raises ValueError for unknown loops or terms.
+    """
+    nominal = nominal_gains(dt)
+    unknown = [f"{loop}.{term}" for loop in loops for term in terms if f"{loop}.{term}" not in nominal]
+    if unknown:
+        raise ValueError(f"Unknown PID gains {unknown}")
+    space = {}
+    for loop in loops:
+        for term in terms:
+            key = f"{loop}.{term}"
+            value = nominal[key]
+            if signed:
+                bound = max(scale * abs(value), 1.0)
+                space[key] = (-bound, bound)
+            elif value > 0:
+                space[key] = (value / scale, value * scale)
+            else:
+                space[key] = (0.0, 1.0)
+    return space
+
+
+# ---------- evolution strategy ----------
+_WORKER = {}
+
+
+def _init_worker(cost):
+    _WORKER["cost"] = cost
+
+
+def _evaluate(gains: dict) -> float:
+    return _WORKER["cost"](gains)
+
+
+@dataclass
+class TuningResult:
+    best_gains: dict
+    best_cost: float
+    initial_cost: float
+    evaluations: int
+    wall_time: float
+    history: list = field(default_factory=list)  # per generation: (best so far, generation median, sigma)
+
+    def per_loop(self) -> dict:
+        """{"fw.roll": {"kp": ..., "ki": ..., "kd": ...}, ...}"""
+        loops = {}
+        for key, value in self.best_gains.items():
+            loop, _, term = key.rpartition(".")
+            loops.setdefault(loop, {})[term] = value
+        return loops
+
+    def summary(self) -> str:
+        lines = [
+            f"cost {self.initial_cost:.4g} -> {self.best_cost:.4g} | {self.evaluations} evaluations | "
+            f"wall {self.wall_time:.1f} s"
+        ]
+        for loop, terms in self.per_loop().items():
+            controller, _, name = loop.partition(".")
+            args = ", ".join(f"{term}={value:.4g}" for term, value in terms.items())
+            lines.append(f"{controller}: self.pids[\"{name}\"].update_gains({args})")
+        return "\n".join(lines)
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps({
+            "best_gains": self.best_gains, "best_cost": self.best_cost, "initial_cost": self.initial_cost,
+            "evaluations": self.evaluations, "history": self.history,
+        }, indent=2))
+        return path
+
+
+class GainTuner:
+    """
+    (mu/mu_w, lambda) evolution strategy over the unit cube of the search space (log-scaled for
+    strictly positive bounds), with weighted recombination, elitism and a success-rule step size.
+    The best candidate so far competes with every new generation for a parent slot (elitism), and
+    the first candidate is the starting point itself, so the result is never worse than it.
+    """
+
+    def __init__(self, cost, space: dict, population: int = 16, sigma: float = 0.2, seed: int = 0,
+                 workers: int | None = None, initial: dict | None = None):
+        """
+        Args:
+            cost: picklable callable gains dict -> float (lower is better).
+            space (dict): gain key -> (low, high) bounds.
+            population (int): candidates per generation (lambda); the best quarter are the parents.
+            sigma (float): initial step size in unit-cube coordinates.
+            seed (int): RNG seed.
+            workers (int): processes; None uses os.cpu_count(), 0 or 1 evaluates in this process.
+            initial (dict): starting gains (default: the nominal controller gains, clipped to the space).
+        """
+        if not space:
+            raise ValueError("Empty search space, no gains to tune")
+        self.cost = cost
+        self.keys = list(space)
+        bounds = np.array([space[k] for k in self.keys], dtype=float)
+        self.low, self.high = bounds[:, 0], bounds[:, 1]
+        self.log = self.low > 0
+        self.population = population
+        self.n_parents = max(1, population // 4)
+        weights = np.log(self.n_parents + 0.5) - np.log(np.arange(1, self.n_parents + 1))
+        self.weights = weights / weights.sum()
+        self.sigma = sigma
+        self.rng = np.random.default_rng(seed)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        start = dict(nominal_gains())
+        start.update(initial or {})
+        self.mean = self.encode(np.array([start.get(k, 0.0) for k in self.keys]))
+
+    # ---------- unit cube <-> gains ----------
+    def encode(self, gains: np.ndarray) -> np.ndarray:
+        gains = np.clip(gains, self.low, self.high)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u = np.where(self.log, np.log(gains / self.low) / np.log(self.high / self.low),
+                         (gains - self.low) / (self.high - self.low))
+        return np.clip(np.nan_to_num(u, nan=0.5), 0.0, 1.0)
+
+    def decode(self, u: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_gains = self.low * (self.high / self.low) ** u
+        return np.where(self.log, log_gains, self.low + u * (self.high - self.low))
+
+    def gains(self, u: np.ndarray) -> dict:
+        return dict(zip(self.keys, self.decode(u).tolist()))
+
+    # ---------- search ----------
+    def tune(self, generations: int = 20, callback=None) -> TuningResult:
+        """
+        Runs the search; callback(generation, best_cost, best_gains) is called after every generation.
+        """
+        start = time.perf_counter()
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.cost,))
+        evaluate = (lambda c: list(pool.map(_evaluate, c))) if pool else (lambda c: [self.cost(g) for g in c])
+
+        try:
+            best_u, best_cost, initial_cost = self.mean, math.inf, None
+            history, evaluations = [], 0
+            for generation in range(generations):
+                u = np.clip(self.mean + self.sigma * self.rng.standard_normal((self.population, len(self.keys))), 0.0, 1.0)
+                if generation == 0:
+                    u[0] = self.mean  # score the starting point
+                costs = np.array(evaluate([self.gains(row) for row in u]))
+                evaluations += len(u)
+                if initial_cost is None:
+                    initial_cost = float(costs[0])
+
+                improved = costs.min() < best_cost
+                if generation > 0:
+                    # elitism: the best point so far (already scored) ranks with the new candidates
+                    u, costs = np.vstack((u, best_u)), np.append(costs, best_cost)
+                order = np.argsort(costs)
+                if improved:
+                    best_u, best_cost = u[order[0]].copy(), float(costs[order[0]])
+                self.mean = self.weights @ u[order[:self.n_parents]]
+                self.sigma = float(np.clip(self.sigma * (1.2 if improved else 0.82), 0.01, 0.5))
+
+                history.append((best_cost, float(np.median(costs)), self.sigma))
+                if callback is not None:
+                    callback(generation, best_cost, self.gains(best_u))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return TuningResult(self.gains(best_u), best_cost, initial_cost, evaluations,
+                            time.perf_counter() - start, history)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune PID gains by evolutionary search over closed-loop simulations.")
+    parser.add_argument("--cost", choices=list(COSTS), default="roll_step")
+    parser.add_argument("--loops", default="fw.roll,fw.roll_rate", help="comma-separated <fw|quad>.<loop> names")
+    parser.add_argument("--terms", default="kp,ki,kd", help="gain terms to tune")
+    parser.add_argument("--scale", type=float, default=5.0, help="search range factor around the nominal gains")
+    parser.add_argument("--signed", action="store_true", help="search [-m, m] so loop signs can flip")
+    parser.add_argument("--generations", type=int, default=15)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs, 1 = in process)")
+    parser.add_argument("--out", default=None, help="write the result as JSON")
+    args = parser.parse_args()
+
+    try:
+        space = search_space(args.loops.split(","), tuple(args.terms.split(",")), args.scale, args.signed)
+    except ValueError as e:
+        parser.error(str(e))
+    tuner = GainTuner(COSTS[args.cost], space, args.population, seed=args.seed, workers=args.workers)
+    result = tuner.tune(args.generations, callback=lambda g, c, _: print(f"generation {g + 1}: best cost {c:.4g}"))
+    print(result.summary())
+    if args.out:
+        print(f"Result written to {result.save(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
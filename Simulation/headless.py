@@ -0,0 +1,154 @@
+"""
+Headless simulation runner.
+Drives the autopilot and vehicle simulation in a tight loop, without the VPython GUI and
+without real-time pacing, so a scenario runs as fast as the CPU allows.
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field
+
+from AeroVehicle.Vehicle_Sim import UAVSimulation
+from AeroVehicle.point_mass import PointMassSimulation
+from Autonomy.Autopilot import UAVAutopilot
+from Global.simdata import UAVForces, UAVState, ActuatorOutputs, GCSData
+from Simulation.scenario import Scenario, default_scenario, start_in_trim, FIDELITIES
+from Simulation.profiler import StageProfiler, instrument_autopilot, instrument_simulation
+
+
+@dataclass
+class RunReport:
+    scenario: str = ""
+    steps: int = 0
+    sim_time: float = 0.0  # simulated seconds
+    wall_time: float = 0.0  # elapsed wall-clock seconds
+    final_state: UAVState = field(default_factory=UAVState)
+
+    @property
+    def steps_per_sec(self) -> float:
+        return self.steps / self.wall_time if self.wall_time > 0 else float("inf")
+
+    @property
+    def realtime_factor(self) -> float:
+        return self.sim_time / self.wall_time if self.wall_time > 0 else float("inf")
+
+    def summary(self) -> str:
+        return (
+            f"[{self.scenario}] {self.steps} steps | sim {self.sim_time:.1f} s | "
+            f"wall {self.wall_time:.2f} s | {self.steps_per_sec:.0f} steps/s | "
+            f"x{self.realtime_factor:.1f} real time"
+        )
+
+
+class HeadlessSimulator:
+    def __init__(self, scenario: Scenario | None = None, profiler: StageProfiler | None = None):
+        self.scenario = scenario if scenario is not None else default_scenario()
+        self.profiler = profiler if profiler is not None else StageProfiler()  # disabled by default
+        self.freq = self.scenario.freq
+        self.dt = self.scenario.dt
+        self.reset()
+
+    def reset(self):
+        self.GCS_data: GCSData = self.scenario.build_gcs_data()
+        self.current_state, trim_pwm = self.scenario.build_initial_conditions()
+        self.control_input: ActuatorOutputs = ActuatorOutputs()
+        self.forces_moments: UAVForces = UAVForces()
+
+        self.simulation = UAVSimulation(self.scenario.vehicle_prop, self.dt, self.scenario.integrator,
+                                        wind=self.scenario.wind, **self.scenario.integrator_options)
+        self.point_mass = PointMassSimulation(self.scenario.vehicle_prop, self.dt)
+        self.autopilot = UAVAutopilot(self.GCS_data, self.dt)
+        self.autopilot.controller_mgr.set_gains(self.scenario.gains)
+        self.steps = 0
+        self.set_fidelity(self.scenario.fidelity)
+        if trim_pwm is not None:
+            # start holding the trim: actuators at the trim positions, FW integrators preloaded
+            self.control_input = start_in_trim(trim_pwm, self.current_state, self.autopilot, self.simulation.actuators)
+
+        # no-ops unless the profiler is enabled
+        self.profiler.instrument(self.autopilot, "run", "autopilot")
+        self.profiler.instrument(self.simulation, "simulate_one_step", "physics")
+        self.profiler.instrument(self.point_mass, "simulate_one_step", "point_mass")
+        instrument_autopilot(self.profiler, self.autopilot)
+        instrument_simulation(self.profiler, self.simulation)
+
+    @property
+    def sim_time(self) -> float:
+        return self.steps * self.dt
+
+    def set_fidelity(self, fidelity: str):
+        """
+        Switches the vehicle model at runtime: "6dof" (autopilot + UAVSimulation) or "point_mass"
+        (navigation setpoints straight into the point-mass model, no inner loops). The current
+        state carries over, so a run can cruise in point mass and refine in 6-DOF.
+        """
+        if fidelity not in FIDELITIES:
+            print(f"[ERROR] Unknown fidelity '{fidelity}', expected one of {FIDELITIES}")
+            return
+        if fidelity == "6dof":
+            self.simulation.actuators.reset()  # start from the first command, not a stale position
+        self.fidelity = fidelity
+        self._step = self._step_6dof if fidelity == "6dof" else self._step_point_mass
+
+    def step(self):
+        self._step()
+
+    def _step_6dof(self):
+        self.control_input = self.autopilot.run(self.current_state, self.GCS_data)
+        self.current_state, self.forces_moments = self.simulation.simulate_one_step(self.current_state, self.control_input)
+        self.steps += 1
+
+    def _step_point_mass(self):
+        nav_target, flags = self.autopilot.run_navigation(self.current_state, self.GCS_data)
+        self.current_state, self.forces_moments = self.point_mass.simulate_one_step(
+            self.current_state, nav_target, flags.current_mode
+        )
+        self.steps += 1
+
+    def run(self, duration: float) -> RunReport:
+        """
+        Runs the scenario for `duration` simulated seconds as fast as possible.
+        """
+        n_steps = int(round(duration * self.freq))
+        step = self.step
+
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            step()
+        wall_time = time.perf_counter() - start
+
+        return RunReport(
+            scenario=self.scenario.name,
+            steps=n_steps,
+            sim_time=n_steps * self.dt,
+            wall_time=wall_time,
+            final_state=self.current_state.copy(),  # the live state keeps changing if run() is called again
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a UAV scenario headless, faster than real time.")
+    parser.add_argument("--duration", type=float, default=600.0, help="simulated seconds to fly")
+    parser.add_argument("--freq", type=float, default=None, help="override the scenario step rate (Hz)")
+    parser.add_argument("--fidelity", choices=FIDELITIES, default=None, help="override the scenario vehicle model")
+    parser.add_argument("--profile", action="store_true", help="time each stage and print a summary")
+    parser.add_argument("--profile-out", default=None, help="write flame-graph collapsed stacks to this file")
+    args = parser.parse_args()
+
+    scenario = default_scenario()
+    if args.freq is not None:
+        scenario.freq = args.freq
+    if args.fidelity is not None:
+        scenario.fidelity = args.fidelity
+
+    profiler = StageProfiler(enabled=args.profile or args.profile_out is not None)
+    report = HeadlessSimulator(scenario, profiler).run(args.duration)
+    print(report.summary())
+    if profiler.enabled:
+        print(profiler.summary())
+    if args.profile_out:
+        print(f"Collapsed stacks written to {profiler.export(args.profile_out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""
+Monte Carlo runner.
+Disperses a nominal scenario (vehicle coefficients, mass and inertia, initial state, waypoints,
+wind, PID gains, any Scenario attribute) from declared distributions, flies every run headless
+across a process pool and streams per-run summary metrics back as chunks finish.
+
+Every run draws from its own RNG, seeded from (seed, run index), so a campaign gives the same
+samples and results whatever the worker count or chunk size, and any single run can be replayed.
+With a ResultCache, runs whose dispersed scenario was already flown are read back instead of
+being dispatched, so a re-run or an extended campaign only pays for new runs.
+
+    campaign = MonteCarlo(default_scenario(), {
+        "vehicle.m": Normal(0.05, relative=True),
+        "vehicle.CL_alpha": Uniform(-0.1, 0.1, relative=True),
+        "initial.psi": Uniform(-0.5, 0.5),
+        "waypoints.x": Normal(50.0),
+        "wind.north": Normal(3.0),
+        "gains.fw.roll.kp": Normal(0.1, relative=True),
+    }, duration=120.0, seed=1)
+    report = campaign.run(n_runs=10_000, workers=8)
+    print(report.summary())
+
+    python -m Simulation.montecarlo --runs 1000 --duration 60 --workers 8 --out runs.csv --cache
+"""
+
+import argparse
+import copy
+import csv
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import numpy as np
+
+from Simulation.headless import HeadlessSimulator
+from Simulation.result_cache import ResultCache, scenario_key
+from Simulation.scenario import Scenario, default_scenario, FIDELITIES
+
+PERCENTILES = (1, 5, 50, 95, 99)
+WIND_AXES = ("north", "east", "down")
+TRAJECTORY_RATE = 10.0  # Hz, state samples kept per run when trajectories are cached
+
+
+# ---------- distributions ----------
+@dataclass
+class Normal:
+    """Gaussian perturbation with standard deviation `sigma` (a fraction of the nominal if relative)."""
+    sigma: float
+    mean: float = 0.0
+    relative: bool = False
+
+    def sample(self, rng: np.random.Generator, nominal: float) -> float:
+        delta = rng.normal(self.mean, self.sigma)
+        return nominal * (1.0 + delta) if self.relative else nominal + delta
+
+
+@dataclass
+class Uniform:
+    """Uniform perturbation in [low, high) (fractions of the nominal if relative)."""
+    low: float
+    high: float
+    relative: bool = False
+
+    def sample(self, rng: np.random.Generator, nominal: float) -> float:
+        delta = rng.uniform(self.low, self.high)
+        return nominal * (1.0 + delta) if self.relative else nominal + delta
+
+
+@dataclass
+class Choice:
+    """Replaces the nominal with one of `options`."""
+    options: tuple
+
+    def sample(self, rng: np.random.Generator, nominal):
+        return self.options[rng.integers(len(self.options))]
+
+
+# ---------- dispersion ----------
+def run_rng(seed: int, run: int) -> np.random.Generator:
+    """Independent generator of one run, reproducible from (seed, run index) alone."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(run,)))
+
+
+def disperse(nominal: Scenario, dispersions: dict, rng: np.random.Generator) -> tuple[Scenario, dict]:
+    """
+    Draws one dispersed copy of a scenario.
+
+    Args:
+        nominal (Scenario): left untouched.
+        dispersions (dict): path -> distribution, paths being
+            "vehicle.<key>"                     vehicle-property entry (coefficients, m, Jx, ...)
+            "initial.<field>"                   initial_state field (x, z, psi, ...)
+            "waypoints.<x|y|z|heading>"         every waypoint, drawn independently
+            "wind.<north|east|down>"            steady wind component
+            "gains.<fw|quad>.<loop>.<term>"     PID gain, nominal from the controllers
+            "<attribute>"                       any other Scenario attribute (trim_airspeed, freq, ...)
+        rng: generator of this run; paths are drawn in sorted order so the draws do not depend
+            on dict order.
+
+    Returns:
+        (scenario, samples): the dispersed scenario and the drawn value of every scalar path.
+    """
+    scenario = copy.deepcopy(nominal)
+    scenario.vehicle_prop = dict(scenario.vehicle_prop)
+    wind = list(scenario.wind)
+    samples = {}
+    for path in sorted(dispersions):
+        dist = dispersions[path]
+        group, _, key = path.partition(".")
+        if group == "vehicle":
+            scenario.vehicle_prop[key] = samples[path] = dist.sample(rng, scenario.vehicle_prop[key])
+        elif group == "initial":
+            value = dist.sample(rng, getattr(scenario.initial_state, key))
+            setattr(scenario.initial_state, key, value)
+            samples[path] = value
+        elif group == "waypoints":
+            for waypoint in scenario.waypoints:
+                setattr(waypoint, key, dist.sample(rng, getattr(waypoint, key)))
+        elif group == "wind":
+            axis = WIND_AXES.index(key)
+            wind[axis] = samples[path] = dist.sample(rng, wind[axis])
+        elif group == "gains":
+            nominal_gain = scenario.gains.get(key, _nominal_gains(scenario.dt).get(key))
+            if nominal_gain is None:
+                print(f"[ERROR] Unknown PID gain '{key}'")
+                continue
+            scenario.gains[key] = samples[path] = dist.sample(rng, nominal_gain)
+        else:
+            value = dist.sample(rng, getattr(scenario, path))
+            setattr(scenario, path, value)
+            samples[path] = value
+    scenario.wind = tuple(wind)
+    if scenario.vehicle_prop != nominal.vehicle_prop and scenario.trim_reference is None:
+        scenario.trim_reference = nominal.vehicle_prop  # re-solve one trim point, not a whole table
+    return scenario, samples
+
+
+_GAINS = {}
+
+
+def _nominal_gains(dt: float) -> dict:
+    # hand-set controller gains, built once per process
+    if dt not in _GAINS:
+        from Autonomy.Controller import ControllerManager
+        _GAINS[dt] = ControllerManager(dt).get_gains()
+    return _GAINS[dt]
+
+
+# ---------- one run ----------
+def fly(scenario: Scenario, duration: float, trajectory: list | None = None) -> dict:
+    """
+    Flies a scenario headless and returns its summary metrics, accumulated as it flies.
+    A run stops early when the vehicle hits the ground (z >= 0) or the state goes non-finite.
+
+    Args:
+        trajectory (list): if given, UAVState arrays are appended to it at TRAJECTORY_RATE.
+    """
+    start = time.perf_counter()
+    sim = HeadlessSimulator(scenario)
+    n_steps = int(round(duration * sim.freq))
+    step, dt = sim.step, sim.dt
+    mission = sim.GCS_data.mission
+    every = max(1, int(round(sim.freq / TRAJECTORY_RATE)))
+
+    alt_sq = speed_sum = 0.0
+    max_bank = max_rate = 0.0
+    min_altitude = math.inf
+    waypoint, waypoints_reached = mission.current_index, 0
+    failed = ""
+    steps = 0
+    for steps in range(1, n_steps + 1):
+        step()
+        s = sim.current_state
+        z = s.z
+        if not math.isfinite(z):
+            failed = "diverged"
+            break
+        target_z = mission.waypoints[mission.current_index].z if mission.waypoints else z
+        alt_sq += (z - target_z) ** 2
+        speed_sum += math.sqrt(s.x_vel * s.x_vel + s.y_vel * s.y_vel + s.z_vel * s.z_vel)
+        min_altitude = min(min_altitude, -z)
+        max_bank = max(max_bank, abs(s.phi))
+        max_rate = max(max_rate, abs(s.phi_rate), abs(s.theta_rate), abs(s.psi_rate))
+        if mission.current_index != waypoint:
+            waypoint = mission.current_index
+            waypoints_reached += 1
+        if trajectory is not None and steps % every == 0:
+            trajectory.append(s.as_array().copy())
+        if z >= 0.0:
+            failed = "ground"
+            break
+
+    s = sim.current_state
+    return {
+        "sim_time": steps * dt,
+        "failed": failed,
+        "final_x": s.x,
+        "final_y": s.y,
+        "final_altitude": -s.z,
+        "min_altitude": min_altitude,
+        "altitude_rms": math.sqrt(alt_sq / steps) if steps else 0.0,
+        "mean_speed": speed_sum / steps if steps else 0.0,
+        "max_bank": max_bank,
+        "max_rate": max_rate,
+        "waypoints_reached": waypoints_reached,
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def run_one(nominal: Scenario, dispersions: dict, seed: int, run: int, duration: float,
+            cache: ResultCache | None = None, trajectories: bool = False, fly_missing: bool = True) -> dict | None:
+    """
+    Disperses and flies run `run`; the result holds the run index, the samples and the metrics.
+    With a cache the metrics are looked up by the dispersed scenario's content hash first, and new
+    results (plus the trajectory if requested) are stored; an entry without the requested trajectory
+    is flown again. fly_missing=False returns None on a miss. wall_time is not cached, it reads NaN
+    for runs answered by the cache.
+    """
+    scenario, samples = disperse(nominal, dispersions, run_rng(seed, run))
+    key = metrics = None
+    if cache is not None:
+        key = scenario_key(scenario, duration=duration)
+        metrics = cache.get(key, with_trajectory=trajectories)
+    cached = metrics is not None
+    if not cached:
+        if not fly_missing:
+            return None
+        trajectory = [] if cache is not None and trajectories else None
+        metrics = fly(scenario, duration, trajectory)
+        if cache is not None:
+            stored = {name: value for name, value in metrics.items() if name != "wall_time"}  # this run's timing only
+            cache.put(key, stored, None if trajectory is None else np.array(trajectory))
+    else:
+        metrics["wall_time"] = float("nan")  # not flown in this run
+
+    result = {"run": run}
+    result.update(samples)
+    result.update(metrics)
+    result["cached"] = cached
+    return result
+
+
+# ---------- process pool ----------
+_WORKER = {}
+
+
+def _init_worker(nominal, dispersions, seed, duration, cache, trajectories):
+    # the campaign definition is sent once per worker, not with every chunk
+    _WORKER.update(nominal=nominal, dispersions=dispersions, seed=seed, duration=duration,
+                   cache=cache, trajectories=trajectories)
+
+
+def _run_chunk(runs: list) -> list[dict]:
+    w = _WORKER
+    return [run_one(w["nominal"], w["dispersions"], w["seed"], run, w["duration"], w["cache"], w["trajectories"])
+            for run in runs]
+
+
+@dataclass
+class MonteCarloReport:
+    results: list = field(default_factory=list)  # per-run dicts, sorted by run index
+    wall_time: float = 0.0
+
+    @property
+    def n_runs(self) -> int:
+        return len(self.results)
+
+    def column(self, name: str) -> np.ndarray:
+        return np.array([r[name] for r in self.results], dtype=float)
+
+    def metrics(self) -> list[str]:
+        """Numeric columns (samples and metrics)."""
+        if not self.results:
+            return []
+        return [k for k, v in self.results[0].items()
+                if k != "run" and isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+    def failure_rate(self) -> float:
+        return sum(1 for r in self.results if r["failed"]) / self.n_runs if self.results else 0.0
+
+    def percentiles(self, percentiles=PERCENTILES) -> dict:
+        """{column: {"mean", "std", "p1", ...}} over all runs (NaN-aware)."""
+        stats = {}
+        for name in self.metrics():
+            values = self.column(name)
+            if np.isnan(values).all():
+                continue  # e.g. wall_time when every run came from the result cache
+            row = {"mean": float(np.nanmean(values)), "std": float(np.nanstd(values))}
+            row.update({f"p{p}": float(v) for p, v in zip(percentiles, np.nanpercentile(values, percentiles))})
+            stats[name] = row
+        return stats
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.results)
+
+    def summary(self) -> str:
+        sim_time = sum(r["sim_time"] for r in self.results)
+        lines = [
+            f"{self.n_runs} runs | failed {self.failure_rate() * 100:.1f} % | wall {self.wall_time:.1f} s | "
+            f"{sim_time / self.wall_time if self.wall_time > 0 else float('inf'):.0f} sim-s / wall-s",
+            f"{'metric':<24}" + "".join(f"{k:>12}" for k in ("mean", "std") + tuple(f"p{p}" for p in PERCENTILES)),
+        ]
+        for name, row in self.percentiles().items():
+            lines.append(f"{name:<24}" + "".join(f"{v:>12.4g}" for v in row.values()))
+        return "\n".join(lines)
+
+
+class MonteCarlo:
+    def __init__(self, nominal: Scenario, dispersions: dict, duration: float = 60.0, seed: int = 0,
+                 cache: ResultCache | None = None, trajectories: bool = False):
+        """
+        Args:
+            cache (ResultCache): skip runs already on disk and store new ones.
+            trajectories (bool): also cache each run's state history at TRAJECTORY_RATE.
+        """
+        self.nominal = nominal
+        self.dispersions = dispersions
+        self.duration = duration
+        self.seed = seed
+        self.cache = cache
+        self.trajectories = trajectories
+
+    def iter_results(self, n_runs: int, workers: int | None = None, chunk_size: int | None = None,
+                     start: int = 0) -> Iterator[dict]:
+        """
+        Yields per-run results as their chunks finish (completion order, not run order).
+
+        Args:
+            n_runs (int): number of runs, indices start .. start + n_runs - 1.
+            workers (int): processes; None uses os.cpu_count(), 0 or 1 runs in this process.
+            chunk_size (int): runs per task; defaults to about four tasks per worker.
+            start (int): first run index, to extend or resume a campaign.
+        """
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        args = (self.nominal, self.dispersions, self.seed)
+        runs = range(start, start + n_runs)
+        if workers <= 1:
+            for run in runs:
+                yield run_one(*args, run, self.duration, self.cache, self.trajectories)
+            return
+
+        # cached runs are answered here, only the missing ones go to the pool
+        missing = []
+        for run in runs:
+            result = None
+            if self.cache is not None:
+                result = run_one(*args, run, self.duration, self.cache, self.trajectories, fly_missing=False)
+            if result is None:
+                missing.append(run)
+            else:
+                yield result
+        if not missing:
+            return
+
+        chunk_size = chunk_size or max(1, math.ceil(len(missing) / (4 * workers)))
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            initializer=_init_worker,
+            initargs=(*args, self.duration, self.cache, self.trajectories),
+        ) as pool:
+            for future in as_completed([pool.submit(_run_chunk, chunk) for chunk in chunks]):
+                yield from future.result()
+
+    def run(self, n_runs: int, workers: int | None = None, chunk_size: int | None = None, start: int = 0,
+            callback=None) -> MonteCarloReport:
+        """Runs the campaign; callback(result) is called on every result as it arrives."""
+        begin = time.perf_counter()
+        results = []
+        for result in self.iter_results(n_runs, workers, chunk_size, start):
+            results.append(result)
+            if callback is not None:
+                callback(result)
+        results.sort(key=lambda r: r["run"])
+        return MonteCarloReport(results, time.perf_counter() - begin)
+
+
+def default_dispersions() -> dict:
+    """Typical campaign: +-5 % mass / inertia, +-10 % key aero derivatives, heading, waypoints and wind."""
+    return {
+        "vehicle.m": Normal(0.05, relative=True),
+        "vehicle.Jx": Normal(0.05, relative=True),
+        "vehicle.Jy": Normal(0.05, relative=True),
+        "vehicle.Jz": Normal(0.05, relative=True),
+        "vehicle.CL_alpha": Normal(0.1, relative=True),
+        "vehicle.CD0": Normal(0.1, relative=True),
+        "vehicle.Cm_alpha": Normal(0.1, relative=True),
+        "initial.psi": Uniform(-math.pi, math.pi),
+        "trim_airspeed": Uniform(-2.0, 2.0),
+        "waypoints.x": Normal(100.0),
+        "waypoints.y": Normal(100.0),
+        "wind.north": Normal(3.0),
+        "wind.east": Normal(3.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo campaign over the default scenario.")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60.0, help="simulated seconds per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs, 1 = in process)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--fidelity", choices=FIDELITIES, default=None)
+    parser.add_argument("--freq", type=float, default=None, help="override the scenario step rate (Hz)")
+    parser.add_argument("--out", default=None, help="stream per-run results to this CSV file")
+    parser.add_argument("--cache", action="store_true", help="reuse and store results in the result cache")
+    parser.add_argument("--trajectories", action="store_true", help="also cache each run's trajectory")
+    args = parser.parse_args()
+
+    scenario = default_scenario()
+    if args.fidelity is not None:
+        scenario.fidelity = args.fidelity
+    if args.freq is not None:
+        scenario.freq = args.freq
+
+    cache = ResultCache() if args.cache or args.trajectories else None
+    campaign = MonteCarlo(scenario, default_dispersions(), args.duration, args.seed, cache, args.trajectories)
+    out = open(args.out, "w", newline="") if args.out else None
+    writer = None
+
+    def write_row(result):
+        nonlocal writer
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(result))
+            writer.writeheader()
+        writer.writerow(result)
+        out.flush()
+
+    try:
+        report = campaign.run(args.runs, args.workers, args.chunk_size, callback=write_row if out else None)
+    finally:
+        if out is not None:
+            out.close()  # also on errors and Ctrl-C: the rows streamed so far stay readable
+    print(report.summary())
+    if cache is not None:
+        print(f"{sum(r['cached'] for r in report.results)} of {report.n_runs} runs from the result cache")
+
+
+if __name__ == "__main__":
+    main()
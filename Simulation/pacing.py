@@ -0,0 +1,208 @@
+"""
+Real-time pacing.
+RealTimePacer keeps a loop on an absolute deadline grid (t0 + k * period) measured with
+perf_counter_ns, so sleep overshoot and uneven frame cost never accumulate into drift.
+It sleeps most of the wait and spins the last fraction of a millisecond to land on the deadline.
+
+When a frame's work runs past the next deadline the catch-up policy decides what happens:
+    "burst"    - run the missed frames back to back (up to max_burst), sim time stays locked
+                 to wall time; anything beyond max_burst is dropped
+    "skip"     - drop the missed frames and continue on the same grid; sim time falls behind
+    "slowdown" - re-anchor the grid at the late frame; sim time runs slower than real time
+
+Frame work time and deadline lateness go into latency histograms, and missed deadlines
+are counted and reported so an operator can see when real time can no longer be held.
+"""
+
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+POLICIES = ("burst", "skip", "slowdown")
+
+# Histogram bucket upper edges (ns): 10 us ... 100 ms, roughly 1-2-5 spaced
+DEFAULT_EDGES_NS = tuple(int(v * 1000) for v in (
+    10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000,
+))
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in nanoseconds."""
+
+    def __init__(self, edges_ns: tuple = DEFAULT_EDGES_NS):
+        self.edges_ns = tuple(edges_ns)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.edges_ns) + 1)  # last bucket: above the largest edge
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, value_ns: int):
+        self.counts[bisect_left(self.edges_ns, value_ns)] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> int:
+        """Upper edge of the bucket holding the p-th percentile, capped at the largest value seen."""
+        if not self.count:
+            return 0
+        target = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return min(self.edges_ns[i], self.max_ns) if i < len(self.edges_ns) else self.max_ns
+        return self.max_ns
+
+    def rows(self) -> list[tuple[str, int]]:
+        """(bucket label, count) pairs for non-empty buckets."""
+        rows = []
+        for i, n in enumerate(self.counts):
+            if n:
+                label = f"<= {_fmt_ns(self.edges_ns[i])}" if i < len(self.edges_ns) else f"> {_fmt_ns(self.edges_ns[-1])}"
+                rows.append((label, n))
+        return rows
+
+
+def _fmt_ns(ns: float) -> str:
+    return f"{ns / 1e6:.2f} ms" if ns >= 1e6 else f"{ns / 1e3:.0f} us"
+
+
+@dataclass
+class PacingStats:
+    frames: int = 0  # loop iterations paced
+    sim_frames: int = 0  # frames of simulated time handed out
+    missed_deadlines: int = 0  # iterations whose work ran past the next deadline
+    dropped_frames: int = 0  # frames never simulated (skip policy, or beyond max_burst)
+    bursts: int = 0  # catch-up iterations that ran more than one frame
+    work: LatencyHistogram = field(default_factory=LatencyHistogram)  # time spent between waits
+    lateness: LatencyHistogram = field(default_factory=LatencyHistogram)  # wake-up time past the deadline
+
+
+class RealTimePacer:
+    def __init__(self, period: float, policy: str = "burst", max_burst: int = 5,
+                 spin_ns: int = 200_000, warn_interval: float | None = 5.0):
+        """
+        Args:
+            period (float): frame period in seconds.
+            policy (str): catch-up policy, one of POLICIES.
+            max_burst (int): most frames run back to back by the "burst" policy.
+            spin_ns (int): final part of each wait that is busy-waited instead of slept.
+            warn_interval (float): minimum seconds between overrun warnings, None to stay silent.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown pacing policy '{policy}', choose from {POLICIES}")
+        self.period_ns = round(period * 1e9)
+        self.policy = policy
+        self.max_burst = max(1, max_burst)
+        self.spin_ns = spin_ns
+        self.warn_interval_ns = None if warn_interval is None else round(warn_interval * 1e9)
+        self.stats = PacingStats()
+        self._deadline = None
+        self._wake = 0
+        self._start = 0
+        self._last_warn = 0
+        self._missed_at_warn = 0
+
+    def start(self):
+        """Anchors the deadline grid at now. Called by the first wait() if needed."""
+        now = time.perf_counter_ns()
+        self._start = self._wake = self._last_warn = now
+        self._deadline = now + self.period_ns
+
+    def wait(self) -> int:
+        """
+        Ends the current frame: records its work time, then blocks until the next deadline
+        or applies the catch-up policy if that deadline has already passed.
+
+        Returns:
+            Number of frames of simulated time to run before the next wait(), at least 1.
+        """
+        if self._deadline is None:
+            self.start()
+            self.stats.frames += 1
+            self.stats.sim_frames += 1
+            return 1
+
+        stats = self.stats
+        period = self.period_ns
+        now = time.perf_counter_ns()
+        stats.work.add(now - self._wake)
+        stats.frames += 1
+        frames = 1
+
+        late = now - self._deadline
+        if late <= 0:
+            self._sleep_until(self._deadline)
+            self._wake = time.perf_counter_ns()
+            stats.lateness.add(self._wake - self._deadline)
+            self._deadline += period
+        else:
+            stats.missed_deadlines += 1
+            stats.lateness.add(late)
+            passed = late // period + 1  # deadlines already behind us
+            if self.policy == "slowdown":
+                self._deadline = now + period
+            else:
+                if self.policy == "burst":
+                    frames = min(passed, self.max_burst)
+                stats.dropped_frames += passed - frames
+                self._deadline += passed * period
+            if frames > 1:
+                stats.bursts += 1
+            self._wake = now
+            self._maybe_warn(now)
+
+        stats.sim_frames += frames
+        return frames
+
+    def _sleep_until(self, deadline: int):
+        remaining = deadline - time.perf_counter_ns()
+        if remaining > self.spin_ns:
+            time.sleep((remaining - self.spin_ns) / 1e9)
+        while time.perf_counter_ns() < deadline:
+            pass
+
+    def _maybe_warn(self, now: int):
+        if self.warn_interval_ns is None or now - self._last_warn < self.warn_interval_ns:
+            return
+        missed = self.stats.missed_deadlines - self._missed_at_warn
+        print(f"[PACING] real time not held: {missed} missed deadlines in the last "
+              f"{(now - self._last_warn) / 1e9:.1f} s, worst so far {_fmt_ns(self.stats.lateness.max_ns)} late "
+              f"(x{self.realtime_factor:.2f} real time, policy '{self.policy}')")
+        self._last_warn = now
+        self._missed_at_warn = self.stats.missed_deadlines
+
+    # ---------- reporting ----------
+    @property
+    def realtime_factor(self) -> float:
+        """Simulated time handed out divided by elapsed wall time since start."""
+        elapsed = time.perf_counter_ns() - self._start
+        return self.stats.sim_frames * self.period_ns / elapsed if self._deadline is not None and elapsed > 0 else 0.0
+
+    def reset_stats(self):
+        self.stats = PacingStats()
+        self._missed_at_warn = 0
+
+    def report(self) -> str:
+        s = self.stats
+        lines = [
+            f"Pacing: {s.frames} frames @ {1e9 / self.period_ns:.1f} Hz, policy '{self.policy}', "
+            f"x{self.realtime_factor:.2f} real time",
+            f"  missed deadlines: {s.missed_deadlines} | dropped frames: {s.dropped_frames} | bursts: {s.bursts}",
+        ]
+        for name, hist in (("work", s.work), ("lateness", s.lateness)):
+            lines.append(
+                f"  {name}: mean {_fmt_ns(hist.mean_ns)} | p50 {_fmt_ns(hist.percentile(50))} | "
+                f"p99 {_fmt_ns(hist.percentile(99))} | max {_fmt_ns(hist.max_ns)}"
+            )
+            lines += [f"    {label:>12}: {count}" for label, count in hist.rows()]
+        return "\n".join(lines)
@@ -0,0 +1,193 @@
+"""
+Per-stage profiling.
+StageProfiler records wall time per stage and nested sub-stage (e.g. physics;forces) and
+reports count / total / mean / p50 / p99 / max, plus flame-graph input in the collapsed-stack
+format ("physics;forces 1234" per line, self time in microseconds) for flamegraph.pl or speedscope.
+
+Methods are instrumented by replacing them on the instance with a timed wrapper, and only
+when the profiler is enabled: a disabled profiler leaves the objects untouched, so the
+simulation loop pays nothing for it.
+
+    profiler = StageProfiler(enabled=True)
+    instrument_autopilot(profiler, autopilot)
+    with profiler.stage("log"):
+        writer.writerow(entry)
+    print(profiler.summary())
+"""
+
+import functools
+import random
+import time
+from pathlib import Path
+
+
+class StageStats:
+    __slots__ = ("count", "total_ns", "max_ns", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples = []  # reservoir of durations for percentiles
+
+    def percentile(self, p: float) -> int:
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "path", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._stack
+        stack.append(self.name)
+        self.path = tuple(stack)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        self.profiler._stack.pop()
+        self.profiler._record(self.path, elapsed)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageProfiler:
+    def __init__(self, enabled: bool = False, reservoir: int = 10_000, seed: int = 0):
+        """
+        Args:
+            enabled (bool): when False, stage() is a no-op and wrap()/instrument() install nothing.
+            reservoir (int): samples kept per stage for the percentiles (count, total and max are exact).
+            seed (int): seed of the reservoir sampling, for reproducible reports.
+        """
+        self.enabled = enabled
+        self.reservoir = reservoir
+        self._rng = random.Random(seed)
+        self._stack = []
+        self.stats: dict[tuple, StageStats] = {}
+
+    # ---------- instrumentation ----------
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as a (nested) stage."""
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def wrap(self, func, name: str):
+        """Returns func timed as stage `name`, or func itself when disabled."""
+        if not self.enabled:
+            return func
+        stack = self._stack
+        record = self._record
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            stack.append(name)
+            path = tuple(stack)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                record(path, elapsed)
+
+        return timed
+
+    def instrument(self, obj, method: str, name: str | None = None):
+        """Replaces obj.method with a timed wrapper on the instance (no-op when disabled)."""
+        if self.enabled:
+            setattr(obj, method, self.wrap(getattr(obj, method), name or method))
+
+    def _record(self, path: tuple, elapsed: int):
+        stats = self.stats.get(path)
+        if stats is None:
+            stats = self.stats[path] = StageStats()
+        stats.count += 1
+        stats.total_ns += elapsed
+        if elapsed > stats.max_ns:
+            stats.max_ns = elapsed
+        if len(stats.samples) < self.reservoir:
+            stats.samples.append(elapsed)
+        else:
+            j = self._rng.randrange(stats.count)
+            if j < self.reservoir:
+                stats.samples[j] = elapsed
+
+    def reset(self):
+        self.stats.clear()
+        self._stack.clear()
+
+    # ---------- reporting ----------
+    def _self_time(self, path: tuple) -> int:
+        children = sum(s.total_ns for p, s in self.stats.items() if len(p) == len(path) + 1 and p[:-1] == path)
+        return max(0, self.stats[path].total_ns - children)
+
+    def summary(self) -> str:
+        """Table of every stage path, children indented under their parent."""
+        if not self.stats:
+            return "Profile: no samples"
+        root_total = sum(s.total_ns for p, s in self.stats.items() if len(p) == 1) or 1
+        lines = [
+            f"{'stage':<32} {'calls':>9} {'total ms':>10} {'%':>6} {'mean us':>9} "
+            f"{'p50 us':>9} {'p99 us':>9} {'max us':>9}"
+        ]
+        for path in sorted(self.stats):
+            s = self.stats[path]
+            label = "  " * (len(path) - 1) + path[-1]
+            lines.append(
+                f"{label:<32} {s.count:>9} {s.total_ns / 1e6:>10.1f} {100 * s.total_ns / root_total:>6.1f} "
+                f"{s.total_ns / s.count / 1e3:>9.1f} {s.percentile(50) / 1e3:>9.1f} "
+                f"{s.percentile(99) / 1e3:>9.1f} {s.max_ns / 1e3:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def collapsed_stacks(self) -> str:
+        """Flame-graph input: one "stage;sub-stage self_time_us" line per stage path."""
+        lines = []
+        for path in sorted(self.stats):
+            self_us = self._self_time(path) // 1000
+            if self_us:
+                lines.append(f"{';'.join(path)} {self_us}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path) -> Path:
+        """Writes collapsed stacks to `path` (e.g. profile.folded) and the summary next to it (.txt)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed_stacks())
+        path.with_suffix(".txt").write_text(self.summary() + "\n")
+        return path
+
+
+# ---------- standard instrumentation points ----------
+def instrument_autopilot(profiler: StageProfiler, autopilot):
+    """FMM -> ControllerManager -> Mixer chain of a UAVAutopilot."""
+    profiler.instrument(autopilot.FMM, "run", "FMM")
+    profiler.instrument(autopilot.controller_mgr, "run", "controllers")
+    profiler.instrument(autopilot.mixer, "run", "mixer")
+
+
+def instrument_simulation(profiler: StageProfiler, simulation):
+    """Actuator, force-model and 6-DOF stages of a UAVSimulation."""
+    profiler.instrument(simulation.actuators, "run", "actuators")
+    profiler.instrument(simulation.dynamics, "compute", "forces")
+    profiler.instrument(simulation.kinematics, "compute", "kinematics")
@@ -0,0 +1,212 @@
+"""
+Content-addressed cache of simulation results.
+
+A run is identified by a hash of everything that determines its outcome: the scenario (vehicle
+properties, mission, initial state, trim condition, gains, wind, rate, fidelity and integrator
+settings), the run parameters (duration, RNG seed, ...) and a version tag of the simulation code
+(SIM_VERSION plus a hash of the AeroVehicle / Autonomy / Global / Simulation sources), so editing
+the simulator invalidates old results without manual bookkeeping.
+
+Each entry is a JSON file of summary metrics, plus an optional compressed trajectory (.npz),
+stored under RESULT_CACHE_DIR. The directory is size bounded: reads refresh an entry's
+modification time and writes evict the least recently used entries once max_bytes is exceeded.
+Writes are atomic (temp file + rename), so worker processes can share one cache.
+
+    cache = ResultCache()
+    key = scenario_key(scenario, duration=60.0)
+    metrics = cache.get(key)
+    if metrics is None:
+        metrics = fly(scenario, 60.0)
+        cache.put(key, metrics)
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from AeroVehicle.Trim import vehicle_hash
+from Simulation.scenario import Scenario
+
+SIM_VERSION = 1  # bump on behaviour changes outside the hashed sources (e.g. dependency upgrades)
+RESULT_CACHE_DIR = Path(__file__).with_name("result_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+SOURCE_PACKAGES = ("AeroVehicle", "Autonomy", "Global", "Simulation")
+
+_code_version = None
+
+
+def code_version() -> str:
+    """SIM_VERSION plus a hash of the simulation sources, computed once per process."""
+    global _code_version
+    if _code_version is None:
+        root = Path(__file__).resolve().parent.parent
+        digest = hashlib.sha256(str(SIM_VERSION).encode())
+        for package in SOURCE_PACKAGES:
+            for path in sorted((root / package).glob("*.py")):
+                digest.update(path.name.encode())
+                digest.update(path.read_bytes())
+        _code_version = f"{SIM_VERSION}-{digest.hexdigest()[:16]}"
+    return _code_version
+
+
+def scenario_payload(scenario: Scenario) -> dict:
+    """JSON-ready description of every field of a scenario that affects the simulation."""
+    payload = {}
+    for f in dataclasses.fields(scenario):
+        value = getattr(scenario, f.name)
+        if f.name == "name":
+            continue  # a label, two scenarios differing only in name give the same results
+        if f.name in ("vehicle_prop", "trim_reference"):
+            value = None if value is None else vehicle_hash(value)
+        elif f.name == "initial_state":
+            value = value.to_dict()
+        elif f.name == "home":
+            value = dataclasses.asdict(value)
+        elif f.name == "waypoints":
+            value = [dataclasses.asdict(w) for w in value]
+        payload[f.name] = value
+    return payload
+
+
+def scenario_key(scenario: Scenario, **run_parameters) -> str:
+    """
+    Content hash of a run.
+
+    Args:
+        scenario (Scenario): the scenario as flown (after any dispersion).
+        **run_parameters: anything else that changes the outcome (duration, seed, metric options).
+    """
+    payload = {"code": code_version(), "scenario": scenario_payload(scenario), "run": run_parameters}
+    text = json.dumps(payload, sort_keys=True, default=float)
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+class ResultCache:
+    def __init__(self, cache_dir=RESULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # bytes on disk, scanned on the first write
+
+    def __getstate__(self):
+        # sent to worker processes: settings only, counters and size start fresh there
+        return {"cache_dir": self.cache_dir, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["cache_dir"], state["max_bytes"])
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.npz"
+
+    # ---------- lookup ----------
+    def get(self, key: str, with_trajectory: bool = False) -> dict | None:
+        """
+        Cached summary metrics of a run, or None. A hit marks the entry as recently used.
+
+        Args:
+            with_trajectory (bool): count an entry stored without a trajectory as a miss.
+        """
+        path, trajectory = self._paths(key)
+        try:
+            metrics = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if with_trajectory and not trajectory.exists():
+            self.misses += 1
+            return None
+        for p in (path, trajectory):
+            try:
+                os.utime(p)
+            except OSError:
+                pass
+        self.hits += 1
+        return metrics
+
+    def get_trajectory(self, key: str) -> np.ndarray | None:
+        """Cached trajectory array of a run, or None if it was stored without one."""
+        path = self._paths(key)[1]
+        try:
+            with np.load(path) as data:
+                return data["trajectory"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        return self._paths(key)[0].exists()
+
+    # ---------- store ----------
+    def put(self, key: str, metrics: dict, trajectory: np.ndarray | None = None):
+        """Stores a run's metrics (JSON-serializable dict) and optional trajectory, then enforces max_bytes."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path, trajectory_path = self._paths(key)
+        written = 0
+        if trajectory is not None:
+            written += self._atomic_write(trajectory_path, lambda f: np.savez_compressed(f, trajectory=trajectory))
+        # metrics last: an entry counts as present once its JSON exists
+        written += self._atomic_write(path, lambda f: f.write(json.dumps(metrics, default=float).encode()))
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += written
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _atomic_write(self, path: Path, write) -> int:
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path.stat().st_size
+
+    # ---------- maintenance ----------
+    def _entries(self) -> list[tuple[float, int, list[Path]]]:
+        # (last use, bytes, files) per key: metrics and trajectory are evicted together
+        entries = {}
+        if not self.cache_dir.exists():
+            return []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith((".json", ".npz")):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # removed by another process
+                    key = Path(entry.name).stem
+                    used, size, paths = entries.get(key, (0.0, 0, []))
+                    entries[key] = (max(used, stat.st_mtime), size + stat.st_size, paths + [Path(entry.path)])
+        return list(entries.values())
+
+    def size(self) -> int:
+        """Bytes used on disk."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes: int | None = None):
+        """Deletes least recently used entries until the cache fits in max_bytes (default: self.max_bytes)."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, paths in entries:
+            if total <= limit:
+                break
+            for path in paths:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        self.evict(0)
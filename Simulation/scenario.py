@@ -0,0 +1,98 @@
+import copy
+from dataclasses import dataclass, field
+from typing import List
+
+from AeroVehicle.Vehicle_Properties import Aerosonde_vehicle
+from AeroVehicle.Trim import trim_point
+from Global.simdata import UAVState, GCSData, Waypoint, ActuatorOutputs
+
+FIDELITIES = ("6dof", "point_mass")  # full 6-DOF with inner loops / 3-DOF point mass on setpoints
+
+
+def _default_waypoints() -> List[Waypoint]:
+    return [
+        Waypoint(x=5000, y=1000, z=-1000, heading=0, action="reach", mode="Auto", next=1),
+        Waypoint(x=5000, y=5000, z=-1000, heading=0, action="reach", mode="Auto", next=2),
+        Waypoint(x=-3000, y=3000, z=-1000, heading=0, action="reach", mode="Auto", next=3),
+        Waypoint(x=-3000, y=-3000, z=-1000, heading=0, action="reach", mode="Auto", next=0),
+    ]
+
+
+@dataclass
+class Scenario:
+    """
+    Everything needed to start a simulation run: vehicle, initial state, mission and rates.
+    """
+
+    name: str = "default"
+    freq: float = 100  # Hz
+    mode: str = "Auto"
+    vehicle_prop: dict = field(default_factory=lambda: Aerosonde_vehicle.copy())
+    initial_state: UAVState = field(default_factory=UAVState)
+    home: Waypoint = field(default_factory=Waypoint)
+    waypoints: List[Waypoint] = field(default_factory=list)
+    fidelity: str = "6dof"  # one of FIDELITIES, can be changed at runtime by the simulator
+    wind: tuple = (0.0, 0.0, 0.0)  # steady NED wind in m/s (6-DOF)
+    integrator: str = "semi_implicit"  # 6-DOF integrator, see UAVSimulation
+    integrator_options: dict = field(default_factory=dict)  # e.g. {"rtol": 1e-6} for rk45
+    gains: dict = field(default_factory=dict)  # PID gain overrides, "<fw|quad>.<loop>.<kp|ki|kd>" -> value
+
+    # Start in trim at this airspeed (m/s), flight-path angle and turn rate (rad, rad/s), from the
+    # position and heading of initial_state; None keeps initial_state as given
+    trim_airspeed: float | None = None
+    trim_gamma: float = 0.0
+    trim_turn_rate: float = 0.0
+    trim_reference: dict | None = None  # vehicle whose cached trim table seeds the solve (dispersed vehicles)
+
+    @property
+    def dt(self) -> float:
+        return 1 / self.freq
+
+    def build_gcs_data(self) -> GCSData:
+        """Creates a fresh GCSData object loaded with this scenario's mission."""
+        gcs_data = GCSData()
+        gcs_data.mode = self.mode
+        gcs_data.mission.home = copy.deepcopy(self.home)
+        gcs_data.mission.waypoints = copy.deepcopy(self.waypoints)
+        gcs_data.mission.current_index = 0
+        gcs_data.mission.previous_index = 0
+        return gcs_data
+
+    def build_initial_state(self) -> UAVState:
+        """Returns a copy of the initial state (trimmed if requested) so the scenario can be reused."""
+        return self.build_initial_conditions()[0]
+
+    def build_initial_conditions(self) -> tuple[UAVState, ActuatorOutputs | None]:
+        """
+        Initial state and the PWM commands that hold it: the trim PWM when trim_airspeed is set
+        (see start_in_trim), else None.
+        """
+        if self.trim_airspeed is None:
+            return copy.deepcopy(self.initial_state), None
+        s = self.initial_state
+        point = trim_point(self.vehicle_prop, self.trim_airspeed, self.trim_gamma, self.trim_turn_rate,
+                           reference=self.trim_reference)
+        state = point.state(position=(s.x, s.y, s.z), heading=s.psi)
+        state.armed, state.flight_mode = s.armed, s.flight_mode
+        return state, point.pwm()
+
+
+def start_in_trim(trim_pwm: ActuatorOutputs, state: UAVState, autopilot, actuators) -> ActuatorOutputs:
+    """
+    Puts a freshly built autopilot and actuator model in the trim of build_initial_conditions:
+    actuators at the trim positions and the FW loops holding them. Returns the initial control input.
+    """
+    actuators.initialize(trim_pwm)
+    autopilot.seed_trim(trim_pwm, state)
+    return trim_pwm
+
+
+def default_scenario() -> Scenario:
+    """Aerosonde cruise at 500 m flying the four-waypoint box used by main.py, starting in level trim."""
+    return Scenario(
+        name="aerosonde_box",
+        initial_state=UAVState(z=-500),
+        trim_airspeed=22.0,
+        home=Waypoint(x=1000, y=1000, z=-1000, heading=0, action="reach", mode="Auto", next=0),
+        waypoints=_default_waypoints(),
+    )
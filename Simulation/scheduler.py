@@ -0,0 +1,128 @@
+"""
+Multi-rate scheduler.
+Stages (physics, control, guidance, rendering, logging, ...) register their own rate and a
+callback. The scheduler advances a simulated clock in integer nanoseconds on the grid of the
+fastest stage and, on every tick, runs the stages that are due in registration order, so a
+run is deterministic and independent of wall-clock time.
+
+A stage whose period is not a multiple of the base tick (400 Hz on a 1 kHz grid) runs on the
+first tick at or after each of its deadlines: its average rate is exact and single intervals
+jitter by at most one tick.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+NS_PER_S = 1_000_000_000
+
+
+@dataclass
+class ScheduledTask:
+    name: str
+    rate: float  # Hz
+    callback: Callable[[], object]
+    period_ns: int = 0
+    next_due_ns: int = 0
+    run_count: int = 0
+    enabled: bool = True
+
+    @property
+    def period(self) -> float:
+        return self.period_ns / NS_PER_S
+
+
+class MultiRateScheduler:
+    def __init__(self, base_rate: float | None = None):
+        """
+        Args:
+            base_rate (float): tick rate of the simulated clock in Hz.
+                Defaults to the rate of the fastest registered task.
+        """
+        self._base_rate = base_rate
+        self.tasks: dict[str, ScheduledTask] = {}
+        self.time_ns = 0
+        self.ticks = 0
+        self._tick_ns = 0
+
+    # ---------- registration ----------
+    def add_task(self, name: str, rate: float, callback: Callable[[], object], phase: float = 0.0) -> ScheduledTask:
+        """
+        Registers a stage. Tasks due on the same tick run in registration order.
+
+        Args:
+            name (str): unique task name.
+            rate (float): run rate in Hz, at most once per base tick.
+            callback: called without arguments each time the task is due.
+            phase (float): delay of the first run in seconds.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Task '{name}' is already registered")
+        task = ScheduledTask(name, rate, callback, period_ns=self._period_ns(name, rate),
+                             next_due_ns=self.time_ns + round(phase * NS_PER_S))
+        self.tasks[name] = task
+        self._update_tick()
+        return task
+
+    def remove_task(self, name: str):
+        del self.tasks[name]
+        self._update_tick()
+
+    def set_rate(self, name: str, rate: float):
+        """Changes the rate of a task; its next deadline is kept."""
+        self.tasks[name].rate = rate
+        self.tasks[name].period_ns = self._period_ns(name, rate)
+        self._update_tick()
+
+    @staticmethod
+    def _period_ns(name: str, rate: float) -> int:
+        if rate <= 0:
+            raise ValueError(f"Task '{name}' needs a positive rate, got {rate}")
+        return round(NS_PER_S / rate)
+
+    def _update_tick(self):
+        rate = self._base_rate
+        if rate is None:
+            rate = max((task.rate for task in self.tasks.values()), default=0.0)
+        self._tick_ns = round(NS_PER_S / rate) if rate > 0 else 0
+
+    # ---------- clock ----------
+    @property
+    def base_rate(self) -> float:
+        return NS_PER_S / self._tick_ns if self._tick_ns else 0.0
+
+    @property
+    def time(self) -> float:
+        """Simulated time in seconds."""
+        return self.time_ns / NS_PER_S
+
+    def step(self):
+        """Runs one base tick: every due task, in registration order, then advances the clock."""
+        if not self._tick_ns:
+            raise RuntimeError("No tasks registered and no base rate set")
+        now = self.time_ns
+        for task in self.tasks.values():
+            if task.enabled and now >= task.next_due_ns:
+                task.callback()
+                task.run_count += 1
+                task.next_due_ns += task.period_ns
+                if task.next_due_ns <= now:  # fell behind (re-enabled or slowed down): no catch-up burst
+                    task.next_due_ns = now + task.period_ns
+        self.time_ns = now + self._tick_ns
+        self.ticks += 1
+
+    def run_for(self, duration: float):
+        """Runs base ticks until `duration` more simulated seconds have elapsed."""
+        self.run_until(self.time_ns + round(duration * NS_PER_S))
+
+    def run_until(self, time_ns: int):
+        step = self.step
+        while self.time_ns < time_ns:
+            step()
+
+    def reset(self):
+        """Rewinds the clock to zero; every task is due on the first tick again."""
+        self.time_ns = 0
+        self.ticks = 0
+        for task in self.tasks.values():
+            task.next_due_ns = 0
+            task.run_count = 0
@@ -0,0 +1,404 @@
+"""
+Simulation core benchmark suite.
+Times the per-step building blocks (force model, 6-DOF, full physics step, point-mass step, autopilot,
+controllers, mixer, guidance, asynchronous telemetry logging) and a full headless closed-loop mission, and reports
+steps/sec plus tracemalloc memory churn per step. Results can be written as JSON and
+compared against a stored baseline to flag regressions.
+
+    python -m benchmarks.core                    # run everything, print a table
+    python -m benchmarks.core -k forces,mission  # only some benchmarks
+    python -m benchmarks.core --json out.json    # machine-readable results
+    python -m benchmarks.core --save-baseline    # store results as benchmarks/baseline.json
+    python -m benchmarks.core --compare          # exit 1 if slower than the baseline by > threshold
+
+Python has no allocation counter, so memory is reported as the tracemalloc peak above the
+starting level during one op (alloc_peak_bytes, the transient churn of a step; of a whole run
+for the mission) and the net growth per step (retained_bytes, leaks or unbounded buffers).
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from AeroVehicle.Dynamics import VehicleForcesMoments
+from AeroVehicle.Kinematics import SixDOFDynamics
+from AeroVehicle.Vehicle_Sim import UAVSimulation
+from AeroVehicle.actuators import Actuator_model
+from AeroVehicle.point_mass import PointMassSimulation
+from Autonomy.Autopilot import UAVAutopilot
+from Autonomy.Mixer import Mixer
+from Autonomy.fw_controller import FixedWingController
+from Autonomy.quad_controller import QuadController
+from Autonomy.guidance import FW_guidance
+from Global.simdata import (
+    ActuatorOutputs, ControlOutputs, ControllerFlags, FWTarget, MissionTrack, QuadTarget, TargetSetpoints, Waypoint,
+)
+from Simulation.headless import HeadlessSimulator
+from Simulation.scenario import default_scenario
+from logger.datalogger import AircraftDataLogger
+from logger.telemetry import TelemetryWriter, CsvTelemetrySink
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+MISSION_DURATION = 60.0  # simulated seconds of the closed-loop benchmark
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, steps_per_op: int = 1):
+    """
+    Registers a setup function returning a zero-argument callable that runs one op. A `close`
+    attribute of that callable, if set, releases its resources (threads, files) after measurement.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, steps_per_op)
+        return setup
+    return register
+
+
+# ---------- fixtures ----------
+def _cruise_pwm() -> ActuatorOutputs:
+    pwm = ActuatorOutputs()
+    pwm.assign([1000, 1000, 1000, 1000, 1600, 1520, 1480, 1500])
+    return pwm
+
+
+def _physical_controls(dt: float) -> ActuatorOutputs:
+    sim = UAVSimulation(default_scenario().vehicle_prop, dt)
+    return sim.actuators.run(_cruise_pwm()).copy()
+
+
+# ---------- benchmarks ----------
+@benchmark("forces")
+def _forces():
+    scenario = default_scenario()
+    dynamics = VehicleForcesMoments(scenario.vehicle_prop)
+    state = scenario.build_initial_state()
+    controls = _physical_controls(scenario.dt)
+    return lambda: dynamics.compute(state, controls)
+
+
+@benchmark("kinematics")
+def _kinematics():
+    scenario = default_scenario()
+    kinematics = SixDOFDynamics(scenario.vehicle_prop)
+    state = scenario.build_initial_state()
+    forces = VehicleForcesMoments(scenario.vehicle_prop).compute(state, _physical_controls(scenario.dt)).copy()
+    return lambda: kinematics.compute(state, forces)
+
+
+@benchmark("actuators")
+def _actuators():
+    actuators = Actuator_model(0, 110, -np.radians(30), np.radians(30))
+    pwm = _cruise_pwm()
+    return lambda: actuators.run(pwm)
+
+
+@benchmark("simulate_one_step")
+def _simulate_one_step():
+    scenario = default_scenario()
+    sim = UAVSimulation(scenario.vehicle_prop, scenario.dt)
+    state = scenario.build_initial_state()  # same input every call: sim writes to its own output
+    pwm = _cruise_pwm()
+    return lambda: sim.simulate_one_step(state, pwm)
+
+
+@benchmark("point_mass")
+def _point_mass():
+    scenario = default_scenario()
+    sim = PointMassSimulation(scenario.vehicle_prop, scenario.dt)
+    state = scenario.build_initial_state()
+    targets = TargetSetpoints()
+    targets.fw.assign((0.2, 23.0, -520.0))
+    return lambda: sim.simulate_one_step(state, targets, "FW")
+
+
+@benchmark("autopilot")
+def _autopilot():
+    scenario = default_scenario()
+    gcs = scenario.build_gcs_data()
+    autopilot = UAVAutopilot(gcs, scenario.dt)
+    state = scenario.build_initial_state()
+    return lambda: autopilot.run(state, gcs)
+
+
+@benchmark("fw_controller")
+def _fw_controller():
+    scenario = default_scenario()
+    controller = FixedWingController(scenario.dt)
+    state = scenario.build_initial_state()
+    target = FWTarget(roll=0.2, airspeed=23.0, altitude=-520.0)
+    flags = ControllerFlags(current_mode="FW")
+    return lambda: controller.run(state, target, flags)
+
+
+@benchmark("quad_controller")
+def _quad_controller():
+    scenario = default_scenario()
+    controller = QuadController(scenario.dt)
+    state = scenario.build_initial_state()
+    target = QuadTarget(x=10.0, y=-5.0, altitude=-510.0, heading=0.3)
+    return lambda: controller.run(state, target)
+
+
+@benchmark("mixer")
+def _mixer():
+    mixer = Mixer()
+    controls = ControlOutputs()
+    controls.quad.assign((0.2, 0.5, 0.4, 0.3))  # saturates the motor group
+    return lambda: mixer.run("QD", controls)
+
+
+@benchmark("guidance")
+def _guidance():
+    scenario = default_scenario()
+    guidance = FW_guidance()
+    state = scenario.build_initial_state()
+    track = MissionTrack(target=Waypoint(x=1000, y=300, z=-500), previous=Waypoint(x=0, y=0, z=-500))
+    return lambda: guidance.run(state, track)
+
+
+@benchmark("telemetry_record")
+def _telemetry_record():
+    # "block" so that every sample is written: with the GIL shared, the writer thread's formatting
+    # is part of the amortized cost (the loop itself only pays the ring copy)
+    scenario = default_scenario()
+    state = scenario.build_initial_state()
+    controls = _cruise_pwm()
+    forces = VehicleForcesMoments(scenario.vehicle_prop).compute(state, _physical_controls(scenario.dt)).copy()
+    telemetry = TelemetryWriter(CsvTelemetrySink(os.devnull), policy="block")
+
+    def step():
+        telemetry.record(state, controls, forces)
+
+    step.close = telemetry.close  # stops the writer thread
+    return step
+
+
+@benchmark("datalogger")
+def _datalogger():
+    scenario = default_scenario()
+    logger = AircraftDataLogger()
+    logger.reset()
+    state = scenario.build_initial_state().as_array()[:12].tolist()
+    controls = _cruise_pwm().as_array().tolist()
+    counter = iter(range(1 << 62))
+
+    def step():
+        t = next(counter)
+        logger.log(t * scenario.dt, state, controls, forces=(0.0, 0.0, 0.0), moments=(0.0, 0.0, 0.0), mode="FW")
+        if len(logger) >= 100_000:
+            logger.reset()
+
+    return step
+
+
+@benchmark("mission", steps_per_op=int(round(MISSION_DURATION * default_scenario().freq)))
+def _mission():
+    simulator = HeadlessSimulator(default_scenario())
+
+    def step():
+        simulator.reset()
+        simulator.run(MISSION_DURATION)
+
+    return step
+
+
+# ---------- measurement ----------
+def measure(step, steps_per_op: int = 1, min_time: float = 0.2, repeats: int = 5, warmup: int = 20) -> dict:
+    """
+    Times `step` (median of `repeats` runs of n calls, n calibrated so a run lasts about
+    min_time / repeats seconds) and its tracemalloc churn. GC is disabled while timing.
+    """
+    for _ in range(warmup if steps_per_op == 1 else 1):
+        step()
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        target_ns = min_time * 1e9 / repeats
+        n = 1
+        while True:
+            start = time.perf_counter_ns()
+            for _ in range(n):
+                step()
+            elapsed = time.perf_counter_ns() - start
+            if elapsed >= target_ns or n >= 1 << 24:
+                break
+            n = min(n * 10, max(n * 2, int(n * target_ns / max(elapsed, 1) * 1.2)))
+
+        runs = [elapsed / n]
+        for _ in range(repeats - 1):
+            start = time.perf_counter_ns()
+            for _ in range(n):
+                step()
+            runs.append((time.perf_counter_ns() - start) / n)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # memory: net growth over a batch of calls, then the transient peak of single calls
+    samples = max(1, min(n, 200))
+    peaks = [0] * samples
+    tracemalloc.start()
+    step()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(samples):
+        step()
+    retained = (tracemalloc.get_traced_memory()[0] - before) / samples
+    for i in range(samples):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        step()
+        peaks[i] = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    ns_per_op = float(np.median(runs))
+    return {
+        "ns_per_op": ns_per_op,
+        "best_ns_per_op": float(min(runs)),
+        "steps_per_op": steps_per_op,
+        "steps_per_sec": steps_per_op * 1e9 / ns_per_op,
+        "alloc_peak_bytes": float(np.mean(peaks)),
+        "retained_bytes": retained / steps_per_op,
+        "calls_per_run": n,
+        "repeats": repeats,
+    }
+
+
+def run_suite(names=None, min_time: float = 0.2, repeats: int = 5) -> dict:
+    results = {}
+    for name, (setup, steps_per_op) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        step = setup()
+        try:
+            results[name] = measure(step, steps_per_op, min_time=min_time, repeats=repeats)
+        finally:
+            close = getattr(step, "close", None)
+            if close is not None:
+                close()
+    return {"meta": _metadata(), "results": results}
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+# ---------- reporting ----------
+def format_results(suite: dict) -> str:
+    lines = [
+        "| benchmark | us / op | steps / s | alloc peak B / op | retained B / step |",
+        "|---|---|---|---|---|",
+    ]
+    for name, r in suite["results"].items():
+        lines.append(
+            f"| {name} | {r['ns_per_op'] / 1e3:.2f} | {r['steps_per_sec']:,.0f} | "
+            f"{r['alloc_peak_bytes']:,.0f} | {r['retained_bytes']:,.1f} |"
+        )
+    return "\n".join(lines)
+
+
+def compare(suite: dict, baseline: dict, threshold: float = 0.15) -> tuple[str, list[str]]:
+    """
+    Compares time and memory churn per benchmark against a baseline.
+
+    Returns:
+        (markdown table, names of regressed benchmarks). A benchmark regresses when its time per
+        op grows by more than `threshold` (fraction), or its per-step churn by more than
+        `threshold` and at least 256 bytes.
+    """
+    lines = [
+        f"Baseline: {baseline['meta'].get('commit') or '?'} ({baseline['meta'].get('timestamp', '?')}), "
+        f"threshold {threshold:.0%}",
+        "",
+        "| benchmark | baseline us | now us | time | alloc B (base -> now) | status |",
+        "|---|---|---|---|---|---|",
+    ]
+    regressions = []
+    for name, r in suite["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            lines.append(f"| {name} | - | {r['ns_per_op'] / 1e3:.2f} | - | - | new |")
+            continue
+        ratio = r["ns_per_op"] / base["ns_per_op"]
+        alloc_growth = r["alloc_peak_bytes"] - base["alloc_peak_bytes"]
+        slower = ratio > 1 + threshold
+        churn = alloc_growth > max(256.0, threshold * base["alloc_peak_bytes"])
+        if slower or churn:
+            status = "REGRESSION" + (" (time)" if slower else "") + (" (alloc)" if churn else "")
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        lines.append(
+            f"| {name} | {base['ns_per_op'] / 1e3:.2f} | {r['ns_per_op'] / 1e3:.2f} | {ratio:.2f}x | "
+            f"{base['alloc_peak_bytes']:,.0f} -> {r['alloc_peak_bytes']:,.0f} | {status} |"
+        )
+    return "\n".join(lines), regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--only", default="", help="comma-separated benchmark names")
+    parser.add_argument("--min-time", type=float, default=0.5, help="timed seconds per benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", default=None, help="write results to this JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE_PATH.name}")
+    parser.add_argument("--compare", nargs="?", const=str(BASELINE_PATH), default=None,
+                        help="compare against a baseline JSON (default: the stored baseline)")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown fraction")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+
+    names = [n for n in args.only.split(",") if n]
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks {sorted(unknown)}, choose from {list(BENCHMARKS)}")
+
+    suite = run_suite(names, min_time=args.min_time, repeats=args.repeats)
+    print(format_results(suite))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(suite, indent=2))
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(suite, indent=2))
+        print(f"Baseline saved to {BASELINE_PATH}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        table, regressions = compare(suite, baseline, args.threshold)
+        print()
+        print(table)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
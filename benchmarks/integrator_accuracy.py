@@ -0,0 +1,75 @@
+"""
+Integrator accuracy vs cost study.
+Flies the default scenario's initial condition open loop (fixed PWM commands) with every
+integrator at several step sizes and compares the trajectory against a fine-step RK4
+reference. Prints a markdown table of error and cost per simulated second.
+
+    python -m benchmarks.integrator_accuracy
+"""
+
+import argparse
+import time
+import numpy as np
+
+from AeroVehicle.Batch_Sim import BatchUAVSimulation
+from Simulation.scenario import default_scenario
+
+SAMPLE_PERIOD = 0.1  # s, trajectories are compared on this grid
+STEP_SIZES = (0.001, 0.005, 0.01, 0.02, 0.05, 0.1)
+METHODS = ("semi_implicit", "euler", "rk2", "rk4", "rk45")
+
+# Open-loop commands (PWM): cruise throttle with a small aileron and elevator input
+CONTROLS = np.array([[1000, 1000, 1000, 1000, 1600, 1520, 1480, 1500]], dtype=float)
+
+
+def fly(method: str, dt: float, duration: float, **options):
+    """Returns the sampled trajectory (n_samples, 12), derivative evaluations and wall time."""
+    scenario = default_scenario()
+    sim = BatchUAVSimulation.from_states(scenario.vehicle_prop, dt, [scenario.build_initial_state()],
+                                         integrator=method, **options)
+    steps_per_sample = int(round(SAMPLE_PERIOD / dt))
+    n_samples = int(round(duration / SAMPLE_PERIOD))
+
+    samples = np.empty((n_samples + 1, sim.states.shape[1]))
+    samples[0] = sim.states[0]
+    start = time.perf_counter()
+    with np.errstate(all="ignore"):  # fixed-step methods diverge at the largest dt
+        for k in range(n_samples):
+            for _ in range(steps_per_sample):
+                sim.simulate_one_step(CONTROLS)
+            samples[k + 1] = sim.states[0]
+    wall = time.perf_counter() - start
+
+    n_evals = sim.integrator.n_evals if sim.integrator is not None else n_samples * steps_per_sample
+    return samples, n_evals, wall
+
+
+def errors(traj: np.ndarray, ref: np.ndarray):
+    pos_err = np.max(np.linalg.norm(traj[:, 0:3] - ref[:, 0:3], axis=1))
+    d_att = traj[:, 6:9] - ref[:, 6:9]
+    att_err = np.max(np.abs(np.arctan2(np.sin(d_att), np.cos(d_att))))
+    return pos_err, np.degrees(att_err)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="simulated seconds")
+    parser.add_argument("--ref-dt", type=float, default=1e-4, help="RK4 reference step")
+    args = parser.parse_args()
+
+    ref, _, _ = fly("rk4", args.ref_dt, args.duration)
+
+    print(f"Reference: rk4 @ dt={args.ref_dt} s, {args.duration:.0f} s open-loop flight\n")
+    print("| method | dt (s) | max pos err (m) | max att err (deg) | f evals / sim s | wall ms / sim s |")
+    print("|---|---|---|---|---|---|")
+    for method in METHODS:
+        for dt in STEP_SIZES:
+            options = {"rtol": 1e-6, "atol": 1e-6} if method == "rk45" else {}
+            traj, n_evals, wall = fly(method, dt, args.duration, **options)
+            pos_err, att_err = errors(traj, ref)
+            print(f"| {method} | {dt:g} | {pos_err:.3g} | {att_err:.3g} | "
+                  f"{n_evals / args.duration:.0f} | {1e3 * wall / args.duration:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
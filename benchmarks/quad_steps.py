@@ -0,0 +1,88 @@
+"""
+Quad (QD) closed-loop step check.
+Flies QuadController -> Mixer("QD") -> UAVSimulation from a hover at the default altitude to a
+set of position / altitude / heading steps and prints a markdown table of the final position error
+and the largest tilt. Exits non-zero if any case diverges or has not settled.
+
+    python -m benchmarks.quad_steps
+"""
+
+import argparse
+import math
+import sys
+
+from AeroVehicle.Vehicle_Sim import UAVSimulation
+from Autonomy.Mixer import Mixer
+from Autonomy.quad_controller import QuadController
+from Global.simdata import UAVState, QuadTarget, ControlOutputs
+from Simulation.scenario import default_scenario
+
+START = (0.0, 0.0, -50.0)  # NED, m
+SETTLE_WINDOW = 2.0  # s, the final position error is the worst over this last stretch
+SETTLED = 0.05  # m
+LOST = math.radians(80)  # tilt at which a case counts as diverged
+
+# (north, east, down) step in m, target heading in rad
+CASES = (
+    ((0.0, 0.0, 0.0), 0.0),  # hover hold
+    ((0.0, 0.0, -5.0), 0.0),  # climb 5 m
+    ((0.0, 0.0, 5.0), 0.0),  # descend 5 m
+    ((0.0, 0.0, -20.0), 0.0),  # climb 20 m
+    ((20.0, 0.0, 0.0), 0.0),
+    ((0.0, -20.0, 5.0), math.pi / 2),
+    ((30.0, 30.0, -10.0), 3.0),
+)
+
+
+def fly(step, heading: float, duration: float, dt: float):
+    """Returns the worst position error over the settle window (m, inf if lost) and the max tilt (rad)."""
+    scenario = default_scenario()
+    controller = QuadController(dt)
+    mixer = Mixer()
+    sim = UAVSimulation(scenario.vehicle_prop, dt)
+
+    state = UAVState(x=START[0], y=START[1], z=START[2])
+    target = QuadTarget()
+    target.assign((START[0] + step[0], START[1] + step[1], START[2] + step[2], heading))
+    controls = ControlOutputs()
+
+    n_steps = int(round(duration / dt))
+    window = int(round(SETTLE_WINDOW / dt))
+    pos_err = max_tilt = 0.0
+    for k in range(n_steps):
+        controls.quad = controller.run(state, target)
+        state, _ = sim.simulate_one_step(state, mixer.run("QD", controls))
+
+        tilt = max(abs(state.phi), abs(state.theta))
+        if not math.isfinite(tilt) or tilt > LOST:
+            return math.inf, tilt
+        max_tilt = max(max_tilt, tilt)
+        if k >= n_steps - window:
+            err = math.dist((state.x, state.y, state.z), (target.x, target.y, target.altitude))
+            pos_err = max(pos_err, err)
+    return pos_err, max_tilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=80.0, help="simulated seconds per case")
+    parser.add_argument("--dt", type=float, default=0.01, help="simulation step")
+    args = parser.parse_args()
+
+    print(f"QD steps from hover at {START}, dt={args.dt} s, {args.duration:.0f} s per case\n")
+    print("| step N/E/D (m) | heading (deg) | final pos err (m) | max tilt (deg) |")
+    print("|---|---|---|---|")
+    failed = 0
+    for step, heading in CASES:
+        pos_err, max_tilt = fly(step, heading, args.duration, args.dt)
+        failed += not pos_err <= SETTLED
+        print(f"| {step[0]:g} / {step[1]:g} / {step[2]:g} | {math.degrees(heading):.0f} | "
+              f"{pos_err:.3g} | {math.degrees(max_tilt):.1f} |")
+
+    if failed:
+        print(f"\n[ERROR] {failed} of {len(CASES)} cases did not settle within {SETTLED} m")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
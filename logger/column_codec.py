@@ -0,0 +1,78 @@
+"""
+Lossless column codec for long telemetry logs.
+
+A column chunk (fixed-width values of one field) is encoded in three steps:
+    1. transform - consecutive samples are replaced by their difference on the raw bits:
+                   "xor" (bits of x[i] ^ x[i-1], Gorilla style: slowly varying floats share sign,
+                   exponent and high mantissa bits, so most leading bytes become zero) or
+                   "delta" (x[i] - x[i-1] on the integers, modulo 2^64, best for counters and codes)
+    2. shuffle   - byte k of every value is stored together, turning the zero high bytes into long runs
+    3. compress  - zlib (fast) or lzma (smaller, slower)
+Both transforms work on the bit pattern, so decoding is exact, NaN payloads included.
+
+    codec = ColumnCodec("zlib", level=6, transform="xor")
+    blob = codec.encode(values)
+    values = codec.decode(blob, values.dtype, len(values))
+"""
+
+import lzma
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+COMPRESSORS = ("zlib", "lzma")
+TRANSFORMS = ("xor", "delta", "none")
+_UNSIGNED = {1: np.uint8, 2: np.uint16, 4: np.uint32, 8: np.uint64}
+
+
+def shuffle(data: np.ndarray) -> bytes:
+    """Bytes of the values regrouped by byte position."""
+    return np.ascontiguousarray(data.view(np.uint8).reshape(len(data), data.dtype.itemsize).T).tobytes()
+
+
+def unshuffle(raw: bytes, dtype: np.dtype, count: int) -> np.ndarray:
+    planes = np.frombuffer(raw, dtype=np.uint8).reshape(dtype.itemsize, count)
+    return np.ascontiguousarray(planes.T).view(dtype).reshape(count)
+
+
+@dataclass
+class ColumnCodec:
+    """Transform + byte shuffle + stdlib compressor for one column chunk."""
+    compressor: str = "zlib"
+    level: int = 6  # zlib 0-9, lzma preset 0-9
+    transform: str = "xor"
+    chunk_rows: int = 4096  # rows per independently decodable chunk in a flight log
+
+    def __post_init__(self):
+        if self.compressor not in COMPRESSORS:
+            raise ValueError(f"Unknown compressor '{self.compressor}', expected one of {COMPRESSORS}")
+        if self.transform not in TRANSFORMS:
+            raise ValueError(f"Unknown transform '{self.transform}', expected one of {TRANSFORMS}")
+
+    def encode(self, values: np.ndarray) -> bytes:
+        """Compressed bytes of a 1-D fixed-width array."""
+        bits = np.ascontiguousarray(values).view(_UNSIGNED[values.dtype.itemsize])
+        if self.transform == "xor" and len(bits) > 1:
+            bits = np.concatenate((bits[:1], bits[1:] ^ bits[:-1]))
+        elif self.transform == "delta" and len(bits) > 1:
+            bits = np.concatenate((bits[:1], bits[1:] - bits[:-1]))  # wraps modulo 2^bits
+        raw = shuffle(bits)
+        if self.compressor == "zlib":
+            return zlib.compress(raw, self.level)
+        return lzma.compress(raw, preset=self.level)
+
+    def decode(self, blob: bytes, dtype, count: int) -> np.ndarray:
+        """Values of a chunk encoded with the same settings."""
+        dtype = np.dtype(dtype)
+        raw = zlib.decompress(blob) if self.compressor == "zlib" else lzma.decompress(blob)
+        bits = unshuffle(raw, np.dtype(_UNSIGNED[dtype.itemsize]), count)
+        if self.transform == "xor":
+            bits = np.bitwise_xor.accumulate(bits)
+        elif self.transform == "delta":
+            bits = np.cumsum(bits, dtype=bits.dtype)
+        return bits.view(dtype)
+
+    def to_dict(self) -> dict:
+        return {"compressor": self.compressor, "level": self.level, "transform": self.transform,
+                "chunk_rows": self.chunk_rows}
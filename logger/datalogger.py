@@ -1,9 +1,42 @@
+import numbers
+
 import pandas as pd
 import numpy as np
 
 
+def csv_log_header():
+    """Column order of the CSV flight log written by main.py."""
+    return [
+        "time", "x", "y", "z", "x_vel", "y_vel", "z_vel", "phi", "theta", "psi",
+        "phi_rate", "theta_rate", "psi_rate", "airspeed", "flight_mode", "systemArmed",
+        "throttle", "aileron", "elevator", "rudder",
+        "Motor1", "Motor2", "Motor3", "Motor4",
+        "lift", "drag", "Fx", "Fy", "Fz", "l_moment", "m_moment", "n_moment"
+    ]
+
+
+# Column layout of AircraftDataLogger.log()
+STATE_COLUMNS = ("x", "y", "z", "u", "v", "w", "phi", "theta", "psi", "p", "q", "r")
+FORCE_COLUMNS = ("Fx", "Fy", "Fz")
+MOMENT_COLUMNS = ("l", "m", "n")
+
+
 class AircraftDataLogger:
+    """
+    Time-series logger with columnar storage.
+
+    Numeric fields live in one preallocated float64 block (rows = logged steps, columns = fields)
+    that doubles its capacity when full, so log() is an amortized O(1) row write and a step costs
+    8 bytes per field. Fields missing from a step read as NaN. Non-numeric fields (mode) are kept
+    in object columns of the same length. to_numpy() and to_dataframe() wrap the block without
+    copying it.
+
+    Steps are found by timestep with a binary search over the time column; a dict index is only
+    built if timesteps are ever logged out of order.
+    """
+
     _instance = None
+    initial_capacity = 1024
 
     def __new__(cls):
         if cls._instance is None:
@@ -13,57 +46,148 @@ class AircraftDataLogger:
 
     def reset(self):
         """Initialize or reset the logger."""
-        self.data = []
-        self.time_index_map = {}  # Maps timestep to index in data list for quick updates
+        self._columns = {"time": 0}  # numeric column name -> block column
+        self._block = np.full((self.initial_capacity, 1), np.nan)
+        self._objects = {}  # non-numeric column name -> object array
+        self._spans = {}  # column-name tuple -> slice (or index array) into the block
+        self._size = 0
+        self._index = None  # timestep -> row, only once timesteps arrive out of order
+
+    # ---------- storage ----------
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def columns(self) -> list[str]:
+        """Numeric columns in block order, then object columns."""
+        return list(self._columns) + list(self._objects)
+
+    def _grow(self, rows: int, columns: int):
+        capacity, width = self._block.shape
+        if rows > capacity:
+            capacity = max(rows, 2 * capacity)
+            for name, values in self._objects.items():
+                grown = np.empty(capacity, dtype=object)
+                grown[:len(values)] = values
+                self._objects[name] = grown
+        if (capacity, columns) != self._block.shape:
+            block = np.full((capacity, columns), np.nan)
+            block[:len(self._block), :width] = self._block
+            self._block = block
+
+    def _span(self, names: tuple):
+        """Block columns of a group of fields, created side by side on first use."""
+        span = self._spans.get(names)
+        if span is None:
+            missing = [name for name in names if name not in self._columns]
+            if missing:
+                start = len(self._columns)
+                self._grow(self._block.shape[0], start + len(missing))
+                for offset, name in enumerate(missing):
+                    self._columns[name] = start + offset
+            index = [self._columns[name] for name in names]
+            contiguous = index == list(range(index[0], index[0] + len(index)))
+            span = self._spans[names] = slice(index[0], index[-1] + 1) if contiguous else np.array(index)
+        return span
+
+    def _object_column(self, name: str) -> np.ndarray:
+        values = self._objects.get(name)
+        if values is None:
+            values = self._objects[name] = np.empty(self._block.shape[0], dtype=object)
+        return values
 
+    # ---------- logging ----------
     def log(self, timestep, state = None, control_input=None, forces=None, moments=None, mode=None):
         """
         Log data for a single timestep.
         """
-        entry = {}
-        if control_input is not None:
-            entry = {
-                "time": timestep,
-                # State
-                "x": state[0], "y": state[1], "z": state[2],
-                "u": state[3], "v": state[4], "w": state[5],
-                "phi": state[6], "theta": state[7], "psi": state[8],
-                "p": state[9], "q": state[10], "r": state[11],
-            }
+        row = self._size
+        if row == self._block.shape[0]:
+            self._grow(row + 1, self._block.shape[1])
+        # _span may widen (reallocate) the block: look the span up before indexing self._block
+        self._block[row, 0] = timestep
+
+        if state is not None:
+            span = self._span(STATE_COLUMNS)
+            self._block[row, span] = state[:12]
 
         if control_input is not None:
-            for i, val in enumerate(control_input):
-                entry[f"ctrl_{i}"] = val
+            span = self._span(_CONTROL_NAMES.get(len(control_input)) or _control_names(len(control_input)))
+            self._block[row, span] = control_input
 
         if forces is not None:
-            entry.update({"Fx": forces[0], "Fy": forces[1], "Fz": forces[2]})
+            span = self._span(FORCE_COLUMNS)
+            self._block[row, span] = forces[:3]
 
         if moments is not None:
-            entry.update({"l": moments[0], "m": moments[1], "n": moments[2]})
+            span = self._span(MOMENT_COLUMNS)
+            self._block[row, span] = moments[:3]
 
         if mode is not None:
-            entry["mode"] = mode
+            self._object_column("mode")[row] = mode
 
-        self.time_index_map[timestep] = len(self.data)
-        self.data.append(entry)
+        if self._index is not None:
+            self._index[timestep] = row
+        elif row and timestep < self._block[row - 1, 0]:
+            # out of order: switch from binary search to a dict index
+            self._index = {t: i for i, t in enumerate(self._block[:row + 1, 0].tolist())}
+        self._size = row + 1
+
+    def row(self, timestep) -> int:
+        """Row of the last step logged at timestep."""
+        if self._index is not None:
+            row = self._index.get(timestep)
+        else:
+            times = self._block[:self._size, 0]
+            row = int(np.searchsorted(times, timestep, side="right")) - 1
+            if row < 0 or times[row] != timestep:
+                row = None
+        if row is None:
+            raise KeyError(f"Timestep {timestep} not logged yet.")
+        return row
 
     def update(self, timestep, key, value):
         """
         Update a specific field at a specific timestep.
         """
-        if timestep not in self.time_index_map:
-            raise KeyError(f"Timestep {timestep} not logged yet.")
-        idx = self.time_index_map[timestep]
-        self.data[idx][key] = value
-
-    def to_dataframe(self):
-        """Convert logged data to a pandas DataFrame."""
-        return pd.DataFrame(self.data)
+        row = self.row(timestep)
+        numeric = isinstance(value, numbers.Real)
+        if key in self._objects or (not numeric and key not in self._columns):
+            self._object_column(key)[row] = value
+        elif numeric:
+            column = self._columns[key] if key in self._columns else self._span((key,)).start
+            self._block[row, column] = value
+        else:
+            # a numeric column receiving text becomes an object column
+            if key == "time":
+                raise ValueError("time must be numeric")
+            column = self._columns.pop(key)
+            values = self._object_column(key)
+            values[:self._size] = self._block[:self._size, column]
+            values[row] = value
+            self._block = np.delete(self._block, column, axis=1)
+            self._columns = {name: i for i, name in enumerate(self._columns)}
+            self._spans = {}
 
+    # ---------- export ----------
     def to_numpy(self):
-        """Convert logged data to a NumPy array (not recommended unless fields are uniform)."""
-        df = self.to_dataframe()
-        return df.to_numpy()
+        """Zero-copy (steps, numeric columns) view of the logged data, columns as in self.columns."""
+        return self._block[:self._size, :len(self._columns)]
+
+    def to_dataframe(self):
+        """Convert logged data to a pandas DataFrame (numeric columns are not copied)."""
+        df = pd.DataFrame(self.to_numpy(), columns=list(self._columns), copy=False)
+        for name, values in self._objects.items():
+            df[name] = values[:self._size]
+        return df
 
     def to_csv(self, filename="flight_log.csv"):
         self.to_dataframe().to_csv(filename, index=False)
+
+
+_CONTROL_NAMES = {}
+
+
+def _control_names(count: int) -> tuple:
+    names = _CONTROL_NAMES[count] = tuple(f"ctrl_{i}" for i in range(count))
+    return names
@@ -0,0 +1,476 @@
+"""
+Binary flight-log format (.uavlog).
+
+A log is a self-describing header followed by fixed-width records:
+
+    magic (8 bytes) | header size (uint32) | JSON header, space padded | record | record | ...
+
+or, when written with a ColumnCodec (logger/column_codec.py), by compressed chunks of codec.chunk_rows
+records, each column encoded on its own:
+
+    ... JSON header | chunk header (rows, first / last time, blob sizes) | column blob | ... | chunk header | ...
+
+The header lists every column with its NumPy dtype and how to decode it ("datetime" epoch
+seconds, "bool", or "enum" integer codes with their labels). Writers append whole batches of
+records with a single write, so the per-sample cost is a memcpy, never text formatting.
+
+FlightLog memory-maps the file: log["x"] is a zero-copy (strided) NumPy view of one column and
+to_dataframe() wraps those views without parsing, so hour-long logs open instantly. Rows are
+counted from the file size, so a log cut short by a crash is still readable up to its last
+complete record. csv_to_flightlog / flightlog_to_csv convert to and from the CSV flight log.
+
+Compressed logs (typically 3-6x smaller than plain records) keep random access: opening one only reads the chunk
+headers, a column decodes only that column's blobs, and window() / start-stop row ranges only
+decode the chunks they overlap. Records still buffered in a partial chunk are lost on a crash.
+
+The telemetry schema (TELEMETRY_COLUMNS) is derived from the simdata messages, laid out like the
+telemetry ring rows, so BinaryTelemetrySink plugs straight into TelemetryWriter:
+
+    telemetry = TelemetryWriter(BinaryTelemetrySink("logger/logs/flight.uavlog", codec=ColumnCodec("zlib")))
+    ...
+    log = FlightLog("logger/logs/flight.uavlog")
+    altitude = -log["z"]
+    last_minute = log.window(log.duration - 60.0, log.duration, ["x", "y", "z"])
+"""
+
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib import recfunctions
+
+from logger.column_codec import ColumnCodec
+from logger.telemetry import EVENTS, RAW_FIELDS
+
+MAGIC = b"UAVLOG\x00\x01"
+FORMAT_VERSION = 2  # 2: optional compressed chunks
+CHUNK_MAGIC = b"UAVC"
+CHUNK_HEADER = struct.Struct("<4sIdd")  # magic, rows, first and last value of the time column
+HEADER_BLOCK = 4096  # header space is reserved in blocks, so enum labels can grow before close()
+LOG_SUFFIX = ".uavlog"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # CSV timestamps, milliseconds kept
+
+# name -> (dtype, kind) of the non-float telemetry columns
+TELEMETRY_KINDS = {
+    "wall_time": ("<f8", "datetime"),
+    "flight_mode": ("<i4", "enum"),
+    "armed": ("|u1", "bool"),
+    "events": ("<i4", None),  # EVENTS bits
+}
+TELEMETRY_COLUMNS = [
+    {"name": name, "dtype": TELEMETRY_KINDS.get(name, ("<f8", None))[0], "kind": TELEMETRY_KINDS.get(name, ("<f8", None))[1]}
+    for name in RAW_FIELDS
+]
+
+
+def _utc_offset(epoch: float) -> float:
+    # local time - UTC (s) at an instant, timestamps are shown in local time like the CSV log
+    return datetime.fromtimestamp(epoch).astimezone().utcoffset().total_seconds()
+
+
+def _records_dtype(columns: list[dict]) -> np.dtype:
+    return np.dtype([(c["name"], c["dtype"]) for c in columns])
+
+
+def _time_column(columns: list[dict]) -> str:
+    # first timestamp column, else the first column
+    return next((c["name"] for c in columns if c.get("kind") == "datetime"), columns[0]["name"])
+
+
+# ---------- writing ----------
+class FlightLogWriter:
+    def __init__(self, path, columns: list[dict], metadata: dict | None = None, codec: ColumnCodec | None = None):
+        """
+        Args:
+            path: output file, usually with LOG_SUFFIX.
+            columns (list[dict]): {"name", "dtype", "kind"} per column, kind None / "datetime" / "bool" / "enum".
+            metadata (dict): free-form JSON-serializable values stored in the header.
+            codec (ColumnCodec): write compressed chunks, default plain records.
+        """
+        self.path = Path(path)
+        self.columns = [dict(c) for c in columns]
+        for c in self.columns:
+            if c.get("kind") == "enum":
+                c.setdefault("labels", [])
+        self.dtype = _records_dtype(self.columns)
+        self.metadata = metadata or {}
+        self.codec = codec
+        self.rows = 0
+        self._time_column = _time_column(self.columns)
+        self._pending = []  # compressed logs: record batches waiting for a full chunk
+        self._pending_rows = 0
+        self._file = open(self.path, "wb")
+        self._header_size = 0
+        self._write_header()
+
+    def _header_bytes(self) -> bytes:
+        header = {"format": FORMAT_VERSION, "rows": self.rows, "columns": self.columns, "metadata": self.metadata,
+                  "codec": None if self.codec is None else self.codec.to_dict()}
+        return json.dumps(header).encode()
+
+    def _write_header(self):
+        text = self._header_bytes()
+        needed = len(MAGIC) + 4 + len(text)
+        if self._header_size == 0:
+            self._header_size = (needed // HEADER_BLOCK + 1) * HEADER_BLOCK
+        elif needed > self._header_size:
+            self._grow_header(needed)
+        self._file.seek(0)
+        self._file.write(MAGIC + struct.pack("<I", self._header_size) + text.ljust(self._header_size - len(MAGIC) - 4))
+        self._file.seek(0, os.SEEK_END)
+
+    def _grow_header(self, needed: int):
+        # labels outgrew the reserved space: move the records back (rare, only on close)
+        self._file.flush()
+        with open(self.path, "rb") as f:
+            f.seek(self._header_size)
+            body = f.read()
+        self._header_size = (needed // HEADER_BLOCK + 1) * HEADER_BLOCK
+        self._file.seek(self._header_size)
+        self._file.write(body)
+
+    def append(self, records: np.ndarray):
+        """Writes a batch of records (structured array of self.dtype) in one call, or queues it for the next chunk."""
+        records = np.ascontiguousarray(records, dtype=self.dtype)
+        self.rows += len(records)
+        if self.codec is None:
+            self._file.write(records.tobytes())
+            return
+        self._pending.append(records)
+        self._pending_rows += len(records)
+        if self._pending_rows >= self.codec.chunk_rows:
+            block = np.concatenate(self._pending)
+            size = self.codec.chunk_rows
+            full = len(block) // size * size
+            for start in range(0, full, size):
+                self._write_chunk(block[start:start + size])
+            self._pending = [block[full:]] if full < len(block) else []
+            self._pending_rows = len(block) - full
+
+    def _write_chunk(self, block: np.ndarray):
+        blobs = [self.codec.encode(block[c["name"]]) for c in self.columns]
+        t = block[self._time_column]
+        head = CHUNK_HEADER.pack(CHUNK_MAGIC, len(block), float(t[0]), float(t[-1]))
+        self._file.write(head + struct.pack(f"<{len(blobs)}I", *map(len, blobs)) + b"".join(blobs))
+
+    def encode_labels(self, name: str, values) -> np.ndarray:
+        """Enum codes of string values, adding unseen labels to the column."""
+        labels = next(c for c in self.columns if c["name"] == name)["labels"]
+        index = {label: i for i, label in enumerate(labels)}
+        codes = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(labels)
+                labels.append(value)
+            codes[i] = code
+        return codes
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        """Rewrites the header with the final row count and enum labels, then closes the file."""
+        if self._file.closed:
+            return
+        if self._pending_rows:
+            self._write_chunk(np.concatenate(self._pending))  # last, partial chunk
+            self._pending, self._pending_rows = [], 0
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryTelemetrySink(FlightLogWriter):
+    """TelemetryWriter sink writing ring rows as .uavlog records (TELEMETRY_COLUMNS)."""
+
+    def __init__(self, path, metadata: dict | None = None, codec: ColumnCodec | None = None):
+        super().__init__(path, TELEMETRY_COLUMNS, {"events": list(EVENTS), **(metadata or {})}, codec)
+        self._modes = next(c for c in self.columns if c["name"] == "flight_mode")["labels"]
+
+    def write(self, rows: np.ndarray, modes: list):
+        self._modes[len(self._modes):] = modes[len(self._modes):]  # telemetry codes are append-only too
+        self.append(recfunctions.unstructured_to_structured(rows, self.dtype))
+        self.flush()  # one flush per batch
+
+
+# ---------- reading ----------
+class _Chunk:
+    __slots__ = ("start", "rows", "t_first", "t_last", "offsets", "sizes")
+
+    def __init__(self, start, rows, t_first, t_last, offsets, sizes):
+        self.start, self.rows, self.t_first, self.t_last = start, rows, t_first, t_last
+        self.offsets, self.sizes = offsets, sizes
+
+
+class FlightLog:
+    """Read-only view of a .uavlog file: memory-mapped records, or an index of compressed chunks."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a flight log")
+            (header_size,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_size - len(MAGIC) - 4))
+        if header["format"] > FORMAT_VERSION:
+            raise ValueError(f"{self.path} uses flight-log format {header['format']}, newer than {FORMAT_VERSION}")
+        self.columns = header["columns"]
+        self.metadata = header["metadata"]
+        self.dtype = _records_dtype(self.columns)
+        self.time_column = _time_column(self.columns)
+        self.codec = ColumnCodec(**header["codec"]) if header.get("codec") else None
+        self._kinds = {c["name"]: c for c in self.columns}
+        self._index = {c["name"]: i for i, c in enumerate(self.columns)}
+        self._map = None
+        self._chunks = []
+
+        if self.codec is not None:
+            self.records = None
+            self._scan_chunks(header_size)
+            return
+        # rows from the file size: a log that was never closed is read up to its last full record
+        rows = (self.path.stat().st_size - header_size) // self.dtype.itemsize
+        if rows > 0:
+            self.records = np.memmap(self.path, dtype=self.dtype, mode="r", offset=header_size, shape=(rows,))
+        else:
+            self.records = np.empty(0, dtype=self.dtype)
+
+    def _scan_chunks(self, offset: int):
+        # chunk headers only, no decompression; stops at a chunk cut short by a crash
+        size = self.path.stat().st_size
+        if size <= offset:
+            return
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        sizes_format = struct.Struct(f"<{len(self.columns)}I")
+        start = 0
+        while offset + CHUNK_HEADER.size + sizes_format.size <= size:
+            magic, rows, t_first, t_last = CHUNK_HEADER.unpack_from(self._map, offset)
+            if magic != CHUNK_MAGIC:
+                break
+            sizes = sizes_format.unpack_from(self._map, offset + CHUNK_HEADER.size)
+            offsets = np.cumsum((offset + CHUNK_HEADER.size + sizes_format.size,) + sizes[:-1]).tolist()
+            end = offsets[-1] + sizes[-1]
+            if end > size:
+                break
+            self._chunks.append(_Chunk(start, rows, t_first, t_last, offsets, sizes))
+            start += rows
+            offset = end
+        self._starts = [chunk.start for chunk in self._chunks]
+
+    def __len__(self) -> int:
+        if self.codec is None:
+            return len(self.records)
+        return self._chunks[-1].start + self._chunks[-1].rows if self._chunks else 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._kinds
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Raw column values (enum codes, epoch seconds, 0/1): a zero-copy view of an uncompressed log."""
+        return self.column(name)
+
+    @property
+    def names(self) -> list[str]:
+        return [c["name"] for c in self.columns]
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the first to the last sample of the time column."""
+        if not len(self):
+            return 0.0
+        if self.codec is None:
+            t = self.records[self.time_column]
+            return float(t[-1] - t[0])
+        return self._chunks[-1].t_last - self._chunks[0].t_first
+
+    def labels(self, name: str) -> list[str]:
+        """Labels of an enum column, indexed by code."""
+        return self._kinds[name].get("labels", [])
+
+    def column(self, name: str, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Raw values of rows [start, stop); a compressed log decodes only the chunks in range."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if self.codec is None:
+            return self.records[name][start:stop]
+        dtype = self.dtype[name]
+        column = self._index[name]
+        parts = []
+        for i in range(max(bisect_right(self._starts, start) - 1, 0), len(self._chunks)):
+            chunk = self._chunks[i]
+            if chunk.start >= stop:
+                break
+            blob = self._map[chunk.offsets[column]:chunk.offsets[column] + chunk.sizes[column]]
+            values = self.codec.decode(blob, dtype, chunk.rows)
+            parts.append(values[max(start - chunk.start, 0):stop - chunk.start])
+        return np.concatenate(parts) if len(parts) > 1 else parts[0] if parts else np.empty(0, dtype)
+
+    def rows_between(self, t_start: float, t_end: float) -> tuple[int, int]:
+        """Row range [start, stop) of the samples t_start..t_end seconds after the first one."""
+        if not len(self):
+            return 0, 0
+        if self.codec is None:
+            t = self.records[self.time_column]
+            lo, hi = t[0] + t_start, t[0] + t_end
+            return int(np.searchsorted(t, lo, side="left")), int(np.searchsorted(t, hi, side="right"))
+        lo, hi = self._chunks[0].t_first + t_start, self._chunks[0].t_first + t_end
+        inside = [c for c in self._chunks if c.t_last >= lo and c.t_first <= hi]
+        if not inside:
+            return (len(self),) * 2 if lo > self._chunks[-1].t_last else (0, 0)
+        first, last = inside[0], inside[-1]
+        start = first.start + int(np.searchsorted(self.column(self.time_column, first.start, first.start + first.rows), lo, side="left"))
+        stop = last.start + int(np.searchsorted(self.column(self.time_column, last.start, last.start + last.rows), hi, side="right"))
+        return start, stop
+
+    def decode(self, name: str, start: int = 0, stop: int | None = None):
+        """Column in its natural type: datetime64 (local time), bool, Categorical or float values."""
+        values = self.column(name, start, stop)
+        kind = self._kinds[name].get("kind")
+        if kind == "datetime":
+            if not len(values):
+                return values.astype("datetime64[ns]")
+            local = values + _utc_offset(float(values[0]))
+            return (local * 1e9).astype("datetime64[ns]")
+        if kind == "bool":
+            return values.astype(bool)
+        if kind == "enum":
+            labels = self.labels(name)
+            codes = np.where(values < len(labels), values, -1)  # codes of a crashed log may lack labels
+            return pd.Categorical.from_codes(codes, categories=labels)
+        return values
+
+    def to_numpy(self, names: list[str] | None = None, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """(rows, columns) float64 copy of the raw values."""
+        names = self.names if names is None else names
+        if not names:
+            return np.empty((len(self), 0))
+        return np.column_stack([self.column(name, start, stop).astype(float) for name in names])
+
+    def to_dataframe(self, columns: list[str] | None = None, decode: bool = True,
+                     start: int = 0, stop: int | None = None) -> pd.DataFrame:
+        """
+        DataFrame of rows [start, stop); float columns of an uncompressed log are not copied.
+
+        Args:
+            columns (list[str]): subset to load, default all.
+            decode (bool): convert datetime / bool / enum columns (see decode()), else raw values.
+            start, stop (int): row range, default every row.
+        """
+        columns = self.names if columns is None else columns
+        data = {name: self.decode(name, start, stop) if decode else self.column(name, start, stop) for name in columns}
+        return pd.DataFrame(data, copy=False)
+
+    def window(self, t_start: float, t_end: float, columns: list[str] | None = None, decode: bool = True) -> pd.DataFrame:
+        """DataFrame of the samples t_start..t_end seconds after the first one, decoding only the chunks involved."""
+        start, stop = self.rows_between(t_start, t_end)
+        return self.to_dataframe(columns, decode, start, stop)
+
+    def close(self):
+        mapped = getattr(self.records, "_mmap", None)
+        self.records = np.empty(0, dtype=self.dtype) if self.codec is None else None
+        if mapped is not None:
+            mapped.close()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._chunks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_log(path, columns: list[str] | None = None) -> pd.DataFrame:
+    """DataFrame of a .uavlog (memory-mapped or compressed) or CSV flight log."""
+    if Path(path).suffix == LOG_SUFFIX:
+        return FlightLog(path).to_dataframe(columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def recode_log(source, target, codec: ColumnCodec | None = None, chunk_rows: int = 100_000) -> Path:
+    """Rewrites a .uavlog with another codec (None: plain records), chunk_rows records at a time."""
+    with FlightLog(source) as log:
+        with FlightLogWriter(target, log.columns, log.metadata, codec) as writer:
+            for start in range(0, len(log), chunk_rows):
+                stop = min(start + chunk_rows, len(log))
+                records = np.empty(stop - start, dtype=log.dtype)
+                for name in log.names:
+                    records[name] = log.column(name, start, stop)
+                writer.append(records)
+    return Path(target)
+
+
+# ---------- CSV conversion ----------
+def flightlog_to_csv(log_path, csv_path, chunk_rows: int = 100_000):
+    """Writes a .uavlog as CSV, timestamps formatted like the CSV flight log."""
+    with FlightLog(log_path) as log:
+        stamps = [c["name"] for c in log.columns if c.get("kind") == "datetime"]
+        for start in range(0, max(len(log), 1), chunk_rows):
+            chunk = log.to_dataframe(start=start, stop=start + chunk_rows)
+            for name in stamps:
+                chunk[name] = chunk[name].dt.strftime(TIME_FORMAT).str[:-3]
+            chunk.to_csv(csv_path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def csv_to_flightlog(csv_path, log_path, chunk_rows: int = 100_000, codec: ColumnCodec | None = None) -> Path:
+    """
+    Converts a CSV log to .uavlog (compressed with codec, if given). Numeric columns become float64
+    (int64 if integral), True/False columns bool, parseable timestamps datetime, and any other text
+    column an enum.
+    """
+    writer = None
+    for frame in pd.read_csv(csv_path, chunksize=chunk_rows):
+        if writer is None:
+            writer = FlightLogWriter(log_path, _infer_columns(frame), {"source": Path(csv_path).name}, codec)
+        records = np.empty(len(frame), dtype=writer.dtype)
+        for column in writer.columns:
+            name, kind = column["name"], column.get("kind")
+            values = frame[name]
+            if kind == "datetime":
+                local = pd.to_datetime(values, format="mixed").to_numpy("datetime64[ns]").astype(np.int64) / 1e9
+                records[name] = local - _utc_offset(local[0]) if len(local) else local
+            elif kind == "enum":
+                records[name] = writer.encode_labels(name, values.astype(str).tolist())
+            else:
+                records[name] = values.to_numpy()
+        writer.append(records)
+    if writer is None:  # header-only CSV
+        frame = pd.read_csv(csv_path)
+        writer = FlightLogWriter(log_path, _infer_columns(frame), {"source": Path(csv_path).name}, codec)
+    writer.close()
+    return writer.path
+
+
+def _infer_columns(frame: pd.DataFrame) -> list[dict]:
+    columns = []
+    for name in frame.columns:
+        values = frame[name]
+        if pd.api.types.is_bool_dtype(values):
+            column = {"dtype": "|u1", "kind": "bool"}
+        elif pd.api.types.is_integer_dtype(values):
+            column = {"dtype": "<i8", "kind": None}
+        elif pd.api.types.is_numeric_dtype(values):
+            column = {"dtype": "<f8", "kind": None}
+        else:
+            try:
+                pd.to_datetime(values.iloc[:100], format="mixed")
+                column = {"dtype": "<f8", "kind": "datetime"}
+            except (ValueError, TypeError):
+                column = {"dtype": "<i4", "kind": "enum"}
+        columns.append({"name": name, **column})
+    return columns
@@ -5,6 +5,10 @@ import plotly.io as pio
 from plotly.subplots import make_subplots
 import os
 
+from logger.column_codec import ColumnCodec
+from logger.flightlog import FlightLog, LOG_SUFFIX, csv_to_flightlog, read_log
+from logger.telemetry_policy import reconstruct
+
 app = Flask(__name__)
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -27,7 +31,7 @@ HTML_TEMPLATE = """
 <body>
     <h2>Upload CSV File</h2>
     <form method="post" enctype="multipart/form-data" action="{{ url_for('upload_file') }}">
-        <input type="file" name="file" accept=".csv" required>
+        <input type="file" name="file" accept=".csv,.uavlog" required>
         <input type="submit" value="Upload">
     </form>
 
@@ -40,14 +44,14 @@ HTML_TEMPLATE = """
         <label for="x_axis">X Axis:</label>
         <select name="x_axis" required>
             {% for col in columns %}
-            <option value="{{ col }}" {% if col == 'time' %}selected{% endif %}>{{ col }}</option>
+            <option value="{{ col }}" {% if col in ('time', 'wall_time') %}selected{% endif %}>{{ col }}</option>
             {% endfor %}
         </select><br><br>
 
         <label for="y_axes">Y Axes (multiple):</label>
         <select name="y_axes" multiple required>
             {% for col in columns %}
-            {% if col != 'time' %}
+            {% if col not in ('time', 'wall_time') %}
             <option value="{{ col }}">{{ col }}</option>
             {% endif %}
             {% endfor %}
@@ -86,12 +90,14 @@ def index():
 @app.route('/upload', methods=['POST'])
 def upload_file():
     file = request.files['file']
-    if file and file.filename and file.filename.endswith('.csv'):
+    if file and file.filename and file.filename.endswith(('.csv', LOG_SUFFIX)):
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
         file.save(filepath)
-        df = pd.read_csv(filepath)
-        columns = df.columns.tolist()
-        return render_template_string(HTML_TEMPLATE, columns=columns, filename=file.filename, plot_div=None, warnings=[])
+        if filepath.endswith('.csv'):
+            # parsed once here, every plot request then decodes only the columns it draws
+            filepath = str(csv_to_flightlog(filepath, os.path.splitext(filepath)[0] + LOG_SUFFIX, codec=ColumnCodec()))
+        columns = FlightLog(filepath).names
+        return render_template_string(HTML_TEMPLATE, columns=columns, filename=os.path.basename(filepath), plot_div=None, warnings=[])
     return redirect(url_for('index'))
 
 @app.route('/plot', methods=['POST'])
@@ -102,9 +108,18 @@ def plot():
     multi_graph = request.form.get('multi_graph') == 'yes'
 
     filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    df = pd.read_csv(filepath)
+    columns = FlightLog(filepath).names
+    time_column = next((c for c in ('wall_time', 'time') if c in columns), None)
+    plotted = [c for c in dict.fromkeys([time_column, x_axis] + y_axes) if c is not None]
+    df = read_log(filepath, plotted)  # only the plotted columns
+    if time_column is not None:
+        df = reconstruct(df, time_column=time_column)  # fills the gaps of policy-thinned logs
     warnings = []
 
+    if pd.api.types.is_datetime64_any_dtype(df[x_axis]):
+        df[x_axis] = (df[x_axis] - df[x_axis].iloc[0]).dt.total_seconds()
+        warnings.append(f"Converted datetime X axis '{x_axis}' to elapsed seconds.")
+
     # # Try to convert x_axis to float, else parse as datetime
     # try:
     #     df[x_axis] = pd.to_numeric(df[x_axis], errors='raise')
@@ -125,7 +140,7 @@ def plot():
             warnings.append(f"Converted datetime X axis '{x_axis}' to elapsed seconds.")
         except Exception:
             warnings.append(f"Failed to parse X axis '{x_axis}' as numeric or datetime.")
-            return render_template_string(HTML_TEMPLATE, columns=df.columns.tolist(), filename=filename, plot_div=None, warnings=warnings)
+            return render_template_string(HTML_TEMPLATE, columns=columns, filename=filename, plot_div=None, warnings=warnings)
 
     valid_y_axes = []
     for y in y_axes:
@@ -137,7 +152,7 @@ def plot():
 
     if not valid_y_axes:
         warnings.append("No valid Y axes selected for plotting.")
-        return render_template_string(HTML_TEMPLATE, columns=df.columns.tolist(), filename=filename, plot_div=None, warnings=warnings)
+        return render_template_string(HTML_TEMPLATE, columns=columns, filename=filename, plot_div=None, warnings=warnings)
 
     if multi_graph:
         fig = make_subplots(rows=len(valid_y_axes), cols=1, shared_xaxes=True, vertical_spacing=0.03)
@@ -166,7 +181,6 @@ def plot():
         )
 
     plot_div = pio.to_html(fig, full_html=False)
-    columns = df.columns.tolist()
     return render_template_string(HTML_TEMPLATE, columns=columns, filename=filename, plot_div=plot_div, warnings=warnings)
 
 if __name__ == '__main__':
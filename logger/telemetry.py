@@ -0,0 +1,244 @@
+"""
+Asynchronous telemetry logging.
+
+TelemetryWriter keeps the flight log off the real-time loop: record() copies one step's state,
+actuator outputs and forces into a preallocated ring buffer (three slice copies, no dicts, no
+string formatting) and a background thread drains the ring in batches, formats the rows and
+hands them to a sink (CsvTelemetrySink writes the CSV flight log). A disk stall only delays
+the writer thread.
+
+Memory is bounded by the ring capacity. When the writer falls behind and the ring is full, the
+backpressure policy decides what record() does:
+    "drop"  - discard the new sample and count it, the control loop never waits
+    "block" - wait until the writer frees a slot, nothing is lost but the loop may stall
+
+mark_event() tags the next recorded sample with an event bit (EVENTS: flight-mode switch, waypoint
+advance). An optional logging policy (logger/telemetry_policy.py) thins the samples on the writer
+thread before they reach the sink, logging full rate around those events.
+
+close() (STOP / RESET in main.py) wakes the writer, drains every recorded sample and closes the sink.
+
+    telemetry = TelemetryWriter(CsvTelemetrySink("logger/logs/flight.csv"))
+    telemetry.record(state, actuators, forces)  # every log tick
+    telemetry.close()
+"""
+
+import csv
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from Global.simdata import UAVState, ActuatorOutputs, UAVForces
+from logger.datalogger import csv_log_header
+
+POLICIES = ("drop", "block")
+EVENTS = ("mode", "waypoint")  # bit i of the events field: EVENTS[i] happened before this sample
+EVENT_BITS = {name: 1 << i for i, name in enumerate(EVENTS)}
+
+# Ring row layout: wall-clock time, flight-mode code, armed flag, event bits, then the raw message arrays
+STATE_OFFSET = 4
+ACTUATOR_OFFSET = STATE_OFFSET + UAVState.size
+FORCES_OFFSET = ACTUATOR_OFFSET + ActuatorOutputs.size
+RAW_FIELDS = (
+    ("wall_time", "flight_mode", "armed", "events")
+    + UAVState.field_names
+    + tuple(f"actuators.{name}" for name in ActuatorOutputs.field_names)
+    + tuple(f"forces.{name}" for name in UAVForces.field_names)
+)
+
+# CSV flight-log column -> ring field
+CSV_SOURCE = {
+    "time": "wall_time", "flight_mode": "flight_mode", "systemArmed": "armed",
+    "throttle": "actuators.fw.throttle", "aileron": "actuators.fw.aileron",
+    "elevator": "actuators.fw.elevator", "rudder": "actuators.fw.rudder",
+    "Motor1": "actuators.quad.motor1", "Motor2": "actuators.quad.motor2",
+    "Motor3": "actuators.quad.motor3", "Motor4": "actuators.quad.motor4",
+    "lift": "forces.lift", "drag": "forces.drag",
+    "Fx": "forces.fx", "Fy": "forces.fy", "Fz": "forces.fz",
+    "l_moment": "forces.l", "m_moment": "forces.m", "n_moment": "forces.n",
+}
+
+
+class CsvTelemetrySink:
+    """Writes telemetry batches as the CSV flight log (csv_log_header columns)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        header = csv_log_header()
+        self._columns = np.array([RAW_FIELDS.index(CSV_SOURCE.get(name, name)) for name in header])
+        self._time_col = header.index("time")
+        self._mode_col = header.index("flight_mode")
+        self._armed_col = header.index("systemArmed")
+        self._file = open(self.path, mode="w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def write(self, rows: np.ndarray, modes: list):
+        """
+        Args:
+            rows (N, len(RAW_FIELDS)): ring rows, only valid during the call.
+            modes (list): flight-mode names indexed by the mode code.
+        """
+        table = rows[:, self._columns].tolist()
+        for row in table:
+            row[self._time_col] = datetime.fromtimestamp(row[self._time_col]).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            row[self._mode_col] = modes[int(row[self._mode_col])]
+            row[self._armed_col] = bool(row[self._armed_col])
+        self._writer.writerows(table)
+        self._file.flush()  # one flush per batch
+
+    def close(self):
+        self._file.close()
+
+
+class TelemetryWriter:
+    def __init__(self, sink, capacity: int = 4096, batch_size: int = 256, flush_interval: float = 0.5,
+                 policy: str = "drop", logging_policy=None):
+        """
+        Args:
+            sink: object with write(rows, modes) and close(), called from the writer thread only.
+            capacity (int): ring size in samples, the bound on buffered telemetry.
+            batch_size (int): samples that wake the writer; smaller batches go out every flush_interval.
+            flush_interval (float): longest time (s) a recorded sample waits before it is written.
+            policy (str): "drop" or "block", what record() does when the ring is full.
+            logging_policy: optional telemetry_policy.LoggingPolicy selecting which samples and
+                field groups are written (default: everything at full rate).
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy '{policy}', expected one of {POLICIES}")
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = min(batch_size, capacity)
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.logging_policy = logging_policy
+
+        self._ring = np.zeros((capacity, len(RAW_FIELDS)))
+        self._head = 0  # samples recorded, only advanced by record()
+        self._tail = 0  # samples written, only advanced by the writer thread
+        self._modes = []  # flight-mode names, append-only so the writer can read it unlocked
+        self._mode_codes = {}
+        self._events = 0  # bits waiting for the next recorded sample
+        self._cond = threading.Condition()
+        self._closing = False
+        self.dropped = 0
+        self.batches = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- producer (real-time loop) ----------
+    def record(self, state: UAVState, actuators: ActuatorOutputs, forces: UAVForces) -> bool:
+        """Copies one sample into the ring. Returns False when it was dropped."""
+        if self._closing:
+            return False
+        head = self._head
+        if head - self._tail >= self.capacity:
+            if self.policy == "drop":
+                self.dropped += 1
+                return False
+            with self._cond:
+                self._cond.notify_all()
+                while self._head - self._tail >= self.capacity and self._thread.is_alive():
+                    self._cond.wait()
+
+        code = self._mode_codes.get(state.flight_mode)
+        if code is None:
+            code = self._mode_codes[state.flight_mode] = len(self._modes)
+            self._modes.append(state.flight_mode)
+
+        row = self._ring[head % self.capacity]
+        row[0] = time.time()
+        row[1] = code
+        row[2] = state.armed
+        row[3] = self._events
+        self._events = 0
+        row[STATE_OFFSET:ACTUATOR_OFFSET] = state.as_array()
+        row[ACTUATOR_OFFSET:FORCES_OFFSET] = actuators.as_array()
+        row[FORCES_OFFSET:] = forces.as_array()
+        self._head = head + 1  # publish only once the row is complete
+
+        if self._head % self.batch_size == 0:
+            with self._cond:
+                self._cond.notify_all()
+        return True
+
+    def mark_event(self, event: str):
+        """Tags the next recorded sample with an EVENTS entry (called from the loop thread)."""
+        self._events |= EVENT_BITS[event]
+
+    @property
+    def pending(self) -> int:
+        """Samples recorded but not yet written."""
+        return self._head - self._tail
+
+    @property
+    def recorded(self) -> int:
+        return self._head
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Blocks until every sample recorded so far is written. Returns False on timeout."""
+        with self._cond:
+            target = self._head
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._tail >= target or not self._thread.is_alive(), timeout)
+
+    def close(self):
+        """Writes everything still buffered, stops the writer thread and closes the sink."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def report(self) -> str:
+        text = f"Telemetry: {self._tail}/{self._head} samples written in {self.batches} batches, {self.dropped} dropped"
+        if self.logging_policy is not None and self.logging_policy.samples_out:
+            text += f", logging policy kept 1 in {self.logging_policy.ratio:.1f}"
+        if self.error is not None:
+            text += f", writer error: {self.error}"
+        return text
+
+    # ---------- writer thread ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._head - self._tail < self.batch_size and not self._closing:
+                    self._cond.wait(self.flush_interval)
+                head, tail, closing = self._head, self._tail, self._closing
+            if head > tail:
+                self._write(tail, head)
+                with self._cond:
+                    self._tail = head
+                    self._cond.notify_all()
+            elif closing:
+                break
+        if self.logging_policy is not None and self.error is None:
+            self._emit(self.logging_policy.drain())  # samples held back for a possible pre-event burst
+        try:
+            self.sink.close()
+        except OSError as e:
+            print(f"[ERROR] Telemetry sink close failed: {e}")
+
+    def _write(self, start: int, stop: int):
+        # rows [start, stop) stay untouched by record() until _tail moves past them, so the
+        # sink reads them in place; a batch that wraps around the ring goes out in two parts
+        if self.error is not None:
+            return  # sink failed earlier: keep draining so producers are never stuck
+        first, last = start % self.capacity, (stop - 1) % self.capacity + 1
+        parts = [(first, last)] if first < last else [(first, self.capacity), (0, last)]
+        for a, b in parts:
+            rows = self._ring[a:b]
+            self._emit(rows if self.logging_policy is None else self.logging_policy.filter(rows))
+        self.batches += 1
+
+    def _emit(self, rows: np.ndarray):
+        if not len(rows) or self.error is not None:
+            return
+        try:
+            self.sink.write(rows, self._modes)
+        except (OSError, ValueError) as e:
+            self.error = e
+            print(f"[ERROR] Telemetry write failed, logging stopped: {e}")
@@ -0,0 +1,251 @@
+"""
+Telemetry logging policies.
+
+A LoggingPolicy thins the telemetry stream on the writer thread. The fields of a sample are split
+into groups (FIELD_GROUPS) and every group has its own rule:
+    FullRate()                    - every sample
+    Decimate(every)               - every n-th sample
+    Deadband(threshold, max_interval, extrapolate)
+                                  - only when a field moved more than its threshold since the
+                                    group was last logged (or, with extrapolate, away from the
+                                    straight line through the last two logged values, so steady
+                                    motion costs nothing), and at least every max_interval seconds
+
+Around events (telemetry.EVENTS: flight-mode switches and waypoint advances, tagged by the
+WaypointNavigator) every group is logged at full rate for `burst_before` samples before and
+`burst_after` samples after the event. Samples are held back for burst_before samples to allow
+the pre-event part, so the output stays in time order.
+
+A sample is written when at least one group is due; groups that are not due read NaN in it, while
+the time, mode, armed and event fields are always kept. Samples with no group due are not
+written at all. reconstruct() turns such a log back into aligned, gap-free time series:
+
+    telemetry = TelemetryWriter(sink, logging_policy=logging_policy("deadband"))
+    ...
+    frame = reconstruct(read_log(path), rate=50.0)
+"""
+
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from logger.telemetry import RAW_FIELDS
+
+# Fields of each group; the fields before STATE_OFFSET (time, mode, armed, events) are always logged
+FIELD_GROUPS = {
+    "position": ("x", "y", "z"),
+    "velocity": ("x_vel", "y_vel", "z_vel", "airspeed"),
+    "attitude": ("phi", "theta", "psi", "q0", "q1", "q2", "q3"),
+    "rates": ("phi_rate", "theta_rate", "psi_rate"),
+    "actuators": tuple(name for name in RAW_FIELDS if name.startswith("actuators.")),
+    "forces": tuple(name for name in RAW_FIELDS if name.startswith("forces.")),
+}
+
+
+# ---------- group rules ----------
+class _GroupHistory:
+    """Last two logged values of a group and their times."""
+
+    __slots__ = ("last", "t_last", "previous", "t_previous")
+
+    def __init__(self):
+        self.last = self.previous = None
+        self.t_last = self.t_previous = 0.0
+
+    def logged(self, values: np.ndarray, t: float):
+        self.previous, self.t_previous = self.last, self.t_last
+        self.last, self.t_last = values.copy(), t
+
+
+@dataclass
+class FullRate:
+    """Logs the group on every sample."""
+
+    def due(self, values: np.ndarray, t: float, count: int, history: _GroupHistory) -> bool:
+        return True
+
+
+@dataclass
+class Decimate:
+    """Logs the group on every `every`-th sample."""
+    every: int
+
+    def due(self, values, t, count, history) -> bool:
+        return count % self.every == 0
+
+
+@dataclass
+class Deadband:
+    """Logs the group when a field moved more than `threshold` (scalar or per field), or after max_interval s."""
+    threshold: float | tuple
+    max_interval: float = 5.0
+    extrapolate: bool = False  # compare with the line through the last two logged values
+
+    def due(self, values, t, count, history) -> bool:
+        if history.last is None or t - history.t_last >= self.max_interval:
+            return True
+        expected = history.last
+        if self.extrapolate and history.previous is not None and history.t_last > history.t_previous:
+            rate = (history.last - history.previous) / (history.t_last - history.t_previous)
+            expected = history.last + rate * (t - history.t_last)
+        return bool(np.any(np.abs(values - expected) > self.threshold))
+
+
+# ---------- policy ----------
+class LoggingPolicy:
+    def __init__(self, rules: dict, burst_before: int = 50, burst_after: int = 100, events: int = ~0):
+        """
+        Args:
+            rules (dict): FIELD_GROUPS name -> FullRate / Decimate / Deadband; groups left out are
+                logged at full rate.
+            burst_before, burst_after (int): samples logged at full rate before / after an event.
+            events (int): mask of the telemetry.EVENT_BITS that trigger a burst.
+        """
+        unknown = set(rules) - set(FIELD_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown field groups {sorted(unknown)}, expected {tuple(FIELD_GROUPS)}")
+        self.rules = [(rules.get(group, FullRate()), np.array([RAW_FIELDS.index(f) for f in fields]))
+                      for group, fields in FIELD_GROUPS.items()]
+        self.burst_before = burst_before
+        self.burst_after = burst_after
+        self.events = events
+        self.samples_in = 0
+        self.samples_out = 0
+
+        self._history = [_GroupHistory() for _ in self.rules]
+        self._held = deque()  # (row, group mask) waiting out the pre-event window
+        self._burst_left = 0
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        """Rows to write for a batch of telemetry rows (copies, safe to keep)."""
+        out = []
+        full = (1 << len(self.rules)) - 1
+        events = rows[:, 3].astype(int) & self.events
+        for row, event in zip(rows, events):
+            self.samples_in += 1
+            t = row[0]
+            if event:
+                self._burst_left = self.burst_after + 1
+                for held in self._held:  # pre-event window
+                    held[1] = full
+            if self._burst_left:
+                self._burst_left -= 1
+                mask = full
+            else:
+                mask = 0
+                for g, (rule, index) in enumerate(self.rules):
+                    if rule.due(row[index], t, self.samples_in - 1, self._history[g]):
+                        mask |= 1 << g
+            for g, (_, index) in enumerate(self.rules):
+                if mask >> g & 1:
+                    self._history[g].logged(row[index], t)
+
+            self._held.append([row.copy(), mask])
+            if len(self._held) > self.burst_before:
+                self._emit(*self._held.popleft(), out)
+        return self._stack(out)
+
+    def drain(self) -> np.ndarray:
+        """Rows still held back for the pre-event window (end of the log)."""
+        out = []
+        while self._held:
+            self._emit(*self._held.popleft(), out)
+        return self._stack(out)
+
+    def _emit(self, row: np.ndarray, mask: int, out: list):
+        if not mask:
+            return
+        for g, (_, index) in enumerate(self.rules):
+            if not mask >> g & 1:
+                row[index] = np.nan
+        out.append(row)
+        self.samples_out += 1
+
+    def _stack(self, out: list) -> np.ndarray:
+        return np.array(out) if out else np.empty((0, len(RAW_FIELDS)))
+
+    @property
+    def ratio(self) -> float:
+        """Samples in / samples written."""
+        return self.samples_in / self.samples_out if self.samples_out else float("inf")
+
+
+# Fresh (stateful) policies by name; None logs every field of every sample
+POLICY_PRESETS = {
+    "full": lambda: None,
+    "decimated": lambda: LoggingPolicy({group: Decimate(10) for group in FIELD_GROUPS}, burst_before=0, burst_after=0),
+    "deadband": lambda: LoggingPolicy({
+        "position": Deadband(1.0, extrapolate=True),  # m off the dead-reckoned track
+        "velocity": Deadband(0.2),  # m/s
+        "attitude": Deadband(np.radians(0.5)),  # rad, quaternion components alike
+        "rates": Deadband(np.radians(2.0)),  # rad/s
+        "actuators": Deadband(10.0),  # PWM us
+        "forces": Decimate(50),
+    }),
+}
+
+
+def logging_policy(name: str):
+    """New LoggingPolicy of a POLICY_PRESETS entry."""
+    if name not in POLICY_PRESETS:
+        raise ValueError(f"Unknown logging policy '{name}', expected one of {tuple(POLICY_PRESETS)}")
+    return POLICY_PRESETS[name]()
+
+
+# ---------- reconstruction ----------
+def reconstruct(frame: pd.DataFrame, rate: float | None = None, method: str = "hold",
+                time_column: str | None = None, times: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Aligned, gap-free time series from a policy-thinned log.
+
+    Args:
+        frame (pd.DataFrame): log as read by flightlog.read_log (binary or CSV layout).
+        rate (float): resample on a uniform grid at this rate (Hz), default the logged sample times.
+        method (str): "hold" keeps the last logged value (exact for deadband groups),
+            "linear" interpolates between logged values (better for decimated groups).
+        time_column (str): default "wall_time" or "time", whichever the log has.
+        times (np.ndarray): explicit grid in seconds (epoch seconds for timestamps), overrides rate.
+
+    Returns:
+        DataFrame with the time column and every column of frame at the grid times.
+    """
+    if method not in ("hold", "linear"):
+        raise ValueError(f"Unknown reconstruction method '{method}', expected 'hold' or 'linear'")
+    time_column = time_column or ("wall_time" if "wall_time" in frame else "time")
+    stamps = frame[time_column]
+    if pd.api.types.is_datetime64_any_dtype(stamps):
+        t = stamps.to_numpy("datetime64[ns]").astype(np.int64) / 1e9
+    elif pd.api.types.is_numeric_dtype(stamps):
+        t = stamps.to_numpy(dtype=float)
+    else:
+        t = pd.to_datetime(stamps, format="mixed").to_numpy("datetime64[ns]").astype(np.int64) / 1e9
+    if times is not None:
+        grid = np.asarray(times, dtype=float)
+    elif rate is not None and len(t):
+        grid = np.arange(t[0], t[-1] + 0.5 / rate, 1.0 / rate)
+    else:
+        grid = t
+
+    # last logged sample at or before each grid time (the first one for grid times before the log)
+    rows = np.maximum(np.searchsorted(t, grid, side="right") - 1, 0)
+    data = {time_column: stamps.iloc[rows].to_numpy() if grid is t else grid}
+    for name in frame.columns:
+        if name == time_column:
+            continue
+        column = frame[name]
+        if not pd.api.types.is_float_dtype(column):
+            data[name] = column.iloc[rows].to_numpy()  # always-logged fields
+            continue
+        values = column.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        tv, vv = t[valid], values[valid]
+        if not len(tv):
+            data[name] = np.full(len(grid), np.nan)
+        elif method == "linear":
+            data[name] = np.interp(grid, tv, vv, left=np.nan)
+        else:
+            last = np.searchsorted(tv, grid, side="right") - 1
+            data[name] = np.where(last >= 0, vv[np.maximum(last, 0)], np.nan)
+    return pd.DataFrame(data)
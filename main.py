@@ -1,21 +1,38 @@
 import time
-import csv
-import pandas as pd
 from pathlib import Path
-from datetime import datetime
 
 from AeroVehicle.Vehicle_Sim import UAVSimulation
-from AeroVehicle.Vehicle_Properties import Aerosonde_vehicle
 from Autonomy.Autopilot import UAVAutopilot
 from GUI.interface import UAVinterface
-from Global.simdata import UAVForces, UAVState, ActuatorOutputs, GCSData, Waypoint
+from Global.simdata import UAVForces, UAVState, ActuatorOutputs, GCSData
+from Simulation.scenario import default_scenario, start_in_trim
+from Simulation.scheduler import MultiRateScheduler
+from Simulation.pacing import RealTimePacer
+from Simulation.profiler import StageProfiler, instrument_autopilot, instrument_simulation
+from logger.telemetry import TelemetryWriter, CsvTelemetrySink
+from logger.column_codec import ColumnCodec
+from logger.flightlog import BinaryTelemetrySink, LOG_SUFFIX
+from logger.telemetry_policy import logging_policy
 
 
 class UAVSimulator:
     def __init__(self):
-        # Simulation parameters
-        self.freq = 100  # Hz
-        self.dt = 1 / self.freq
+        # Simulation parameters: stage rates (Hz)
+        self.rates = {
+            "physics": 1000,
+            "control": 400,  # attitude / rate controllers and mixer
+            "guidance": 20,  # flight mode manager, waypoint navigation, L1 guidance
+            "render": 30,  # GUI polling and visual update
+            "log": 50,
+        }
+        self.dt = 1 / self.rates["physics"]
+        self.control_dt = 1 / self.rates["control"]
+        self.pacing_policy = "burst"  # catch-up when a frame overruns: "burst", "skip" or "slowdown"
+        self.profiler = StageProfiler(enabled=False)  # enable to time every stage, see export_profile()
+        self.telemetry_policy = "drop"  # full telemetry ring: "drop" samples or "block" the loop
+        self.log_format = "binary"  # flight log: "binary" (.uavlog, logger/flightlog.py) or "csv"
+        self.log_policy = "deadband"  # logger/telemetry_policy.py preset: "full", "decimated" or "deadband"
+        self.log_compression = "zlib"  # binary log columns: "none", "zlib" or "lzma" (logger/column_codec.py)
 
         self.control_input : ActuatorOutputs = ActuatorOutputs()
         self.forces_moments : UAVForces = UAVForces()
@@ -23,124 +40,132 @@ class UAVSimulator:
         self.update_step : UAVState = UAVState()
         self.GCS_data : GCSData = GCSData()
 
-        # GCS data initialization
-        self.GCS_data.mission.home = Waypoint(x=1000, y=1000, z=-1000, heading=0, action="reach", mode="Auto", next=0)
-        self.GCS_data.mission.waypoints = [
-            Waypoint(x=5000, y=1000, z=-1000, heading=0, action="reach", mode="Auto", next=1),
-            Waypoint(x=5000, y=5000, z=-1000, heading=0, action="reach", mode="Auto", next=2),
-            Waypoint(x=-3000, y=3000, z=-1000, heading=0, action="reach", mode="Auto", next=3),
-            Waypoint(x=-3000, y=-3000, z=-1000, heading=0, action="reach", mode="Auto", next=0)
-        ]
-        self.GCS_data.mission.current_index = 0
-        self.GCS_data.mission.previous_index = 0
-
-        # State and control initialization
-        self.current_state.z = -500  # Initial altitude
-        self.current_state.x_vel = 22  # Initial airspeed
+        # GCS data and state initialization from the default scenario
+        self.scenario = default_scenario()
+        self.GCS_data = self.scenario.build_gcs_data()
+        self.GCS_data.mode = "NONE"  # set to Auto on START
+        self.current_state, trim_pwm = self.scenario.build_initial_conditions()
 
         # Initialize vehicle, simulation, autopilot, and interface
-        self.vehicle_prop = Aerosonde_vehicle.copy()
+        self.vehicle_prop = self.scenario.vehicle_prop
         self.simulation = UAVSimulation(self.vehicle_prop, self.dt)
-        self.autopilot = UAVAutopilot(self.GCS_data, self.dt)
+        self.autopilot = UAVAutopilot(self.GCS_data, self.control_dt, nav_dt=1 / self.rates["guidance"])
+        if trim_pwm is not None:
+            self.control_input = start_in_trim(trim_pwm, self.current_state, self.autopilot, self.simulation.actuators)
         self.interface = UAVinterface(self.GCS_data)
-        self.data_log = []
+        self.telemetry = None  # background flight-log writer, open while run_simulation runs
+        self.scheduler = self._build_scheduler()
+        self._instrument()
+
+    def _build_scheduler(self):
+        scheduler = MultiRateScheduler()
+        wrap = self.profiler.wrap  # returns the callback untouched when profiling is off
+        # registration order is the execution order within a tick
+        scheduler.add_task("guidance", self.rates["guidance"], wrap(self._guidance_step, "guidance"))
+        scheduler.add_task("control", self.rates["control"], wrap(self._control_step, "control"))
+        scheduler.add_task("physics", self.rates["physics"], wrap(self._physics_step, "physics"))
+        scheduler.add_task("render", self.rates["render"], wrap(self._render_step, "render"))
+        scheduler.add_task("log", self.rates["log"], wrap(self._log_step, "log"))
+        return scheduler
+
+    def _instrument(self):
+        instrument_autopilot(self.profiler, self.autopilot)
+        instrument_simulation(self.profiler, self.simulation)
+        # mode switches and waypoint advances trigger full-rate telemetry bursts
+        self.autopilot.FMM.auto_nav.navigator.event_listeners.append(self._telemetry_event)
+
+    def _telemetry_event(self, event, value):
+        if self.telemetry is not None:
+            self.telemetry.mark_event(event)
+
+    def export_profile(self):
+        """Prints the per-stage timing summary and writes flame-graph collapsed stacks."""
+        if not self.profiler.enabled:
+            return
+        print(self.profiler.summary())
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        path = self.profiler.export(Path("logger/logs") / f"profile_{timestamp}.folded")
+        print(f"Collapsed stacks written to {path}")
 
     def restart(self):
-        # Save the log
-        df = pd.DataFrame(self.data_log)
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"logger/simulation_{timestamp}.csv"
-        df.to_csv(filename, index=False)
+        # Flush the flight log and start a new file for the next run
+        if self.telemetry is not None:
+            self._close_log()
+            self._open_log()
 
         # Reset only the backend simulation components
         self.GCS_data = GCSData()
 
         self.forces_moments = UAVForces()
         self.Actuators = ActuatorOutputs()
-        self.current_state = UAVState()
         self.update_step = UAVState()
+        self.control_input = ActuatorOutputs()
 
-        # Reinitialize state variables
-        self.current_state.z = -1000
-        self.current_state.x_vel = 30
+        # Reinitialize state variables (trimmed scenario start)
+        self.current_state, trim_pwm = self.scenario.build_initial_conditions()
 
         # Reset vehicle, autopilot, and simulation logic (not GUI)
         self.simulation = UAVSimulation(self.vehicle_prop, self.dt)
-        self.autopilot = UAVAutopilot(self.GCS_data, self.dt)
+        self.autopilot = UAVAutopilot(self.GCS_data, self.control_dt, nav_dt=1 / self.rates["guidance"])
+        if trim_pwm is not None:
+            self.control_input = start_in_trim(trim_pwm, self.current_state, self.autopilot, self.simulation.actuators)
+        self._instrument()
+        self.scheduler.reset()
 
-        # reset data log
-        self.data_log = []
+    # ---------- scheduled stages ----------
+    def _guidance_step(self):
+        self.autopilot.run_navigation(self.current_state, self.GCS_data)
 
-    def _simulate_step(self):
-        self.control_input = self.autopilot.run(self.current_state, self.GCS_data)
+    def _control_step(self):
+        self.control_input = self.autopilot.run_control(self.current_state, self.GCS_data)
+
+    def _physics_step(self):
         self.update_step, self.forces_moments = self.simulation.simulate_one_step(self.current_state, self.control_input)
-        self.interface.update_uav_visual(self.update_step)
         self.current_state = self.update_step
 
-    def _generate_log_entry(self):
-        return {
-
-            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
-
-            "x": self.current_state.x,
-            "y": self.current_state.y,
-            "z": self.current_state.z,
-            "x_vel": self.current_state.x_vel,
-            "y_vel": self.current_state.y_vel,
-            "z_vel": self.current_state.z_vel,
-            "phi": self.current_state.phi,
-            "theta": self.current_state.theta,
-            "psi": self.current_state.psi,
-            "phi_rate": self.current_state.phi_rate,
-            "theta_rate": self.current_state.theta_rate,
-            "psi_rate": self.current_state.psi_rate,
-            "airspeed": self.current_state.airspeed,
-            "flight_mode": self.current_state.flight_mode,
-            "systemArmed": self.current_state.armed,
-
-            "throttle": self.control_input.fw.throttle,
-            "aileron": self.control_input.fw.aileron,
-            "elevator": self.control_input.fw.elevator,
-            "rudder": self.control_input.fw.rudder,
-
-            "Motor1": self.control_input.quad.motor1,
-            "Motor2": self.control_input.quad.motor2,
-            "Motor3": self.control_input.quad.motor3,
-            "Motor4": self.control_input.quad.motor4,
-
-            "lift": self.forces_moments.lift,
-            "drag": self.forces_moments.drag,
-            "Fx": self.forces_moments.fx,
-            "Fy": self.forces_moments.fy,
-            "Fz": self.forces_moments.fz,
-            "l_moment": self.forces_moments.l,
-            "m_moment": self.forces_moments.m,
-            "n_moment": self.forces_moments.n,
-        }
+    def _render_step(self):
+        self.interface.update_uav_visual(self.current_state)
 
-    def _log_header(self):
-        return [
-            "time", "x", "y", "z", "x_vel", "y_vel", "z_vel", "phi", "theta", "psi",
-            "phi_rate", "theta_rate", "psi_rate", "airspeed", "flight_mode", "systemArmed",
-            "throttle", "aileron", "elevator", "rudder",
-            "Motor1", "Motor2", "Motor3", "Motor4",
-            "lift", "drag", "Fx", "Fy", "Fz", "l_moment", "m_moment", "n_moment"
-        ]
+    def _log_step(self):
+        if self.telemetry is not None:
+            with self.profiler.stage("telemetry"):
+                self.telemetry.record(self.current_state, self.control_input, self.forces_moments)
 
-    def run_simulation(self):
-        self.runsim = False
+    # ---------- flight log ----------
+    def _open_log(self):
         log_path = Path("logger/logs")
         log_path.mkdir(parents=True, exist_ok=True)
-
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = log_path / f"simulation_{timestamp}.csv"
+        suffix = LOG_SUFFIX if self.log_format == "binary" else ".csv"
+        filename = log_path / f"simulation_{timestamp}{suffix}"
+        run = 1
+        while filename.exists():  # several resets within one second
+            filename = log_path / f"simulation_{timestamp}_{run}{suffix}"
+            run += 1
+        if self.log_format == "binary":
+            codec = None if self.log_compression == "none" else ColumnCodec(self.log_compression)
+            sink = BinaryTelemetrySink(filename, codec=codec)
+        else:
+            sink = CsvTelemetrySink(filename)
+        self.telemetry = TelemetryWriter(sink, policy=self.telemetry_policy, logging_policy=logging_policy(self.log_policy))
+
+    def _close_log(self):
+        # final flush: everything recorded so far reaches the file before it is closed
+        self.telemetry.close()
+        print(self.telemetry.report())
+        self.telemetry = None
 
-        # Write CSV header only once
-        with open(filename, mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=self._log_header())
-            writer.writeheader()
+    def run_simulation(self):
+        self.runsim = False
+        self._open_log()
+        try:
+            # The GUI is polled and the loop paced once per render frame; the scheduler
+            # runs every stage that falls due within the frame at its own rate
+            frame = 1.0 / self.rates["render"]
+            pacer = RealTimePacer(frame, policy=self.pacing_policy)
 
             while True:
+                frames = pacer.wait()  # absolute-deadline pacing, > 1 when catching up
                 self.GCS_data = self.interface.run()
 
                 match self.GCS_data.sim_command:
@@ -164,20 +189,16 @@ class UAVSimulator:
                 if not self.runsim:
                     continue
 
-                start_time = time.time()
-
                 try:
-                    self._simulate_step()
-                    log_entry = self._generate_log_entry()
-                    writer.writerow(log_entry)
+                    self.scheduler.run_for(frames * frame)
                 except Exception as e:
                     print(f"[ERROR] Simulation step failed: {e}")
                     self.runsim = False
                     continue
-
-                elapsed = time.time() - start_time
-                sleep_time = max(0, (1.0 / self.freq) - elapsed)
-                time.sleep(sleep_time)
+        finally:
+            self._close_log()
+        print(pacer.report())
+        self.export_profile()
 
 if __name__ == "__main__":
     sim = UAVSimulator()